@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+api_server.py - Read-only JSON API over jobs.db (main.py --serve)
+
+Endpoints:
+    GET /jobs?limit=&cursor=&keyword=&since=&until=&min_salary=
+    GET /jobs/<job_id>
+    GET /search?q=...   (same paging and filters as /jobs)
+    GET /stats
+
+Every request uses its own read-only (mode=ro) SQLite connection, so with
+the database in WAL mode dashboards keep reading while a scrape writes.
+Lists use keyset pagination: each page returns next_cursor, an opaque token
+for the (posted_date, job_id) of its last row. Responses carry an ETag
+derived from the database's latest write, and If-None-Match requests are
+answered with 304 without running the query.
+
+Served with an archive directory (--serve --archive), lists continue into
+the archived jobs (archive.py) once the database rows run out, and
+/jobs/<job_id> falls back to the archive.
+"""
+
+import base64
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from archive import JobArchive
+from database import JobDatabase
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def encode_cursor(cursor, archived=False):
+    """Opaque URL-safe token for a (posted_date, job_id) keyset position
+    
+    archived marks a position in the archive; with cursor None it is the
+    start of the archive.
+    """
+    if cursor is None and not archived:
+        return None
+    value = list(cursor or [])
+    if archived:
+        value.insert(0, 'archive')
+    raw = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor: (cursor, archived); raises BadRequest on a malformed token"""
+    if not token:
+        return None, False
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        value = json.loads(raw)
+        archived = bool(value) and value[0] == 'archive'
+        if archived:
+            value = value[1:]
+            if not value:
+                return None, True
+        posted_date, job_id = value
+    except (ValueError, TypeError):
+        raise BadRequest("invalid cursor")
+    return (posted_date, job_id), archived
+
+
+def _job_json(job):
+    job['sent_to_discord'] = bool(job['sent_to_discord'])
+    return job
+
+
+class JobAPIHandler(BaseHTTPRequestHandler):
+    server_version = 'OnlineJobsAPI/1.0'
+    db_path = None  # Set by make_server()
+    archive_dir = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        db = JobDatabase(self.db_path, read_only=True)
+
+        try:
+            etag = f'"{db.get_write_token()}"'
+            if etag in self.headers.get('If-None-Match', ''):
+                self._send(304, None, etag)
+                return
+
+            path = url.path.rstrip('/') or '/'
+            if path == '/jobs':
+                body = self._list_jobs(db, query)
+            elif path == '/search':
+                if not query.get('q'):
+                    raise BadRequest("missing q")
+                body = self._list_jobs(db, query, search=query['q'])
+            elif path.startswith('/jobs/'):
+                body = db.get_job(path[len('/jobs/'):])
+                if body is None and self.archive_dir:
+                    body = JobArchive(self.archive_dir).get_job(path[len('/jobs/'):])
+                if body is None:
+                    self._send(404, {'error': 'job not found'})
+                    return
+                body = _job_json(body)
+            elif path == '/stats':
+                body = db.get_stats()
+                body['keywords'] = db.get_keyword_stats()
+            else:
+                self._send(404, {'error': 'not found'})
+                return
+        except BadRequest as e:
+            self._send(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+            return
+
+        self._send(200, body, etag)
+
+    def _list_jobs(self, db, query, search=None):
+        try:
+            limit = int(query.get('limit', DEFAULT_PAGE_SIZE))
+            min_salary = float(query['min_salary']) if query.get('min_salary') else None
+        except ValueError:
+            raise BadRequest("limit and min_salary must be numbers")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        after, archived = decode_cursor(query.get('cursor'))
+        if archived and not self.archive_dir:
+            raise BadRequest("archive cursor, but the archive is not served")
+        filters = dict(
+            search=search,
+            since=query.get('since'),
+            until=query.get('until'),
+            keyword=query.get('keyword'),
+            min_salary=min_salary,
+        )
+        
+        jobs = []
+        if not archived:
+            jobs, next_cursor = db.page_jobs(after=after, limit=limit, **filters)
+            if next_cursor is not None or not self.archive_dir:
+                return {'jobs': [_job_json(job) for job in jobs], 'next_cursor': encode_cursor(next_cursor)}
+            after = None
+        
+        # Database rows exhausted: carry on with the archive
+        if len(jobs) < limit:
+            more, next_cursor = JobArchive(self.archive_dir).page_jobs(after=after, limit=limit - len(jobs), **filters)
+            jobs += more
+            next_token = encode_cursor(next_cursor, archived=True) if next_cursor else None
+        else:
+            # The database filled this page exactly; the archive starts on the next
+            next_token = encode_cursor(None, archived=True)
+        return {'jobs': [_job_json(job) for job in jobs], 'next_cursor': next_token}
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if body is None:
+            self.end_headers()
+            return
+        data = json.dumps(body, default=str).encode('utf-8')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+
+def make_server(db_path, host, port, archive_dir=None):
+    """ThreadingHTTPServer serving db_path (and archive_dir, if given) read-only"""
+    handler = type('BoundJobAPIHandler', (JobAPIHandler,), {'db_path': db_path, 'archive_dir': archive_dir})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(db_path, host, port, archive_dir=None):
+    """Serve until interrupted"""
+    server = make_server(db_path, host, port, archive_dir)
+    print(f"🌐 Serving {db_path} read-only on http://{host}:{server.server_port}"
+          + (f" (with archive {archive_dir})" if archive_dir else ""))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Server stopped")
+    finally:
+        server.server_close()
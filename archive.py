@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+archive.py - Cold archive of jobs moved out of jobs.db
+
+cleanup_old_jobs() moves old rows here instead of deleting them. Each
+posting month gets one append-only file, ARCHIVE_DIR/jobs-YYYY-MM.jsonl.gz,
+holding one JSON object per job with the JOB_COLUMNS fields. Every append
+writes a new gzip member and is synced to disk before the rows leave the
+database, so a crash between the two can only archive a row twice. Readers
+keep the last copy of each job.
+
+Archived jobs stay queryable: iter_jobs() takes the same filters as
+JobDatabase.iter_jobs() (--export --archive) and page_jobs() the same
+keyset paging as JobDatabase.page_jobs() (--serve --archive). Only the
+month files inside a since/until range are opened.
+"""
+
+import gzip
+import json
+import os
+import re
+
+_MONTH_FILE_RE = re.compile(r'^jobs-(\d{4}-\d{2})\.jsonl\.gz$')
+
+
+def _month(posted_date):
+    return str(posted_date)[:7]
+
+
+class JobArchive:
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+
+    def path(self, month):
+        return os.path.join(self.archive_dir, f"jobs-{month}.jsonl.gz")
+
+    def months(self):
+        """Archived months ('YYYY-MM'), oldest first"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(
+            match.group(1) for match in map(_MONTH_FILE_RE.match, os.listdir(self.archive_dir)) if match
+        )
+
+    def append(self, rows):
+        """Append job dicts (JOB_COLUMNS) to their month files; return rows written
+
+        Rows need a posted_date: undated jobs are never old enough to archive.
+        """
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(_month(row['posted_date']), []).append(row)
+        if not by_month:
+            return 0
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for month, month_rows in by_month.items():
+            data = ''.join(json.dumps(row, ensure_ascii=False, default=str) + '\n' for row in month_rows)
+            with open(self.path(month), 'ab') as f:
+                f.write(gzip.compress(data.encode('utf-8')))
+                f.flush()
+                os.fsync(f.fileno())
+        return sum(len(month_rows) for month_rows in by_month.values())
+
+    def _read_month(self, month):
+        """Jobs archived for month, oldest first, one copy per job"""
+        jobs = {}
+        with gzip.open(self.path(month), 'rt', encoding='utf-8') as f:
+            for line in f:
+                job = json.loads(line)
+                jobs[job['job_id']] = job
+        return sorted(jobs.values(), key=lambda job: (job['posted_date'], job['job_id']))
+
+    @staticmethod
+    def _matches(job, since=None, until=None, keyword=None, min_salary=None, search=None):
+        """Same filters as JobDatabase._job_filters (and page_jobs' search)"""
+        if min_salary is not None and (job['salary_usd_month'] is None or job['salary_usd_month'] < min_salary):
+            return False
+        if keyword and job['keyword_matched'] != keyword:
+            return False
+        if since and job['posted_date'] < since:
+            return False
+        if until and job['posted_date'][:10] > until:
+            return False
+        if search:
+            needle = search.lower()
+            if needle not in (job['title'] or '').lower() and needle not in (job['description'] or '').lower():
+                return False
+        return True
+
+    def iter_jobs(self, since=None, until=None, keyword=None, min_salary=None, search=None, newest_first=False):
+        """Stream matching archived jobs one month at a time, oldest first by default"""
+        months = [
+            month for month in self.months()
+            if (not since or month >= since[:7]) and (not until or month <= until[:7])
+        ]
+        if newest_first:
+            months.reverse()
+        for month in months:
+            jobs = self._read_month(month)
+            if newest_first:
+                jobs.reverse()
+            for job in jobs:
+                if self._matches(job, since, until, keyword, min_salary, search):
+                    yield job
+
+    def page_jobs(self, after=None, limit=50, search=None, **filters):
+        """One page of archived jobs, newest first; same contract as JobDatabase.page_jobs"""
+        if after is not None:
+            # Later months were served by earlier pages; don't open them again
+            filters['until'] = min(filters.get('until') or after[0][:10], after[0][:10])
+        jobs = []
+        for job in self.iter_jobs(search=search, newest_first=True, **filters):
+            if after is not None and (job['posted_date'], job['job_id']) >= tuple(after):
+                continue
+            jobs.append(job)
+            if len(jobs) > limit:
+                break
+        next_cursor = None
+        if len(jobs) > limit:
+            jobs = jobs[:limit]
+            next_cursor = (jobs[-1]['posted_date'], jobs[-1]['job_id'])
+        return jobs, next_cursor
+
+    def get_job(self, job_id):
+        """A single archived job as a dict, or None (scans the archive)"""
+        for month in reversed(self.months()):
+            for job in self._read_month(month):
+                if job['job_id'] == job_id:
+                    return job
+        return None
+
+    def summary(self):
+        """One-line description for logs"""
+        months = self.months()
+        if not months:
+            return f"{self.archive_dir}: empty"
+        size = sum(os.path.getsize(self.path(month)) for month in months)
+        return f"{self.archive_dir}: {len(months)} months ({months[0]} to {months[-1]}), {size / 1024:.0f} KB"
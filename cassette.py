@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+cassette.py - HTTP record/replay for deterministic offline runs
+
+`--record DIR` runs a normal scrape, but every request sent by the scraper's
+session and by DiscordSender is also written to a cassette in DIR: one
+jsonl.gz file per session (onlinejobs, discord) holding the method, URL,
+request and response headers and bodies, status, and when the request was
+sent and how long it took. The database and crawl state the run started
+from are copied next to them, with the run's start time and keywords.
+
+`--replay DIR` runs the current code against that capture with no network.
+Both sessions get a ReplayAdapter that answers each request from the
+cassette. The run starts from copies of the recorded database and state
+(in DIR/replay/) on a VirtualClock set to the recorded start time, so date
+windows match the capture and pacing never really sleeps. Responses
+take their recorded time on that clock (latency 'recorded', so the adaptive
+pacing sees what production saw) or none at all ('zero'). Two versions of the
+scraper replayed against one cassette see byte-identical input, so their
+timings and their DIR/replay/jobs.db outputs can be compared directly.
+
+Requests are matched by method and URL, in recorded order; a URL asked for
+more often than recorded gets its last response again. A request the capture
+never made raises CassetteMiss, a ConnectionError, so it is handled like the
+site being unreachable. Webhook tokens, cookies and Authorization headers
+are never written to a cassette.
+"""
+
+import base64
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import sqlite3
+from collections import deque
+from datetime import timedelta
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from clock import REAL_CLOCK
+
+SESSION_NAMES = ('onlinejobs', 'discord')
+
+# Replay latency: the recorded response times, or none
+LATENCY_MODES = ('recorded', 'zero')
+
+# Stands in for DISCORD_WEBHOOK_URL when replaying without one configured
+REPLAY_WEBHOOK_URL = 'https://discord.com/api/webhooks/0/replay'
+
+_WEBHOOK_RE = re.compile(r'/api/webhooks/[^/?]+/[^/?]+')
+_REDACTED_HEADERS = {'authorization', 'cookie', 'set-cookie'}
+
+
+class CassetteMiss(requests.ConnectionError):
+    """A replayed run sent a request the cassette has no recording of"""
+
+
+def redact_url(url):
+    """URL with any Discord webhook id and token replaced"""
+    return _WEBHOOK_RE.sub('/api/webhooks/WEBHOOK', url)
+
+
+def _headers(headers):
+    return {name: ('[redacted]' if name.lower() in _REDACTED_HEADERS else value)
+            for name, value in headers.items()}
+
+
+def _encode_body(body):
+    """(key, value) storing body as text when it is UTF-8, else base64"""
+    if body is None:
+        return 'body', None
+    if isinstance(body, str):
+        return 'body', body
+    try:
+        return 'body', body.decode('utf-8')
+    except UnicodeDecodeError:
+        return 'body_base64', base64.b64encode(body).decode('ascii')
+
+
+def _decode_body(entry):
+    if entry.get('body_base64') is not None:
+        return base64.b64decode(entry['body_base64'])
+    return (entry.get('body') or '').encode('utf-8')
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that also appends every exchange to a cassette file"""
+
+    def __init__(self, path, clock=None):
+        super().__init__()
+        self.path = path
+        self.clock = clock or REAL_CLOCK
+        self.started = self.clock.monotonic()
+        self.recorded = 0
+        self._file = None
+
+    def _write(self, entry):
+        if self._file is None:
+            self._file = gzip.open(self.path, 'wt', encoding='utf-8')
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        # Sync-flush, so a killed run still leaves a readable cassette
+        self._file.flush()
+        self.recorded += 1
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        sent = self.clock.monotonic()
+        key, value = _encode_body(request.body)
+        entry = {
+            'at': round(sent - self.started, 4),
+            'method': request.method,
+            'url': redact_url(request.url),
+            'request_headers': _headers(request.headers),
+            'request_' + key: value,
+        }
+        try:
+            response = super().send(request, stream=stream, timeout=timeout, verify=verify,
+                                    cert=cert, proxies=proxies)
+            content = response.content  # Whole body, streamed or not
+        except requests.RequestException as e:
+            entry.update(elapsed=round(self.clock.monotonic() - sent, 4),
+                         error=type(e).__name__, message=str(e))
+            self._write(entry)
+            raise
+        # Callers that stream read .raw; it was consumed above. The session
+        # still takes its cookies from the original urllib3 response.
+        original = response.raw
+        response.raw = io.BytesIO(content)
+        response.raw._original_response = getattr(original, '_original_response', None)
+        key, value = _encode_body(content)
+        entry.update({
+            'elapsed': round(self.clock.monotonic() - sent, 4),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': _headers(response.headers),
+            key: value,
+        })
+        self._write(entry)
+        return response
+
+    def close(self):
+        super().close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter that answers requests from a cassette file"""
+
+    def __init__(self, path, clock=None, latency='recorded'):
+        super().__init__()
+        self.clock = clock or REAL_CLOCK
+        self.latency = latency
+        self.entries = {}  # (method, url) -> deque of recorded exchanges
+        self.last = {}
+        self.served = 0
+        self.reused = 0
+        self.misses = 0
+        for entry in self._read(path):
+            self.entries.setdefault((entry['method'], entry['url']), deque()).append(entry)
+
+    @staticmethod
+    def _read(path):
+        if not os.path.exists(path):
+            return []
+        entries = []
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    entries.append(json.loads(line))
+        except (EOFError, json.JSONDecodeError):
+            # Cassette of a killed run: keep the complete exchanges
+            pass
+        return entries
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = (request.method, redact_url(request.url))
+        queue = self.entries.get(key)
+        if queue:
+            entry = self.last[key] = queue.popleft()
+        elif key in self.last:
+            entry = self.last[key]
+            self.reused += 1
+        else:
+            self.misses += 1
+            raise CassetteMiss(f"No recorded response for {key[0]} {key[1]}", request=request)
+        self.served += 1
+
+        if self.latency == 'recorded':
+            self.clock.sleep(entry.get('elapsed', 0))
+        if entry.get('error'):
+            error = getattr(requests.exceptions, entry['error'], requests.ConnectionError)
+            raise error(entry.get('message'), request=request)
+
+        content = _decode_body(entry)
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry.get('headers') or {})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(content)
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=entry.get('elapsed', 0))
+        if not stream:
+            response._content = content
+        return response
+
+    def close(self):
+        pass
+
+    def summary(self):
+        """One-line description for logs"""
+        left = sum(len(queue) for queue in self.entries.values())
+        return f"{self.served} served ({self.reused} repeats), {self.misses} misses, {left} recorded left unused"
+
+
+class Cassette:
+    def __init__(self, directory):
+        self.directory = directory
+        self.adapters = {}
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.jsonl.gz")
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.directory, 'cassette.json')
+
+    @property
+    def start_db_path(self):
+        return os.path.join(self.directory, 'start.db')
+
+    @property
+    def start_state_path(self):
+        return os.path.join(self.directory, 'start-state')
+
+    def exists(self):
+        return os.path.exists(self.meta_path)
+
+    def read_meta(self):
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_meta(self, meta):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, default=str)
+
+    def _session(self, name, adapter, session):
+        session = session or requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        self.adapters[name] = adapter
+        return session
+
+    def recording_session(self, name, clock=None, session=None):
+        """A requests session (or session, remounted) that records into the cassette"""
+        os.makedirs(self.directory, exist_ok=True)
+        return self._session(name, RecordingAdapter(self.path(name), clock), session)
+
+    def replay_session(self, name, clock=None, latency='recorded', session=None):
+        """A requests session served entirely from the cassette"""
+        return self._session(name, ReplayAdapter(self.path(name), clock, latency), session)
+
+    def save_snapshot(self, database_path, state_path):
+        """Copy the database and crawl state a recorded run starts from"""
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(database_path):
+            # Backup API: consistent even if another process has the db open
+            source = sqlite3.connect(database_path)
+            target = sqlite3.connect(self.start_db_path)
+            with target:
+                source.backup(target)
+            source.close()
+            target.close()
+        if os.path.exists(state_path):
+            shutil.copyfile(state_path, self.start_state_path)
+
+    def restore_snapshot(self, database_path, state_path):
+        """Copy the recorded starting point to these (fresh) paths"""
+        for source, target in ((self.start_db_path, database_path), (self.start_state_path, state_path)):
+            if os.path.exists(source):
+                os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+                shutil.copyfile(source, target)
+
+    def close(self):
+        for adapter in self.adapters.values():
+            adapter.close()
+
+    def summary(self):
+        """Multi-line description of what was recorded or replayed"""
+        lines = []
+        for name, adapter in self.adapters.items():
+            if isinstance(adapter, ReplayAdapter):
+                lines.append(f"   • {name}: {adapter.summary()}")
+            else:
+                lines.append(f"   • {name}: {adapter.recorded} exchanges recorded")
+        return '\n'.join(lines)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+clock.py - Injectable clock for every delay in the scraper
+
+All pacing (rate_control.py), worker polling and lease times (work_queue.py)
+and Discord batch spacing go through a clock object instead of calling
+time.sleep()/time.time() directly. RealClock is the default. VirtualClock
+never sleeps: sleep() just moves virtual time forward, so offline runs of
+the whole pipeline (benchmarks/pipeline_sim.py) take seconds instead of
+minutes, while the timestamps they record still show the politeness policy
+being followed.
+"""
+
+import time
+
+
+class RealClock:
+    def time(self):
+        """Wall-clock seconds since the epoch"""
+        return time.time()
+
+    def monotonic(self):
+        """Seconds for measuring intervals"""
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    def __init__(self, start=None):
+        self.start = time.time() if start is None else start  # Epoch time at t=0
+        self.elapsed = 0.0      # Virtual seconds since t=0
+        self.slept = 0.0        # Total virtual seconds spent in sleep()
+        self.sleeps = 0
+
+    def time(self):
+        return self.start + self.elapsed
+
+    def monotonic(self):
+        return self.elapsed
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.elapsed += seconds
+            self.slept += seconds
+            self.sleeps += 1
+
+    def advance(self, seconds):
+        """Let virtual time pass without sleeping (e.g. simulated latency)"""
+        self.elapsed += max(0.0, seconds)
+
+
+# Shared default so callers that aren't given a clock need not build one
+REAL_CLOCK = RealClock()
@@ -7,13 +7,29 @@ Professional web scraping with ethical compliance and rate limiting
 import os
 from typing import List
 
-# Try to load .env file for local development
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    # python-dotenv not installed, skip
-    pass
+# Try to load .env file for local development. Like python-dotenv's own
+# lookup, search upward from this file; the dotenv package itself is only
+# imported when a .env file is actually present, which keeps `import config`
+# cheap for the CLI commands that never scrape.
+def _find_env_file():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(directory, '.env')
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+_env_file = _find_env_file()
+if _env_file:
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(_env_file)
+    except ImportError:
+        # python-dotenv not installed, skip
+        pass
 
 class Config:
     # ============================================================================
@@ -58,6 +74,11 @@ class Config:
         # Ensure they're lowercase for consistent matching
         EXCLUDED_KEYWORDS = [k.lower() for k in EXCLUDED_KEYWORDS]
     
+    # Salary normalisation (salary.py) - floor is USD per month, 0 disables it.
+    # Jobs whose salary can't be parsed are never filtered out.
+    PHP_PER_USD: float = float(os.getenv('PHP_PER_USD', '56.0'))
+    SALARY_FLOOR_USD_MONTH: float = float(os.getenv('SALARY_FLOOR_USD_MONTH', '0'))
+    
     # ============================================================================
     # INTEGRATION SETTINGS
     # ============================================================================
@@ -68,6 +89,29 @@ class Config:
     # Database settings
     DATABASE_PATH: str = os.getenv('DATABASE_PATH', 'data/jobs.db')
     
+    # Compact crawl state (known/sent job IDs, keyword watermarks) - the only
+    # file CI needs to carry between runs
+    STATE_PATH: str = os.getenv('STATE_PATH', 'data/crawl_state.bin')
+    
+    # Checkpoints of the current run (frontier.py): a run that dies partway is
+    # resumed by the next run with the same settings started within
+    # FRONTIER_MAX_AGE_HOURS. Set FRONTIER_PATH to an empty string to disable.
+    FRONTIER_PATH: str = os.getenv('FRONTIER_PATH', 'data/crawl_frontier.db')
+    FRONTIER_MAX_AGE_HOURS: float = float(os.getenv('FRONTIER_MAX_AGE_HOURS', '6'))
+    
+    # Cold archive for --cleanup (archive.py): jobs older than the cutoff move
+    # to monthly jsonl.gz files here. Set ARCHIVE_DIR to an empty string to
+    # delete them instead.
+    ARCHIVE_DIR: str = os.getenv('ARCHIVE_DIR', 'data/archive')
+    
+    # SQLite journal mode. WAL lets --serve and --export read while a scrape
+    # writes; use DELETE if the database lives on a network/shared volume.
+    DB_JOURNAL_MODE: str = os.getenv('DB_JOURNAL_MODE', 'WAL')
+    
+    # Read-only JSON API (main.py --serve)
+    SERVE_HOST: str = os.getenv('SERVE_HOST', '127.0.0.1')
+    SERVE_PORT: int = int(os.getenv('SERVE_PORT', '8080'))
+    
     # ============================================================================
     # RESPECTFUL SCRAPING SETTINGS
     # ============================================================================
@@ -75,12 +119,70 @@ class Config:
     # Date range settings
     DEFAULT_DAYS_BACK: int = int(os.getenv('DEFAULT_DAYS_BACK', '5'))
     
+    # Extra search query for newest-first results ("key=value&..."). This is
+    # an assumption about the site, not something it documents: with it,
+    # pagination stops at the first page whose dated listings are all older
+    # than the --days window. Set to an empty string if the site stops
+    # honouring it (every page up to MAX_PAGES_PER_KEYWORD is then read).
+    SEARCH_SORT_PARAM: str = os.getenv('SEARCH_SORT_PARAM', 'sort=newest')
+    
     # Respectful rate limiting - prevents server overload
     RESPECTFUL_DELAY_MIN: float = float(os.getenv('REQUEST_DELAY_MIN', '1.0'))    # Minimum delay between requests (seconds)
     RESPECTFUL_DELAY_MAX: float = float(os.getenv('REQUEST_DELAY_MAX', '3.0'))    # Maximum delay between requests (seconds)
     MAX_CONCURRENT_REQUESTS: int = 1                                              # No parallel requests - respectful scraping
     MAX_PAGES_PER_KEYWORD: int = int(os.getenv('MAX_PAGES_PER_KEYWORD', '2'))    # Limited scope to avoid overloading server
     
+    # Job discovery: 'search' pages through the HTML search for each keyword;
+    # 'sitemap' streams the sitemaps listed in robots.txt (plus SITEMAP_URLS)
+    # and matches job URLs locally, falling back to search if there are none
+    DISCOVERY_MODE: str = os.getenv('DISCOVERY_MODE', 'search').strip().lower()
+    SITEMAP_URLS: List[str] = [url.strip() for url in os.getenv('SITEMAP_URLS', '').split(',') if url.strip()]
+    MAX_SITEMAPS: int = int(os.getenv('MAX_SITEMAPS', '20'))                     # Sitemap/feed requests per run
+    
+    # Relevance ranking (relevance.py). New listings are scored against the
+    # keywords before their job page is fetched: those below the threshold are
+    # skipped, at most RELEVANCE_TOP_N (0 = no limit) are fetched per run, and
+    # notifications go out best match first.
+    RELEVANCE_THRESHOLD: float = float(os.getenv('RELEVANCE_THRESHOLD', '0'))
+    RELEVANCE_TOP_N: int = int(os.getenv('RELEVANCE_TOP_N', '0'))
+    RELEVANCE_CORPUS_SIZE: int = int(os.getenv('RELEVANCE_CORPUS_SIZE', '5000'))    # Stored jobs used for IDF
+    
+    # Keyword planner (query_planner.py) - searches keywords that mostly
+    # duplicate others less deeply, losing at most PLANNER_TOLERANCE of the
+    # unique jobs a full crawl would find. Set QUERY_PLANNER=false to disable.
+    QUERY_PLANNER: bool = os.getenv('QUERY_PLANNER', 'true').lower() == 'true'
+    PLANNER_TOLERANCE: float = float(os.getenv('PLANNER_TOLERANCE', '0.05'))
+    PLANNER_HISTORY_RUNS: int = int(os.getenv('PLANNER_HISTORY_RUNS', '5'))       # Full-depth runs used for estimates
+    PLANNER_EXPLORE_EVERY: int = int(os.getenv('PLANNER_EXPLORE_EVERY', '5'))     # Every Nth run searches at full depth
+    
+    # Adaptive rate control (rate_control.py) - backs off on 429/5xx/slow responses
+    MAX_BACKOFF_DELAY: float = float(os.getenv('MAX_BACKOFF_DELAY', '60'))       # Longest delay after repeated backoffs
+    MAX_RETRIES: int = int(os.getenv('MAX_RETRIES', '3'))                         # Retries per request on 429/5xx/network errors
+    
+    # Request budget (main.py --max-requests / --deadline, see scheduler.py).
+    # Search and job pages run by expected new jobs per request; the run stops
+    # starting requests when the budget is spent, keeping DEADLINE_RESERVE_SECONDS
+    # of the deadline for notifying Discord.
+    MAX_REQUESTS: int = int(os.getenv('MAX_REQUESTS', '0'))                       # 0 = no cap
+    DEADLINE_MINUTES: float = float(os.getenv('DEADLINE_MINUTES', '0'))           # 0 = no deadline
+    DEADLINE_RESERVE_SECONDS: float = float(os.getenv('DEADLINE_RESERVE_SECONDS', '60'))
+    
+    # Extraction health (extraction_health.py) - once EXTRACTION_MIN_PAGES job
+    # pages are in, a field found on less than EXTRACTION_MIN_RATIO of its usual
+    # share of pages has collapsed (selector drift). 'stop' reports it and stops
+    # fetching job pages for the run, 'warn' only reports it, 'off' disables it.
+    EXTRACTION_HEALTH_ACTION: str = os.getenv('EXTRACTION_HEALTH_ACTION', 'stop').strip().lower()
+    EXTRACTION_MIN_PAGES: int = int(os.getenv('EXTRACTION_MIN_PAGES', '10'))
+    EXTRACTION_MIN_RATIO: float = float(os.getenv('EXTRACTION_MIN_RATIO', '0.5'))
+    
+    # robots.txt is cached on disk and only re-fetched after the TTL
+    ROBOTS_CACHE_PATH: str = os.getenv('ROBOTS_CACHE_PATH', 'data/robots_cache.json')
+    ROBOTS_CACHE_TTL_HOURS: float = float(os.getenv('ROBOTS_CACHE_TTL_HOURS', '24'))
+    
+    # Multi-worker crawl coordination (main.py --workers / --worker)
+    WORK_QUEUE_PATH: str = os.getenv('WORK_QUEUE_PATH', 'data/work_queue.db')  # Shared lease table
+    LEASE_SECONDS: int = int(os.getenv('LEASE_SECONDS', '120'))                  # Lease expiry without heartbeat
+    
     # Legacy property names for backward compatibility
     REQUEST_DELAY_MIN = RESPECTFUL_DELAY_MIN
     REQUEST_DELAY_MAX = RESPECTFUL_DELAY_MAX
@@ -88,6 +190,12 @@ class Config:
     # Discord message batching
     MAX_JOBS_PER_DISCORD_MESSAGE: int = 10
     
+    # Notify first, enrich later: post a short preview of each new listing as
+    # soon as its search page is in, then edit that message with salary,
+    # contact and description once the job page is fetched. Listings that
+    # fail the final filters have their preview deleted.
+    DISCORD_NOTIFY_FIRST: bool = os.getenv('DISCORD_NOTIFY_FIRST', 'false').lower() == 'true'
+    
     # ============================================================================
     # BROWSER SIMULATION SETTINGS  
     # ============================================================================
@@ -129,6 +237,12 @@ class Config:
         if cls.RESPECTFUL_DELAY_MAX < cls.RESPECTFUL_DELAY_MIN:
             issues.append("RESPECTFUL_DELAY_MAX must be greater than RESPECTFUL_DELAY_MIN")
         
+        if cls.DISCOVERY_MODE not in ('search', 'sitemap'):
+            issues.append("DISCOVERY_MODE must be 'search' or 'sitemap'")
+        
+        if cls.EXTRACTION_HEALTH_ACTION not in ('stop', 'warn', 'off'):
+            issues.append("EXTRACTION_HEALTH_ACTION must be 'stop', 'warn' or 'off'")
+        
         # Validate excluded keywords
         if not cls.EXCLUDED_KEYWORDS:
             print("ℹ️  No keywords configured for exclusion - all matching jobs will be included")
@@ -144,8 +258,11 @@ class Config:
         print(f"Keywords: {', '.join(cls.KEYWORDS)}")
         print(f"Excluded Keywords: {', '.join(cls.EXCLUDED_KEYWORDS)}")
         print(f"Days back: {cls.DEFAULT_DAYS_BACK}")
+        if cls.SALARY_FLOOR_USD_MONTH:
+            print(f"Salary floor: ${cls.SALARY_FLOOR_USD_MONTH:,.0f}/month (USD)")
         print(f"Max pages per keyword: {cls.MAX_PAGES_PER_KEYWORD}")
         print(f"Database path: {cls.DATABASE_PATH}")
+        print(f"Crawl state path: {cls.STATE_PATH}")
         print(f"Discord webhook configured: {'Yes' if cls.DISCORD_WEBHOOK_URL else 'No'}")
         print(f"Running in GitHub Actions: {cls.IS_GITHUB_ACTIONS}")
         print(f"Request delay: {cls.RESPECTFUL_DELAY_MIN}-{cls.RESPECTFUL_DELAY_MAX}s")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+crawl_state.py - Compact, versioned crawl state for CI runs
+
+Holds what a fresh runner needs to avoid re-notifying old jobs: every known
+job ID, the IDs already sent to Discord, and per-keyword watermarks. IDs are
+stored as sorted delta-encoded varints and the whole file is zlib-compressed,
+so tens of thousands of jobs fit in a few kilobytes and load in milliseconds.
+The JSON section also keeps the per-page search results of the last few
+runs for the keyword planner (query_planner.py), each keyword's yield
+of new listings per request for the scheduler (scheduler.py), and the
+per-field extraction hit rates of healthy runs (extraction_health.py).
+
+File layout:
+    b'OJST' | version (1 byte) | zlib(known ids | sent ids | watermarks JSON)
+where each ID block is varint(count) followed by varint deltas.
+"""
+
+import json
+import os
+import time
+import zlib
+
+MAGIC = b'OJST'
+VERSION = 1
+
+
+def _write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_ids(ids):
+    """Encode a set of numeric IDs as varint(count) + sorted varint deltas"""
+    out = bytearray()
+    numbers = sorted(ids)
+    _write_varint(out, len(numbers))
+    previous = 0
+    for number in numbers:
+        _write_varint(out, number - previous)
+        previous = number
+    return bytes(out)
+
+
+def decode_ids(data, pos=0):
+    """Inverse of encode_ids; return (set of ints, next position)"""
+    count, pos = _read_varint(data, pos)
+    ids = set()
+    current = 0
+    for _ in range(count):
+        delta, pos = _read_varint(data, pos)
+        current += delta
+        ids.add(current)
+    return ids, pos
+
+
+class CrawlState:
+    def __init__(self, path):
+        self.path = path
+        self.known = set()        # int job IDs ever saved
+        self.sent = set()         # int job IDs already sent to Discord
+        self.watermarks = {}      # keyword -> {'max_job_id': int, 'last_run': iso str}
+        self.other_ids = set()    # non-numeric IDs, should the site ever use them
+        self.runs = 0             # scrape runs recorded so far
+        self.keyword_runs = []    # full-depth runs: [{keyword: [[job IDs on page 1], ...]}]
+        self.keyword_yield = {}   # keyword -> {'requests': x, 'new_jobs': y}, decayed per run
+        self.extraction_baseline = {}  # field -> {'pages': x, 'hits': y}, decayed per run
+
+    @classmethod
+    def load(cls, path):
+        """Load state from path; a missing or unreadable file gives empty state"""
+        state = cls(path)
+        if not os.path.exists(path):
+            return state
+
+        started = time.perf_counter()
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            if raw[:4] != MAGIC:
+                raise ValueError("not a crawl state file")
+            if raw[4] != VERSION:
+                raise ValueError(f"unsupported crawl state version {raw[4]}")
+
+            data = zlib.decompress(raw[5:])
+            state.known, pos = decode_ids(data)
+            state.sent, pos = decode_ids(data, pos)
+            extra = json.loads(data[pos:].decode('utf-8'))
+            state.watermarks = extra.get('watermarks', {})
+            state.other_ids = set(extra.get('other_ids', []))
+            state.runs = extra.get('runs', 0)
+            state.keyword_runs = extra.get('keyword_runs', [])
+            state.keyword_yield = extra.get('keyword_yield', {})
+            state.extraction_baseline = extra.get('extraction_baseline', {})
+        except Exception as e:
+            print(f"⚠️ Ignoring crawl state {path}: {e}")
+            return cls(path)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"💾 Loaded crawl state: {len(state.known)} known jobs, "
+              f"{len(state.sent)} sent ({len(raw)} bytes, {elapsed_ms:.1f} ms)")
+        return state
+
+    def save(self):
+        """Write state atomically (temp file + rename)"""
+        started = time.perf_counter()
+        extra = {
+            'watermarks': self.watermarks,
+            'other_ids': sorted(self.other_ids),
+            'runs': self.runs,
+            'keyword_runs': self.keyword_runs,
+            'keyword_yield': self.keyword_yield,
+            'extraction_baseline': self.extraction_baseline,
+        }
+        data = encode_ids(self.known) + encode_ids(self.sent) + json.dumps(extra).encode('utf-8')
+        raw = MAGIC + bytes([VERSION]) + zlib.compress(data, 9)
+
+        state_dir = os.path.dirname(self.path)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(raw)
+        os.replace(tmp_path, self.path)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"💾 Saved crawl state: {len(self.known)} known jobs ({len(raw)} bytes, {elapsed_ms:.1f} ms)")
+
+    def _add(self, ids, job_id):
+        job_id = str(job_id)
+        if job_id.isdigit():
+            ids.add(int(job_id))
+        else:
+            self.other_ids.add(job_id)
+
+    def is_known(self, job_id):
+        job_id = str(job_id)
+        if job_id.isdigit():
+            return int(job_id) in self.known
+        return job_id in self.other_ids
+
+    def add_known(self, job_id):
+        self._add(self.known, job_id)
+
+    def mark_sent(self, job_id):
+        self._add(self.sent, job_id)
+        self.add_known(job_id)
+
+    def update_watermark(self, keyword, job_ids):
+        """Record the highest job ID seen for keyword in this run"""
+        numeric = [int(job_id) for job_id in job_ids if str(job_id).isdigit()]
+        mark = self.watermarks.get(keyword, {})
+        if numeric:
+            mark['max_job_id'] = max(numeric + [mark.get('max_job_id', 0)])
+        mark['last_run'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.watermarks[keyword] = mark
+
+    def record_keyword_run(self, pages_by_keyword, capped, keep=5):
+        """Count a run and, if it searched at full depth, keep its per-page job IDs
+        
+        Capped runs say nothing about the pages they skipped, so only the
+        last `keep` full-depth runs are stored.
+        """
+        self.runs += 1
+        if capped:
+            return
+        self.keyword_runs.append({
+            keyword: [[int(job_id) if str(job_id).isdigit() else job_id for job_id in page]
+                      for page in pages]
+            for keyword, pages in pages_by_keyword.items()
+        })
+        self.keyword_runs = self.keyword_runs[-keep:]
+
+    def record_yield(self, keyword, requests, new_jobs, decay=0.7):
+        """Add a run's search requests and new listings for keyword
+        
+        Older runs are scaled down by decay, so the yield follows the site.
+        """
+        if not requests:
+            return
+        totals = self.keyword_yield.get(keyword, {'requests': 0.0, 'new_jobs': 0.0})
+        self.keyword_yield[keyword] = {
+            'requests': round(totals['requests'] * decay + requests, 3),
+            'new_jobs': round(totals['new_jobs'] * decay + new_jobs, 3),
+        }
+
+    def yield_per_request(self, keyword):
+        """Past new listings per search request for keyword, or None if unknown"""
+        totals = self.keyword_yield.get(keyword)
+        if not totals or not totals['requests']:
+            return None
+        return totals['new_jobs'] / totals['requests']
@@ -5,21 +5,201 @@ database.py - SQLite database operations for OnlineJobs.ph scraper
 
 import sqlite3
 import os
+import hashlib
 from datetime import datetime
-from pathlib import Path
+from urllib.parse import quote
+
+from job_record import JobRecord, STORED_FIELDS
+
+# Columns returned by iter_jobs() / the export command, in output order
+JOB_COLUMNS = [
+    'job_id', 'title', 'company', 'url', 'description', 'salary', 'job_type',
+    'salary_min', 'salary_max', 'salary_currency', 'salary_period', 'salary_usd_month',
+    'contact_person', 'posted_date', 'date_updated', 'keyword_matched', 'scraped_at',
+    'last_changed_at', 'sent_to_discord'
+]
+
+# Extracted fields covered by content_hash; a re-save that changes none of
+# them is skipped entirely. posted_date is left out because it falls back to
+# the scrape time when the listing shows no date.
+CONTENT_COLUMNS = [
+    'title', 'company', 'url', 'description', 'salary', 'job_type', 'contact_person',
+    'date_updated'
+]
+
+# Set when a job is first saved and never overwritten by later upserts
+INSERT_ONLY_COLUMNS = {'job_id', 'keyword_matched', 'scraped_at'}
+
+# Normalised salary columns filled by salary.salary_fields()
+SALARY_COLUMNS = {
+    'salary_min': 'REAL',
+    'salary_max': 'REAL',
+    'salary_currency': 'TEXT',
+    'salary_period': 'TEXT',
+    'salary_usd_month': 'REAL',
+}
+
+# Accepted values for DB_JOURNAL_MODE
+JOURNAL_MODES = ('WAL', 'DELETE', 'TRUNCATE', 'PERSIST')
+
+# Bump when a migration is added to JobDatabase._migrate
+SCHEMA_VERSION = 9
+
+# Upper bounds (USD per month) and labels of the salary bands in job_rollup_daily
+SALARY_BANDS = [
+    (300, '<$300'),
+    (600, '$300-600'),
+    (1000, '$600-1k'),
+    (1500, '$1k-1.5k'),
+    (None, '$1.5k+'),
+]
+
+def _salary_band_sql(row):
+    """CASE expression mapping {row}.salary_usd_month to a SALARY_BANDS label"""
+    value = f"{row}.salary_usd_month"
+    branches = ' '.join(
+        f"WHEN {value} < {limit} THEN '{label}'" for limit, label in SALARY_BANDS if limit is not None
+    )
+    return f"CASE WHEN {value} IS NULL THEN 'unknown' {branches} ELSE '{SALARY_BANDS[-1][1]}' END"
+
+def content_hash(row):
+    """Short stable hash of a job's extracted content (see CONTENT_COLUMNS)"""
+    text = '\x1f'.join('' if row.get(column) is None else str(row[column]) for column in CONTENT_COLUMNS)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+# Triggers that keep the job_stats* summary tables in step with jobs, so
+# get_stats() reads a handful of rows instead of scanning the table.
+# Each bucket is adjusted by +/-1 (and +/-1 sent) as rows come and go.
+_DAY_SQL = "COALESCE(date({row}.posted_date), 'unknown')"
+_KEYWORD_SQL = "COALESCE({row}.keyword_matched, '')"
+_ROLLUP_KEYS = [
+    ('day', _DAY_SQL),
+    ('keyword', _KEYWORD_SQL),
+    ('job_type', "COALESCE(NULLIF({row}.job_type, ''), 'Not specified')"),
+    ('salary_band', _salary_band_sql('{row}')),
+]
+_STATS_BUCKETS = [
+    # (table, [(key column, expression over a jobs row), ...])
+    ('job_stats_daily', [('day', _DAY_SQL)]),
+    ('job_stats_keyword', [('keyword', _KEYWORD_SQL)]),
+    # Daily rollup for --trends: a year is a few thousand rows at most
+    ('job_rollup_daily', _ROLLUP_KEYS),
+]
+
+# Same rollup for jobs moved to the archive (cleanup_old_jobs). Written only
+# when rows are archived, so --trends keeps their history; never rebuilt.
+ARCHIVED_ROLLUP_TABLE = 'job_rollup_archived'
+
+# Columns whose change moves a row to another bucket
+_STATS_SOURCE_COLUMNS = 'sent_to_discord, posted_date, keyword_matched, job_type, salary_usd_month'
+
+
+def _stats_add_sql(row):
+    """SQL statements that count one jobs row ({row} is NEW or OLD)"""
+    sent = f"CASE WHEN {row}.sent_to_discord THEN 1 ELSE 0 END"
+    statements = [
+        f"UPDATE job_stats SET total_jobs = total_jobs + 1, sent_jobs = sent_jobs + {sent} WHERE id = 1;"
+    ]
+    for table, keys in _STATS_BUCKETS:
+        columns = ', '.join(column for column, _ in keys)
+        values = ', '.join(expr.format(row=row) for _, expr in keys)
+        statements.append(
+            f"INSERT INTO {table} ({columns}, total_jobs, sent_jobs) VALUES ({values}, 1, {sent}) "
+            f"ON CONFLICT({columns}) DO UPDATE SET total_jobs = total_jobs + 1, "
+            f"sent_jobs = sent_jobs + excluded.sent_jobs;"
+        )
+    return '\n'.join(statements)
+
+
+def _stats_remove_sql(row):
+    """SQL statements that uncount one jobs row ({row} is NEW or OLD)"""
+    sent = f"CASE WHEN {row}.sent_to_discord THEN 1 ELSE 0 END"
+    statements = [
+        f"UPDATE job_stats SET total_jobs = total_jobs - 1, sent_jobs = sent_jobs - {sent} WHERE id = 1;"
+    ]
+    for table, keys in _STATS_BUCKETS:
+        match = ' AND '.join(f"{column} = {expr.format(row=row)}" for column, expr in keys)
+        statements.append(
+            f"UPDATE {table} SET total_jobs = total_jobs - 1, sent_jobs = sent_jobs - {sent} "
+            f"WHERE {match};"
+        )
+        statements.append(f"DELETE FROM {table} WHERE {match} AND total_jobs <= 0;")
+    return '\n'.join(statements)
+
+
+STATS_TRIGGERS = {
+    'trg_jobs_stats_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS main.trg_jobs_stats_insert AFTER INSERT ON jobs
+        BEGIN
+            {_stats_add_sql('NEW')}
+        END
+    """,
+    'trg_jobs_stats_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS main.trg_jobs_stats_delete AFTER DELETE ON jobs
+        BEGIN
+            {_stats_remove_sql('OLD')}
+        END
+    """,
+    'trg_jobs_stats_update': f"""
+        CREATE TRIGGER IF NOT EXISTS main.trg_jobs_stats_update
+        AFTER UPDATE OF {_STATS_SOURCE_COLUMNS} ON jobs
+        BEGIN
+            {_stats_remove_sql('OLD')}
+            {_stats_add_sql('NEW')}
+        END
+    """,
+}
 
 class JobDatabase:
-    def __init__(self, db_path="data/jobs.db"):
+    def __init__(self, db_path=None, read_only=False, journal_mode=None):
+        if db_path is None:
+            # Imported here so JobDatabase(path) never needs config
+            from config import Config
+            db_path = Config.DATABASE_PATH
         self.db_path = db_path
-        # Create data directory if it doesn't exist
-        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.read_only = read_only
+        self.journal_mode = journal_mode
+        if read_only:
+            # Never create or migrate anything; the file must already exist
+            return
+        # Create data directory if it doesn't exist (os.path keeps the import
+        # cheap for the database-only CLI commands)
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
         self.init_database()
     
+    def _connect(self):
+        """Open a connection with the settings every operation relies on"""
+        if self.read_only:
+            # mode=ro refuses writes at the SQLite level (API server, dashboards)
+            uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA query_only = ON')
+            return conn
+        # Generous busy timeout: crawl workers may write concurrently
+        return sqlite3.connect(self.db_path, timeout=30)
+    
     def init_database(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
+        # WAL lets readers (--serve, --export) keep reading while a scrape
+        # writes. It needs shared memory, so DB_JOURNAL_MODE=DELETE is the
+        # escape hatch for databases on network filesystems.
+        journal_mode = self.journal_mode
+        if journal_mode is None:
+            from config import Config
+            journal_mode = Config.DB_JOURNAL_MODE
+        # Lets cleanup_old_jobs() hand freed pages back to the filesystem.
+        # Only takes effect on a new database; cleanup converts older ones.
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        if journal_mode:
+            if journal_mode.upper() not in JOURNAL_MODES:
+                raise ValueError(f"DB_JOURNAL_MODE must be one of {', '.join(JOURNAL_MODES)}")
+            cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+        
         # Create jobs table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS jobs (
@@ -29,11 +209,21 @@ class JobDatabase:
                 url TEXT UNIQUE NOT NULL,
                 description TEXT,
                 salary TEXT,
+                salary_min REAL,
+                salary_max REAL,
+                salary_currency TEXT,
+                salary_period TEXT,
+                salary_usd_month REAL,
                 job_type TEXT,
+                contact_person TEXT,
                 posted_date TIMESTAMP,
+                date_updated TIMESTAMP,
                 keyword_matched TEXT,
                 scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                sent_to_discord BOOLEAN DEFAULT FALSE
+                content_hash TEXT,
+                last_changed_at TIMESTAMP,
+                sent_to_discord BOOLEAN DEFAULT FALSE,
+                discord_message_id TEXT
             )
         ''')
         
@@ -48,17 +238,402 @@ class JobDatabase:
             )
         ''')
         
+        # Which pattern found each job-page field, per run (extraction_health.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS extraction_stats (
+                run_id INTEGER NOT NULL,
+                run_at TIMESTAMP NOT NULL,
+                field TEXT NOT NULL,
+                source TEXT NOT NULL,
+                pages INTEGER NOT NULL,
+                PRIMARY KEY (run_id, field, source)
+            )
+        ''')
+        
         # Create index for faster queries
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_posted_date ON jobs(posted_date)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_scraped_at ON jobs(scraped_at)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sent_discord ON jobs(sent_to_discord)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_keyword_posted ON jobs(keyword_matched, posted_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_posted_job ON jobs(posted_date, job_id)')
+        
+        # Summary tables maintained by STATS_TRIGGERS
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS job_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_jobs INTEGER NOT NULL DEFAULT 0,
+                sent_jobs INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        for table, keys in _STATS_BUCKETS + [(ARCHIVED_ROLLUP_TABLE, _ROLLUP_KEYS)]:
+            columns = ''.join(f'{column} TEXT NOT NULL, ' for column, _ in keys)
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {columns}
+                    total_jobs INTEGER NOT NULL DEFAULT 0,
+                    sent_jobs INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY ({', '.join(column for column, _ in keys)})
+                )
+            ''')
         
         conn.commit()
+        self._migrate(conn)
         conn.close()
     
+    def _migrate(self, conn):
+        """Apply one-off schema changes for databases older than SCHEMA_VERSION"""
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        
+        with conn:
+            if version < 1:
+                # Stats triggers plus a backfill from any existing rows
+                for sql in STATS_TRIGGERS.values():
+                    conn.execute(sql)
+                self._rebuild_stats(conn)
+            
+            if version < 2:
+                # DATE UPDATED from the job page, parsed to a timestamp
+                self._add_column(conn, 'jobs', 'date_updated', 'TIMESTAMP')
+            
+            if version < 3:
+                # Numeric salary columns, backfilled from the free-text salary
+                for column, definition in SALARY_COLUMNS.items():
+                    self._add_column(conn, 'jobs', column, definition)
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_salary_usd_month ON jobs(salary_usd_month)')
+                self._backfill_salaries(conn)
+            
+            if version < 4:
+                # Change detection for upserts
+                self._add_column(conn, 'jobs', 'content_hash', 'TEXT')
+                self._add_column(conn, 'jobs', 'last_changed_at', 'TIMESTAMP')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_last_changed ON jobs(last_changed_at)')
+                self._backfill_content_hashes(conn)
+            
+            if version < 5:
+                # contact_person used to be dropped on save; it is also part
+                # of the content hash now, so rehash every row
+                self._add_column(conn, 'jobs', 'contact_person', 'TEXT')
+                conn.execute('UPDATE jobs SET content_hash = NULL')
+                self._backfill_content_hashes(conn)
+            
+            if version < 6:
+                # Keyset pagination index for the JSON API
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_posted_job ON jobs(posted_date, job_id)')
+            
+            if version < 7:
+                # Text is normalised before saving now; bring older rows in
+                # line and rehash them, or every re-save would count as a change
+                self._normalize_rows(conn)
+                conn.execute('UPDATE jobs SET content_hash = NULL')
+                self._backfill_content_hashes(conn)
+            
+            if version < 8:
+                # job_rollup_daily: the update trigger now also watches
+                # job_type and salary_usd_month, so replace the triggers
+                self._recreate_stats_triggers(conn)
+                self._rebuild_stats(conn)
+            
+            if version < 9:
+                # Webhook message of a notify-first preview, edited later
+                self._add_column(conn, 'jobs', 'discord_message_id', 'TEXT')
+            
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    
+    @staticmethod
+    def _add_column(conn, table, column, definition):
+        """ALTER TABLE ADD COLUMN unless the column already exists"""
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        if column not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    
+    @staticmethod
+    def _recreate_stats_triggers(conn):
+        """Replace the stats triggers with the current STATS_TRIGGERS definitions"""
+        for name, sql in STATS_TRIGGERS.items():
+            # main.: never another attached database's triggers (merge)
+            conn.execute(f'DROP TRIGGER IF EXISTS main.{name}')
+            conn.execute(sql)
+    
+    def _rebuild_stats(self, conn):
+        """Recompute the job_stats* summary tables from scratch"""
+        conn.execute('DELETE FROM job_stats')
+        conn.execute('''
+            INSERT INTO job_stats (id, total_jobs, sent_jobs)
+            SELECT 1, COUNT(*), COALESCE(SUM(CASE WHEN sent_to_discord THEN 1 ELSE 0 END), 0)
+            FROM jobs
+        ''')
+        for table, keys in _STATS_BUCKETS:
+            columns = ', '.join(column for column, _ in keys)
+            values = ', '.join(expr.format(row='jobs') for _, expr in keys)
+            groups = ', '.join(str(position) for position in range(1, len(keys) + 1))
+            conn.execute(f'DELETE FROM {table}')
+            conn.execute(f'''
+                INSERT INTO {table} ({columns}, total_jobs, sent_jobs)
+                SELECT {values}, COUNT(*), SUM(CASE WHEN sent_to_discord THEN 1 ELSE 0 END)
+                FROM jobs
+                GROUP BY {groups}
+            ''')
+    
+    def _backfill_salaries(self, conn, chunk_size=1000):
+        """Parse free-text salaries of rows that have no numeric salary yet"""
+        from salary import salary_fields
+        
+        updated = 0
+        last_rowid = 0
+        while True:
+            rows = conn.execute('''
+                SELECT rowid, salary FROM jobs
+                WHERE rowid > ? AND salary_currency IS NULL AND COALESCE(salary, '') != ''
+                ORDER BY rowid LIMIT ?
+            ''', (last_rowid, chunk_size)).fetchall()
+            if not rows:
+                return updated
+            last_rowid = rows[-1][0]
+            
+            params = []
+            for rowid, text in rows:
+                fields = salary_fields(text)
+                if fields['salary_currency']:
+                    params.append([fields[column] for column in SALARY_COLUMNS] + [rowid])
+            assignments = ', '.join(f'{column} = ?' for column in SALARY_COLUMNS)
+            conn.executemany(f'UPDATE jobs SET {assignments} WHERE rowid = ?', params)
+            updated += len(params)
+    
+    def _normalize_rows(self, conn, chunk_size=1000):
+        """Apply normalize.py to the text columns of existing rows"""
+        from normalize import clean_company, clean_description, clean_text
+        
+        last_rowid = 0
+        while True:
+            rows = conn.execute('''
+                SELECT rowid, title, company, contact_person, description FROM jobs
+                WHERE rowid > ? ORDER BY rowid LIMIT ?
+            ''', (last_rowid, chunk_size)).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            
+            params = []
+            for rowid, title, company, contact_person, description in rows:
+                cleaned = (
+                    clean_text(title) or title,
+                    (clean_company(company) or 'Company not listed') if company is not None else None,
+                    clean_text(contact_person) if contact_person else contact_person,
+                    clean_description(description) if description else description,
+                )
+                if cleaned != (title, company, contact_person, description):
+                    params.append(cleaned + (rowid,))
+            conn.executemany(
+                'UPDATE jobs SET title = ?, company = ?, contact_person = ?, description = ? WHERE rowid = ?',
+                params
+            )
+    
+    def _backfill_content_hashes(self, conn, chunk_size=1000):
+        """Hash existing rows so their first re-save isn't seen as a change"""
+        columns = ', '.join(CONTENT_COLUMNS)
+        last_rowid = 0
+        while True:
+            rows = conn.execute(f'''
+                SELECT rowid, {columns} FROM jobs
+                WHERE rowid > ? AND content_hash IS NULL
+                ORDER BY rowid LIMIT ?
+            ''', (last_rowid, chunk_size)).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            conn.executemany(
+                'UPDATE jobs SET content_hash = ?, last_changed_at = COALESCE(last_changed_at, scraped_at) WHERE rowid = ?',
+                [(content_hash(dict(zip(CONTENT_COLUMNS, row[1:]))), row[0]) for row in rows]
+            )
+    
+    def backfill_salaries(self):
+        """Fill the numeric salary columns for existing rows; returns rows updated"""
+        conn = self._connect()
+        with conn:
+            updated = self._backfill_salaries(conn)
+        conn.close()
+        return updated
+    
+    def rebuild_stats(self):
+        """Recompute stats summary tables (e.g. after bulk edits with triggers off)"""
+        conn = self._connect()
+        with conn:
+            self._rebuild_stats(conn)
+        conn.close()
+
+    def merge(self, source_paths):
+        """Merge other jobs.db files (e.g. CI matrix shards) into this database
+
+        Each source is ATTACHed and merged with one set-based upsert per
+        table. For a job in several databases the most recently refreshed
+        copy (last_changed_at, else scraped_at) wins, but scraped_at and
+        keyword_matched come from the copy seen first and sent_to_discord is
+        OR'd so nothing is notified twice. A source job whose url is already
+        here under another job_id is skipped and counted. scrape_history and extraction_stats rows are copied (rows
+        already present are skipped, so merging a shard twice is harmless).
+        The stats triggers are dropped during the merge and the summary
+        tables rebuilt once afterwards. Sources are only read; older schemas
+        contribute the columns they have and the rest is backfilled.
+
+        Every source is attached and checked before anything is written, and
+        the whole merge runs in one transaction: if it fails, this database
+        is left exactly as it was.
+
+        Returns [(path, rows in source, rows inserted or updated, url conflicts skipped)].
+        """
+        sources = []
+        for path in source_paths:
+            if os.path.abspath(path) == os.path.abspath(self.db_path) or path in sources:
+                continue
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No such database: {path}")
+            sources.append(path)
+
+        conn = self._connect()
+        # SQLite can't DETACH inside the transaction, so all sources are attached at once
+        limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) if hasattr(conn, 'getlimit') else 10
+        if len(sources) > limit:
+            conn.close()
+            raise ValueError(f"Can merge at most {limit} databases at once; merge the rest into the output in a second pass")
+
+        target_columns = [row[1] for row in conn.execute('PRAGMA table_info(jobs)')]
+        schemas = []
+        results = []
+        try:
+            for number, path in enumerate(sources):
+                schema = f'source{number}'
+                try:
+                    conn.execute(f'ATTACH DATABASE ? AS {schema}', (f"file:{quote(os.path.abspath(path))}?mode=ro",))
+                    schemas.append(schema)
+                    conn.execute(f'SELECT COUNT(*) FROM {schema}.jobs').fetchone()
+                except sqlite3.DatabaseError as e:
+                    raise sqlite3.DatabaseError(f"{path} is not a jobs database: {e}") from e
+
+            conn.execute('BEGIN')
+            try:
+                for name in STATS_TRIGGERS:
+                    conn.execute(f'DROP TRIGGER IF EXISTS main.{name}')
+                for path, schema in zip(sources, schemas):
+                    results.append((path,) + self._merge_attached(conn, schema, target_columns))
+                # Rows from shards with an older schema; before the triggers
+                # come back so the backfill doesn't touch the summary tables
+                self._backfill_salaries(conn)
+                self._backfill_content_hashes(conn)
+                self._recreate_stats_triggers(conn)
+                self._rebuild_stats(conn)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+            for schema in schemas:
+                conn.execute(f'DETACH DATABASE {schema}')
+            conn.execute('ANALYZE')
+        finally:
+            conn.close()
+        return results
+
+    @staticmethod
+    def _merge_attached(conn, schema, target_columns):
+        """Upsert the ATTACHed database schema into main
+
+        Returns (source rows, rows written, rows skipped for a url conflict).
+        """
+        source_columns = {row[1] for row in conn.execute(f'PRAGMA {schema}.table_info(jobs)')}
+        columns = [column for column in target_columns if column in source_columns]
+        column_list = ', '.join(columns)
+
+        # scraped_at is when a job was first seen; last_changed_at when its
+        # content was last refreshed (missing in the oldest schemas)
+        freshness = "COALESCE({row}.last_changed_at, {row}.scraped_at, '')"
+        newer = f"{freshness.format(row='excluded')} > {freshness.format(row='jobs')}"
+        # The copy seen first; it keeps scraped_at and the keyword that found it
+        older = '(excluded.scraped_at < jobs.scraped_at OR (jobs.scraped_at IS NULL AND excluded.scraped_at IS NOT NULL))'
+        assignments = []
+        for column in columns:
+            if column == 'job_id':
+                continue
+            if column == 'scraped_at':
+                assignments.append(
+                    'scraped_at = MIN(COALESCE(jobs.scraped_at, excluded.scraped_at), '
+                    'COALESCE(excluded.scraped_at, jobs.scraped_at))'
+                )
+            elif column == 'keyword_matched' and 'scraped_at' in columns:
+                assignments.append(
+                    f'keyword_matched = CASE WHEN {older} THEN excluded.keyword_matched ELSE jobs.keyword_matched END'
+                )
+            elif column == 'sent_to_discord':
+                assignments.append('sent_to_discord = (jobs.sent_to_discord OR excluded.sent_to_discord)')
+            elif column == 'discord_message_id':
+                assignments.append(
+                    f'discord_message_id = CASE WHEN {newer} '
+                    f'THEN COALESCE(excluded.discord_message_id, jobs.discord_message_id) '
+                    f'ELSE COALESCE(jobs.discord_message_id, excluded.discord_message_id) END'
+                )
+            else:
+                assignments.append(f'{column} = CASE WHEN {newer} THEN excluded.{column} ELSE jobs.{column} END')
+        conditions = [newer]
+        if 'scraped_at' in columns:
+            conditions.append(older)
+        if 'sent_to_discord' in columns:
+            conditions.append('(excluded.sent_to_discord AND NOT jobs.sent_to_discord)')
+        if 'discord_message_id' in columns:
+            conditions.append('(jobs.discord_message_id IS NULL AND excluded.discord_message_id IS NOT NULL)')
+
+        source_rows = conn.execute(f'SELECT COUNT(*) FROM {schema}.jobs').fetchone()[0]
+        # url is UNIQUE too: a source row whose url belongs to another job_id
+        # here is skipped (the job already here keeps it) and counted
+        url_conflict = 'EXISTS (SELECT 1 FROM main.jobs AS j WHERE j.url = s.url AND j.job_id != s.job_id)'
+        url_conflicts = conn.execute(f'SELECT COUNT(*) FROM {schema}.jobs AS s WHERE {url_conflict}').fetchone()[0]
+        before = conn.total_changes
+        conn.execute(f'''
+            INSERT INTO jobs ({column_list})
+            SELECT {column_list} FROM {schema}.jobs AS s WHERE NOT {url_conflict}
+            ON CONFLICT(job_id) DO UPDATE SET {', '.join(assignments)}
+            WHERE {' OR '.join(conditions)}
+        ''')
+        written = conn.total_changes - before
+
+        conn.execute(f'''
+            INSERT INTO scrape_history (scrape_date, jobs_found, new_jobs, keywords_searched)
+            SELECT scrape_date, jobs_found, new_jobs, keywords_searched FROM {schema}.scrape_history AS s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM scrape_history AS h
+                WHERE h.scrape_date IS s.scrape_date AND h.keywords_searched IS s.keywords_searched
+                  AND h.jobs_found IS s.jobs_found AND h.new_jobs IS s.new_jobs
+            )
+            ORDER BY s.id
+        ''')
+
+        source_tables = {row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")}
+        if 'extraction_stats' in source_tables:
+            # Each source run gets a fresh run_id after the ones already here
+            conn.execute(f'''
+                INSERT INTO extraction_stats (run_id, run_at, field, source, pages)
+                SELECT s.run_id + (SELECT COALESCE(MAX(run_id), 0) FROM main.extraction_stats),
+                       s.run_at, s.field, s.source, s.pages
+                FROM {schema}.extraction_stats AS s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM main.extraction_stats AS e
+                    WHERE e.run_at = s.run_at AND e.field = s.field AND e.source = s.source AND e.pages = s.pages
+                )
+            ''')
+        if ARCHIVED_ROLLUP_TABLE in source_tables:
+            keys = ', '.join(column for column, _ in _ROLLUP_KEYS)
+            conn.execute(f'''
+                INSERT INTO {ARCHIVED_ROLLUP_TABLE} ({keys}, total_jobs, sent_jobs)
+                SELECT {keys}, total_jobs, sent_jobs FROM {schema}.{ARCHIVED_ROLLUP_TABLE} WHERE true
+                ON CONFLICT({keys}) DO UPDATE SET
+                    total_jobs = total_jobs + excluded.total_jobs,
+                    sent_jobs = sent_jobs + excluded.sent_jobs
+            ''')
+        return source_rows, written, url_conflicts
+
     def job_exists(self, job_id):
         """Check if job already exists in database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT 1 FROM jobs WHERE job_id = ?', (job_id,))
@@ -67,85 +642,194 @@ class JobDatabase:
         conn.close()
         return exists
     
-    def save_job(self, job_data):
-        """Save job data to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _job_row(self, job):
+        """Map a JobRecord (or legacy job dict) to jobs table columns"""
+        job = JobRecord.coerce(job)
+        row = job.to_row()
+        
+        if job.salary_usd_month is None and job.salary:
+            from salary import salary_fields
+            row.update(salary_fields(job.salary))
+        
+        row.pop('sent_to_discord')  # Only ever changed by mark_as_sent
+        row.pop('discord_message_id')
+        row['salary'] = row['salary'] or ''
+        row['description'] = row['description'] or ''
+        row['job_type'] = row['job_type'] or ''
+        row['contact_person'] = row['contact_person'] or ''
+        row['last_changed_at'] = datetime.now()
+        row['content_hash'] = content_hash(row)
+        return row
+    
+    def upsert_job(self, job):
+        """Insert a job, or update it only if its content changed
+        
+        Returns 'inserted', 'updated' or 'unchanged' ('unchanged' costs no
+        write), or None on a database error. The sent_to_discord flag,
+        keyword_matched and scraped_at of an existing job are kept.
+        """
+        row = self._job_row(job)
+        columns = list(row)
+        updates = ', '.join(
+            f'{column} = excluded.{column}' for column in columns if column not in INSERT_ONLY_COLUMNS
+        )
         
+        conn = self._connect()
         try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO jobs 
-                (job_id, title, company, url, description, salary, job_type, 
-                 posted_date, keyword_matched, scraped_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job_data['job_id'],
-                job_data['title'],
-                job_data['company'],
-                job_data['url'],
-                job_data.get('description', ''),
-                job_data.get('salary', ''),
-                job_data.get('job_type', ''),
-                job_data['posted_date'],
-                job_data['keyword_matched'],
-                job_data['scraped_at']
-            ))
+            existing = conn.execute(
+                'SELECT content_hash FROM jobs WHERE job_id = ?', (row['job_id'],)
+            ).fetchone()
+            if existing and existing[0] == row['content_hash']:
+                return 'unchanged'
+            if not existing:
+                # New jobs have not "changed" since they were first scraped
+                row['last_changed_at'] = row['scraped_at']
             
-            conn.commit()
-            return True
+            with conn:
+                conn.execute(f'''
+                    INSERT INTO jobs ({', '.join(columns)})
+                    VALUES ({', '.join('?' for _ in columns)})
+                    ON CONFLICT(job_id) DO UPDATE SET {updates}
+                    WHERE jobs.content_hash IS NOT excluded.content_hash
+                ''', [row[column] for column in columns])
+            return 'updated' if existing else 'inserted'
             
         except sqlite3.Error as e:
             print(f"Database error: {e}")
-            return False
+            return None
         finally:
             conn.close()
     
+    def save_job(self, job):
+        """Save a JobRecord (or legacy job dict) to the database"""
+        return self.upsert_job(job) is not None
+    
+    def get_changed_jobs(self, since=None, limit=100):
+        """Jobs edited after they were first saved, most recently changed first"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        query = '''
+            SELECT job_id, title, company, url, salary, posted_date, keyword_matched,
+                   scraped_at, last_changed_at
+            FROM jobs
+            WHERE last_changed_at > scraped_at
+        '''
+        params = []
+        if since:
+            query += ' AND last_changed_at >= ?'
+            params.append(since)
+        query += ' ORDER BY last_changed_at DESC LIMIT ?'
+        params.append(limit)
+        
+        cursor.execute(query, params)
+        columns = [description[0] for description in cursor.description]
+        jobs = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        conn.close()
+        return jobs
+    
     def get_unsent_jobs(self):
-        """Get jobs that haven't been sent to Discord yet"""
-        conn = sqlite3.connect(self.db_path)
+        """Get jobs that haven't been sent to Discord yet, as JobRecords"""
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT job_id, title, company, url, description, salary, job_type, 
-                   posted_date, keyword_matched
+        cursor.execute(f'''
+            SELECT {', '.join(STORED_FIELDS)}
             FROM jobs 
             WHERE sent_to_discord = FALSE
             ORDER BY posted_date DESC
         ''')
         
-        jobs = cursor.fetchall()
+        jobs = [JobRecord.from_row(STORED_FIELDS, row) for row in cursor.fetchall()]
         conn.close()
+        return jobs
+    
+    def get_jobs_by_salary(self, min_usd_month, max_usd_month=None, limit=100):
+        """Jobs paying at least min_usd_month (USD per month), best paid first"""
+        conn = self._connect()
+        cursor = conn.cursor()
         
-        # Convert to list of dictionaries
-        job_list = []
-        for job in jobs:
-            job_dict = {
-                'job_id': job[0],
-                'title': job[1],
-                'company': job[2],
-                'url': job[3],
-                'description': job[4],
-                'salary': job[5],
-                'job_type': job[6],
-                'posted_date': job[7],
-                'keyword_matched': job[8]
-            }
-            job_list.append(job_dict)
+        query = '''
+            SELECT job_id, title, company, url, salary, salary_usd_month, posted_date, keyword_matched
+            FROM jobs
+            WHERE salary_usd_month >= ?
+        '''
+        params = [min_usd_month]
+        if max_usd_month is not None:
+            query += ' AND salary_usd_month <= ?'
+            params.append(max_usd_month)
+        query += ' ORDER BY salary_usd_month DESC LIMIT ?'
+        params.append(limit)
         
-        return job_list
+        cursor.execute(query, params)
+        columns = [description[0] for description in cursor.description]
+        jobs = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        conn.close()
+        return jobs
+    
+    def iter_corpus_texts(self, limit=5000):
+        """Title + description of the most recently scraped jobs (relevance IDF corpus)"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                'SELECT title, description FROM jobs ORDER BY scraped_at DESC LIMIT ?', (limit,)
+            )
+            for title, description in cursor:
+                yield f"{title or ''} {description or ''}"
+        finally:
+            conn.close()
+    
+    def get_date_updated(self, job_ids):
+        """{job_id: stored DATE UPDATED (datetime or None)} for the given IDs"""
+        job_ids = list(job_ids)
+        result = {}
+        conn = self._connect()
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            for job_id, value in conn.execute(
+                f'SELECT job_id, date_updated FROM jobs WHERE job_id IN ({placeholders})', chunk
+            ):
+                result[job_id] = datetime.fromisoformat(value) if value else None
+        conn.close()
+        return result
+    
+    def get_sent_job_ids(self, job_ids):
+        """Return the subset of job_ids already marked as sent to Discord"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return set()
+        conn = self._connect()
+        placeholders = ', '.join('?' for _ in job_ids)
+        rows = conn.execute(
+            f'SELECT job_id FROM jobs WHERE sent_to_discord = TRUE AND job_id IN ({placeholders})',
+            job_ids
+        ).fetchall()
+        conn.close()
+        return {row[0] for row in rows}
     
-    def mark_as_sent(self, job_id):
-        """Mark job as sent to Discord"""
-        conn = sqlite3.connect(self.db_path)
+    def mark_as_sent(self, job_id, message_id=None):
+        """Mark job as sent to Discord, keeping the webhook message ID if there is one"""
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute('UPDATE jobs SET sent_to_discord = TRUE WHERE job_id = ?', (job_id,))
+        cursor.execute('''
+            UPDATE jobs SET sent_to_discord = TRUE, discord_message_id = COALESCE(?, discord_message_id)
+            WHERE job_id = ?
+        ''', (message_id, job_id))
         conn.commit()
         conn.close()
     
+    def get_discord_message_id(self, job_id):
+        """Webhook message ID of the job's own Discord message, or None"""
+        conn = self._connect()
+        row = conn.execute('SELECT discord_message_id FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        conn.close()
+        return row[0] if row else None
+    
     def get_recent_jobs(self, days=7):
         """Get jobs from the last N days"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -159,9 +843,127 @@ class JobDatabase:
         conn.close()
         return jobs
     
+    def _job_filters(self, since=None, until=None, keyword=None, min_salary=None):
+        """WHERE conditions and parameters shared by iter_jobs() and page_jobs()
+        
+        since/until are 'YYYY-MM-DD' strings (until is inclusive), keyword
+        filters on keyword_matched and min_salary on salary_usd_month; all
+        are served by the indexes.
+        """
+        conditions = []
+        params = []
+        if min_salary is not None:
+            conditions.append('salary_usd_month >= ?')
+            params.append(min_salary)
+        if keyword:
+            conditions.append('keyword_matched = ?')
+            params.append(keyword)
+        if since:
+            conditions.append('posted_date >= ?')
+            params.append(since)
+        if until:
+            conditions.append("posted_date < date(?, '+1 day')")
+            params.append(until)
+        return conditions, params
+    
+    def iter_jobs(self, since=None, until=None, keyword=None, min_salary=None, chunk_size=1000):
+        """Stream jobs as dicts in chunks, oldest first, without loading the table"""
+        conditions, params = self._job_filters(since, until, keyword, min_salary)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs {where} ORDER BY posted_date, job_id",
+                params
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(JOB_COLUMNS, row))
+        finally:
+            conn.close()
+    
+    def page_jobs(self, after=None, limit=50, search=None, **filters):
+        """One page of jobs, newest first, using keyset pagination
+        
+        after is the (posted_date, job_id) of the last row of the previous
+        page, so each page is an index seek on idx_posted_job rather than an
+        OFFSET scan. Jobs without a posted_date come last. search matches
+        title/description (LIKE). Returns (rows as dicts, next cursor or None).
+        """
+        conditions, params = self._job_filters(**filters)
+        if search:
+            conditions.append("(title LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')")
+            pattern = '%' + search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            params += [pattern, pattern]
+        
+        # Dated rows first, then the undated tail (NULL never compares in a row value)
+        segments = []
+        if after is None or after[0] is not None:
+            keyset = ['posted_date IS NOT NULL']
+            keyset_params = []
+            if after is not None:
+                keyset.append('(posted_date, job_id) < (?, ?)')
+                keyset_params = list(after)
+            segments.append((keyset, keyset_params))
+        undated = ['posted_date IS NULL']
+        undated_params = []
+        if after is not None and after[0] is None:
+            undated.append('job_id < ?')
+            undated_params = [after[1]]
+        segments.append((undated, undated_params))
+        
+        conn = self._connect()
+        rows = []
+        try:
+            for keyset, keyset_params in segments:
+                where = ' AND '.join(conditions + keyset)
+                rows += conn.execute(
+                    f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE {where} "
+                    f"ORDER BY posted_date DESC, job_id DESC LIMIT ?",
+                    params + keyset_params + [limit + 1 - len(rows)]
+                ).fetchall()
+                if len(rows) > limit:
+                    break
+        finally:
+            conn.close()
+        
+        jobs = [dict(zip(JOB_COLUMNS, row)) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = (jobs[-1]['posted_date'], jobs[-1]['job_id'])
+        return jobs, next_cursor
+    
+    def get_job(self, job_id):
+        """A single job as a dict, or None"""
+        conn = self._connect()
+        row = conn.execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        conn.close()
+        return dict(zip(JOB_COLUMNS, row)) if row else None
+    
+    def get_write_token(self):
+        """Short token that changes whenever jobs or scrape history are written
+        
+        Built from the trigger-maintained totals, the newest last_changed_at
+        (indexed) and the newest scrape_history id, so it costs three index
+        lookups. Used for HTTP ETags.
+        """
+        conn = self._connect()
+        totals = conn.execute('SELECT total_jobs, sent_jobs FROM job_stats WHERE id = 1').fetchone()
+        last_changed = conn.execute('SELECT MAX(last_changed_at) FROM jobs').fetchone()[0]
+        last_scrape = conn.execute('SELECT MAX(id) FROM scrape_history').fetchone()[0]
+        conn.close()
+        text = f"{totals}|{last_changed}|{last_scrape}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+    
     def log_scrape(self, jobs_found, new_jobs, keywords):
         """Log scraping session"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -172,25 +974,56 @@ class JobDatabase:
         conn.commit()
         conn.close()
     
-    def get_stats(self):
-        """Get database statistics"""
-        conn = sqlite3.connect(self.db_path)
+    def log_extraction(self, rows):
+        """Log a run's (field, source, pages) extraction counts"""
+        run_at = datetime.now().isoformat(timespec='seconds')
+        conn = self._connect()
+        with conn:
+            run_id = conn.execute('SELECT COALESCE(MAX(run_id), 0) + 1 FROM extraction_stats').fetchone()[0]
+            conn.executemany(
+                'INSERT INTO extraction_stats (run_id, run_at, field, source, pages) VALUES (?, ?, ?, ?, ?)',
+                [(run_id, run_at, field, source, pages) for field, source, pages in rows]
+            )
+        conn.close()
+    
+    def get_extraction_stats(self):
+        """Last run's extraction counts: (run_at, {field: {source: pages}}), or None"""
+        conn = self._connect()
         cursor = conn.cursor()
         
-        # Total jobs
-        cursor.execute('SELECT COUNT(*) FROM jobs')
-        total_jobs = cursor.fetchone()[0]
+        cursor.execute('''
+            SELECT run_at, field, source, pages FROM extraction_stats
+            WHERE run_id = (SELECT MAX(run_id) FROM extraction_stats)
+            ORDER BY field, pages DESC
+        ''')
+        rows = cursor.fetchall()
+        conn.close()
+        
+        if not rows:
+            return None
+        fields = {}
+        for _, field, source, pages in rows:
+            fields.setdefault(field, {})[source] = pages
+        return rows[0][0], fields
+    
+    def get_stats(self):
+        """Get database statistics from the trigger-maintained summary tables"""
+        conn = self._connect()
+        cursor = conn.cursor()
         
-        # Jobs sent to Discord
-        cursor.execute('SELECT COUNT(*) FROM jobs WHERE sent_to_discord = TRUE')
-        sent_jobs = cursor.fetchone()[0]
+        # Totals (single row)
+        cursor.execute('SELECT total_jobs, sent_jobs FROM job_stats WHERE id = 1')
+        total_jobs, sent_jobs = cursor.fetchone() or (0, 0)
         
-        # Recent jobs (last 7 days)
-        cursor.execute('SELECT COUNT(*) FROM jobs WHERE posted_date >= datetime("now", "-7 days")')
+        # Recent jobs (last 7 days) - at most a handful of day buckets
+        cursor.execute('''
+            SELECT COALESCE(SUM(total_jobs), 0) FROM job_stats_daily
+            WHERE day >= date('now', '-7 days') AND day != 'unknown'
+        ''')
         recent_jobs = cursor.fetchone()[0]
         
         # Last scrape
-        cursor.execute('SELECT scrape_date, new_jobs FROM scrape_history ORDER BY scrape_date DESC LIMIT 1')
+        cursor.execute('SELECT scrape_date, new_jobs FROM scrape_history ORDER BY id DESC LIMIT 1')
         last_scrape = cursor.fetchone()
         
         conn.close()
@@ -203,15 +1036,145 @@ class JobDatabase:
             'last_scrape': last_scrape
         }
     
-    def cleanup_old_jobs(self, days=30):
-        """Remove jobs older than N days to keep database size manageable"""
-        conn = sqlite3.connect(self.db_path)
+    def get_keyword_stats(self):
+        """Get per-keyword job counts, busiest keyword first"""
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute('DELETE FROM jobs WHERE posted_date < datetime("now", "-{} days")'.format(days))
-        deleted = cursor.rowcount
+        cursor.execute('''
+            SELECT keyword, total_jobs, sent_jobs
+            FROM job_stats_keyword
+            ORDER BY total_jobs DESC, keyword
+        ''')
+        rows = cursor.fetchall()
+        conn.close()
         
-        conn.commit()
+        return [
+            {
+                'keyword': keyword,
+                'total_jobs': total,
+                'sent_jobs': sent,
+                'unsent_jobs': total - sent
+            }
+            for keyword, total, sent in rows
+        ]
+    
+    def get_trends(self, days=30, keyword=None):
+        """Job counts for the last N posting days from job_rollup_daily
+        
+        Returns {'day': [...], 'keyword': [...], 'job_type': [...],
+        'salary_band': [...]}, each a list of (value, total_jobs, sent_jobs):
+        days oldest first, the other breakdowns busiest first.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        conditions = "day >= date('now', ?) AND day != 'unknown'"
+        params = [f'-{int(days)} days']
+        if keyword is not None:
+            conditions += ' AND keyword = ?'
+            params.append(keyword)
+        
+        trends = {}
+        for column in ('day', 'keyword', 'job_type', 'salary_band'):
+            order = 'day' if column == 'day' else 'SUM(total_jobs) DESC, 1'
+            # Archived jobs count too: their rows live in a table of their own
+            cursor.execute(f'''
+                SELECT {column}, SUM(total_jobs), SUM(sent_jobs)
+                FROM (
+                    SELECT * FROM job_rollup_daily WHERE {conditions}
+                    UNION ALL
+                    SELECT * FROM {ARCHIVED_ROLLUP_TABLE} WHERE {conditions}
+                )
+                GROUP BY {column}
+                ORDER BY {order}
+            ''', params * 2)
+            trends[column] = cursor.fetchall()
+        conn.close()
+        return trends
+    
+    def get_daily_stats(self, days=30):
+        """Get per-day job counts for the last N days, newest first"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT day, total_jobs, sent_jobs
+            FROM job_stats_daily
+            WHERE day >= date('now', ?) AND day != 'unknown'
+            ORDER BY day DESC
+        ''', (f'-{int(days)} days',))
+        rows = cursor.fetchall()
         conn.close()
         
-        return deleted
\ No newline at end of file
+        return [
+            {'day': day, 'total_jobs': total, 'sent_jobs': sent}
+            for day, total, sent in rows
+        ]
+    
+    def cleanup_old_jobs(self, days=30, archive=None, chunk_size=1000):
+        """Move jobs posted more than N days ago out of the database; return how many
+        
+        With an archive (archive.JobArchive) each chunk of rows is written to
+        it before being deleted, and their trend counts move to
+        job_rollup_archived. Without one the rows are simply deleted. Freed
+        pages are then returned to the filesystem and the planner statistics
+        refreshed.
+        """
+        columns = ', '.join(JOB_COLUMNS)
+        keys = ', '.join(column for column, _ in _ROLLUP_KEYS)
+        values = ', '.join(expr.format(row='jobs') for _, expr in _ROLLUP_KEYS)
+        groups = ', '.join(str(position) for position in range(1, len(_ROLLUP_KEYS) + 1))
+        
+        conn = self._connect()
+        moved = 0
+        while True:
+            rows = conn.execute(f'''
+                SELECT rowid, {columns} FROM jobs
+                WHERE posted_date < datetime('now', ?)
+                LIMIT ?
+            ''', (f'-{int(days)} days', chunk_size)).fetchall()
+            if not rows:
+                break
+            rowids = [(row[0],) for row in rows]
+            
+            if archive is not None:
+                # On disk (fsync) before the rows leave the database
+                archive.append(dict(zip(JOB_COLUMNS, row[1:])) for row in rows)
+            with conn:
+                if archive is not None:
+                    conn.execute('CREATE TEMP TABLE IF NOT EXISTS archived_rowids (id INTEGER PRIMARY KEY)')
+                    conn.execute('DELETE FROM archived_rowids')
+                    conn.executemany('INSERT INTO archived_rowids (id) VALUES (?)', rowids)
+                    conn.execute(f'''
+                        INSERT INTO {ARCHIVED_ROLLUP_TABLE} ({keys}, total_jobs, sent_jobs)
+                        SELECT {values}, COUNT(*), SUM(CASE WHEN sent_to_discord THEN 1 ELSE 0 END)
+                        FROM jobs WHERE rowid IN (SELECT id FROM archived_rowids)
+                        GROUP BY {groups}
+                        ON CONFLICT({keys}) DO UPDATE SET
+                            total_jobs = total_jobs + excluded.total_jobs,
+                            sent_jobs = sent_jobs + excluded.sent_jobs
+                    ''')
+                conn.executemany('DELETE FROM jobs WHERE rowid = ?', rowids)
+            moved += len(rows)
+        
+        if moved:
+            self._reclaim_space(conn)
+        conn.close()
+        return moved
+    
+    @staticmethod
+    def _reclaim_space(conn):
+        """Return free pages to the filesystem and refresh planner statistics"""
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            # Databases created before auto_vacuum was set need one full VACUUM
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+        else:
+            # execute() steps the pragma once, freeing a single page;
+            # executescript() runs it to completion
+            conn.executescript('PRAGMA incremental_vacuum;')
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if free_pages:
+            print(f"⚠️ {free_pages} free pages were not returned to the filesystem")
+        conn.execute('ANALYZE')
\ No newline at end of file
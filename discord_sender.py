@@ -6,31 +6,37 @@ Enhanced with beautiful embeds and smart formatting
 
 import requests
 import json
-import re
-import time
 from datetime import datetime
+from urllib.parse import parse_qsl
+from clock import REAL_CLOCK
 from config import Config
+from job_record import JobRecord
+from normalize import clean_title, summarize
+from salary import SalaryInfo, format_salary
 
 
 class DiscordSender:
-    def __init__(self):
+    def __init__(self, clock=None, session=None):
+        self.clock = clock or REAL_CLOCK  # Spacing between batches
+        self.session = session or requests.Session()  # Cassettes swap this (cassette.py)
         self.webhook_url = Config.DISCORD_WEBHOOK_URL
         self.max_embed_chars = 4096
         self.max_embeds_per_message = 10
     
-    def create_job_embed(self, job_data):
+    def create_job_embed(self, job):
         """Create a beautiful Discord embed using precisely extracted data"""
+        job = JobRecord.coerce(job)
         
-        # Use the clean extracted data
-        clean_title = job_data.get('clean_title') or self.clean_job_title(job_data.get('title', '')) or "Job Position"
-        contact_person = job_data.get('contact_person') or 'Not specified'
-        salary_info = job_data.get('salary_clean') or 'Not specified'
-        job_type = job_data.get('job_type_clean') or job_data.get('job_type', 'Not specified')
-        posted_date = job_data.get('posted_date_clean') or self.format_post_date(job_data.get('posted_date'))
+        # Text fields were normalised when the job was extracted (normalize.py)
+        clean_title = job.title or "Job Position"
+        contact_person = job.contact_person or 'Not specified'
+        salary_info = self.format_salary(job) or 'Not specified'
+        job_type = job.job_type or 'Not specified'
+        posted_date = job.posted_date_text or self.format_post_date(job.posted_date)
         
         embed = {
             "title": f"🔥 {clean_title}",
-            "url": job_data['url'],
+            "url": job.url,
             "color": 0x00ff88,
             "timestamp": datetime.utcnow().isoformat(),
             
@@ -52,7 +58,7 @@ class DiscordSender:
                 },
                 {
                     "name": "🎯 Keyword Match",
-                    "value": f"`{job_data.get('keyword_matched', 'N/A')}`",
+                    "value": f"`{job.keyword_matched or 'N/A'}`",
                     "inline": True
                 },
                 {
@@ -73,185 +79,51 @@ class DiscordSender:
         }
 
         # Add clean description
-        description = job_data.get('description', '').strip()
-        if description and len(description) > 50:
-            if len(description) > 400:
-                description = description[:350] + "..."
-            
-            embed["description"] = f"**📋 Job Description:**\n{description}"
+        description = job.description or ''
+        if len(description) > 50:
+            embed["description"] = f"**📋 Job Description:**\n{summarize(description)}"
         
         return embed
 
-
-
-
-    def clean_company_name(self, company):
-        """Clean up company name"""
-        if not company or company.strip() in ['', 'None', 'N/A']:
-            return 'Not specified'
-        
-        company = str(company).strip()
-        
-        # Remove common artifacts
-        company = re.sub(r'Displaying \d+ out of \d+\+ jobs', '', company)
-        company = re.sub(r'•.*$', '', company)  # Remove bullet points and after
-        company = re.sub(r'\s+', ' ', company).strip()
-        
-        # If company name is too long or looks weird, truncate
-        if len(company) > 50 or not re.search(r'[a-zA-Z]', company):
-            return 'Not specified'
-        
-        return company[:50]
-
-    def clean_job_title(self, title):
-        """Extract clean job title from messy OnlineJobs.ph format - AGGRESSIVE CLEANING"""
-        if not title:
-            return "Job Position"
-        
-        # Convert to string and strip
-        title = str(title).strip()
-        
-        # Remove common OnlineJobs.ph patterns (more aggressive)
-        patterns_to_remove = [
-            r'TYPE OF WORK.*?(?=\w{3,}|$)',  # Remove "TYPE OF WORK..." 
-            r'SALARY.*?(?=\w{3,}|$)',       # Remove "SALARY..."
-            r'HOURS PER WEEK.*?(?=\w{3,}|$)', # Remove "HOURS PER WEEK..."
-            r'Part Time|Full Time|Any',      # Remove job types
-            r'\$[\d,]+(?:\.\d{2})?(?:/\w+)?', # Remove salary amounts
-            r'PHP[\s\d,]+(?:/\w+)?',         # Remove PHP amounts
-            r'TBD|TBDDATE|UPDATE.*?\d{4}',   # Remove TBD, dates
-            r'•.*$',                         # Remove everything after bullet
-            r'[A-Z]{2,}\s*[A-Z]{2,}\s*[A-Z]{2,}.*$', # Remove ALLCAPS strings
-            r'\s*-\s*\d+$',                  # Remove trailing numbers
-        ]
-        
-        for pattern in patterns_to_remove:
-            title = re.sub(pattern, '', title, flags=re.IGNORECASE)
-        
-        # Clean up whitespace and extract meaningful title
-        title = re.sub(r'\s+', ' ', title).strip()
-        
-        # If title is now too short or empty, try to extract from start
-        if len(title) < 3:
-            original = str(title).strip()
-            # Look for the first meaningful words (3+ chars, not numbers/symbols)
-            words = re.findall(r'\b[A-Za-z]{3,}(?:\s+[A-Za-z]{2,}){0,4}\b', original)
-            if words:
-                title = words[0]
-            else:
-                title = "Job Position"
-        
-        # Final cleanup - remove any remaining artifacts
-        title = re.sub(r'^[^a-zA-Z]*', '', title)  # Remove leading non-letters
-        title = re.sub(r'[^a-zA-Z\s&()-]*$', '', title)  # Remove trailing junk
-        
-        return title[:60].strip()  # Keep reasonable length
-
-    def format_description(self, description):
-        """Format job description - MUCH cleaner"""
-        if not description or len(description.strip()) < 20:
-            return "Click title for full job details"
-        
-        # Convert to string and clean
-        desc = str(description).strip()
-        
-        # Remove OnlineJobs.ph artifacts more aggressively
-        artifacts_to_remove = [
-            r'READ UNTIL THE END!.*?(?=\w{3,}|$)',
-            r'DO NOT APPLY THROUGH ONLINE JOB!.*?(?=\w{3,}|$)', 
-            r'TYPE OF WORK.*?(?=\w{3,}|$)',
-            r'SALARY.*?(?=\w{3,}|$)',
-            r'HOURS PER WEEK.*?(?=\w{3,}|$)',
-            r'DATE UPDATE.*?\d{4}',
-            r'Posted on.*?\d{4}',
-            r'\$[\d,]+(?:\.\d{2})?(?:/\w+)?', # Remove salary mentions
-            r'PHP[\s\d,]+(?:/\w+)?',
-        ]
-        
-        for pattern in artifacts_to_remove:
-            desc = re.sub(pattern, '', desc, flags=re.IGNORECASE)
-        
-        # Clean up whitespace
-        desc = re.sub(r'\s+', ' ', desc).strip()
-        
-        # Intelligent truncation
-        if len(desc) > 300:
-            # Find last complete sentence under 250 chars
-            truncated = desc[:250]
-            last_sentence_end = max(
-                truncated.rfind('.'),
-                truncated.rfind('!'), 
-                truncated.rfind('?')
-            )
-            
-            if last_sentence_end > 100:
-                desc = desc[:last_sentence_end + 1]
-            else:
-                # Find last comma or space
-                last_break = max(truncated.rfind(','), truncated.rfind(' '))
-                if last_break > 100:
-                    desc = desc[:last_break] + "..."
-                else:
-                    desc = desc[:250] + "..."
-        
-        # If description is still messy or too short, provide fallback
-        if len(desc.strip()) < 20 or not re.search(r'[a-zA-Z]', desc):
-            return "Click title for full job details"
-        
-        return desc
-
-
-    def extract_salary_info(self, job_data):
-        """Extract salary information from title or description"""
-        text = f"{job_data['title']} {job_data.get('description', '')}"
-        
-        # Look for various salary patterns
-        salary_patterns = [
-            r'\$\d+(?:,\d{3})*(?:\.\d{2})?(?:\s*-\s*\$\d+(?:,\d{3})*(?:\.\d{2})?)?(?:\s*per\s*\w+)?',  # $1,000-$2,000 per month
-            r'PHP\s*\d+(?:,\d{3})*(?:\s*/\s*\w+)?',  # PHP 50,000/month
-            r'\d+(?:,\d{3})*\s*PHP(?:\s*/\s*\w+)?',  # 50,000 PHP/month
-            r'\$\d+(?:\.\d{2})?\s*(?:to\s*\$\d+(?:\.\d{2})?)?\s*(?:per|/)\s*hour',  # $15 to $25 per hour
-            r'\d+k\s*-\s*\d+k',  # 30k-50k
-            r'Starting\s+at\s+\d+(?:,\d{3})*\s*PHP',  # Starting at 45,000 PHP
+    def create_preview_embed(self, job):
+        """Short embed for a listing whose job page hasn't been fetched yet"""
+        job = JobRecord.coerce(job)
+        
+        # Still raw listing-card text at this point
+        title = clean_title(job.title) or job.title or "Job Position"
+        fields = [
+            {
+                "name": "🎯 Keyword Match",
+                "value": f"`{job.keyword_matched or 'N/A'}`",
+                "inline": True
+            },
+            {
+                "name": "📅 Posted",
+                "value": self.format_post_date(job.posted_date),
+                "inline": True
+            }
         ]
-        
-        for pattern in salary_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                salary = match.group().strip()
-                # Clean up and limit length
-                salary = re.sub(r'\s+', ' ', salary)
-                return salary[:50]  # Keep reasonable length
-        
-        # Check for existing salary field
-        if job_data.get('salary') and job_data['salary'].strip():
-            return job_data['salary'][:50]
-        
-        return None
+        if job.listing_contact:
+            fields.append({"name": "👤 Contact Person", "value": job.listing_contact, "inline": True})
+        
+        return {
+            "title": f"🔔 {title}",
+            "url": job.url,
+            "color": 0x5865f2,
+            "description": "⏳ Fetching salary, contact and description...",
+            "timestamp": datetime.utcnow().isoformat(),
+            "fields": fields,
+            "footer": {
+                "text": "OnlineJobs.ph • Click title to apply"
+            }
+        }
 
-    def format_description(self, description):
-        """Format job description for Discord"""
-        # Remove extra whitespace and clean up
-        desc = re.sub(r'\s+', ' ', description).strip()
-        
-        # Remove common OnlineJobs.ph artifacts
-        desc = re.sub(r'READ UNTIL THE END!\s*', '', desc, flags=re.IGNORECASE)
-        desc = re.sub(r'DO NOT APPLY THROUGH ONLINE JOB!\s*', '', desc, flags=re.IGNORECASE)
-        
-        # Truncate intelligently - find last complete sentence under 400 chars
-        if len(desc) > 400:
-            truncated = desc[:350]
-            last_period = truncated.rfind('.')
-            last_exclamation = truncated.rfind('!')
-            last_question = truncated.rfind('?')
-            last_sentence = max(last_period, last_exclamation, last_question)
-            
-            if last_sentence > 200:  # If we found a reasonable cutoff
-                desc = desc[:last_sentence + 1]
-            else:
-                desc = desc[:350] + "..."
-        
-        return desc
+    def format_salary(self, job):
+        """Salary for the embed: the normalised columns (salary.py), else the raw text"""
+        if job.salary_currency and job.salary_min is not None:
+            high = job.salary_max if job.salary_max is not None else job.salary_min
+            return format_salary(SalaryInfo(job.salary_min, high, job.salary_currency, job.salary_period))
+        return job.salary or None
 
     def format_post_date(self, posted_date):
         """Format posting date nicely"""
@@ -304,6 +176,8 @@ class DiscordSender:
             print("Error: Discord webhook URL not configured")
             return False
         
+        jobs = [JobRecord.coerce(job) for job in jobs]
+        
         # Split jobs into batches of 10 (Discord limit for embeds)
         batches = [jobs[i:i + 10] for i in range(0, len(jobs), 10)]
         total_success = 0
@@ -326,7 +200,7 @@ class DiscordSender:
                     "avatar_url": "https://www.onlinejobs.ph/assets/img/logo.png"
                 }
                 
-                response = requests.post(
+                response = self.session.post(
                     self.webhook_url,
                     data=json.dumps(payload),
                     headers={"Content-Type": "application/json"},
@@ -342,13 +216,13 @@ class DiscordSender:
                         from database import JobDatabase
                         db = JobDatabase()
                         for job in batch:
-                            db.mark_as_sent(job['job_id'])
+                            db.mark_as_sent(job.job_id)
                     except:
                         pass
                     
                     # Delay between batches to avoid rate limits
                     if batch_num < len(batches) - 1:  # Don't delay after last batch
-                        time.sleep(1.0)
+                        self.clock.sleep(1.0)
                 else:
                     print(f"Failed to send batch {batch_num + 1}. Status: {response.status_code}")
                     
@@ -357,13 +231,93 @@ class DiscordSender:
         
         # Send summary after all batches
         if jobs:
-            time.sleep(0.5)  # Small delay before summary
-            self.send_enhanced_summary(len(jobs), total_success, [job['keyword_matched'] for job in jobs])
+            self.clock.sleep(0.5)  # Small delay before summary
+            self.send_enhanced_summary(len(jobs), total_success, [job.keyword_matched for job in jobs])
         
         print(f"Successfully sent {total_success}/{len(jobs)} jobs to Discord")
         return total_success > 0
 
 
+    def _webhook_request(self, method, message_id=None, payload=None, wait=False):
+        """Call the webhook, or one of its messages, waiting out Discord's rate limits
+        
+        Returns the response, or None if the request itself failed.
+        """
+        base, _, query = self.webhook_url.partition('?')
+        url = f"{base}/messages/{message_id}" if message_id else base
+        params = dict(parse_qsl(query))  # Keeps thread_id=...
+        if wait:
+            params['wait'] = 'true'  # Answer with the message (and its ID)
+        
+        try:
+            for attempt in range(3):
+                response = self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    data=json.dumps(payload) if payload is not None else None,
+                    headers={"Content-Type": "application/json"},
+                    timeout=10
+                )
+                if response.status_code != 429:
+                    # Bucket empty: wait for it to refill before the next call
+                    if response.headers.get('X-RateLimit-Remaining') == '0':
+                        self.clock.sleep(float(response.headers.get('X-RateLimit-Reset-After', 1)))
+                    return response
+                try:
+                    retry_after = float(response.json().get('retry_after', 1))
+                except ValueError:
+                    retry_after = float(response.headers.get('Retry-After', 1))
+                print(f"⏳ Discord rate limit, retrying in {retry_after:.1f}s")
+                self.clock.sleep(retry_after)
+            return response
+        except Exception as e:
+            print(f"Error calling Discord webhook ({method}): {e}")
+            return None
+
+    def post_job_preview(self, job):
+        """Post a preview of a new listing; return its message ID, or None"""
+        if not self.webhook_url:
+            return None
+        payload = {
+            "embeds": [self.create_preview_embed(job)],
+            "username": "OnlineJobs.ph Bot",
+            "avatar_url": "https://www.onlinejobs.ph/assets/img/logo.png"
+        }
+        response = self._webhook_request('POST', payload=payload, wait=True)
+        if response is None or response.status_code != 200:
+            if response is not None:
+                print(f"Failed to post job preview. Status: {response.status_code}")
+            return None
+        return response.json().get('id')
+
+    def update_job_message(self, message_id, job, changed=False):
+        """Replace a posted message with the job's full embed; True on success
+        
+        changed marks a posting edited on the site since it was announced.
+        """
+        if not self.webhook_url:
+            return False
+        embed = self.create_job_embed(job)
+        if changed:
+            embed["title"] = f"✏️ {JobRecord.coerce(job).title or 'Job Position'}"
+            embed["footer"]["text"] = (f"OnlineJobs.ph • Posting updated {datetime.now().strftime('%b %d at %I:%M %p')}"
+                                       " • Click title to apply")
+        response = self._webhook_request('PATCH', message_id, {"embeds": [embed]})
+        if response is None or response.status_code != 200:
+            if response is not None:
+                print(f"Failed to update Discord message {message_id}. Status: {response.status_code}")
+            return False
+        return True
+
+    def delete_job_message(self, message_id):
+        """Delete a preview whose job didn't pass the final filters; True on success"""
+        if not self.webhook_url:
+            return False
+        response = self._webhook_request('DELETE', message_id)
+        # 404: already gone
+        return response is not None and response.status_code in (204, 404)
+
     def send_enhanced_summary(self, total_jobs, sent_jobs, keywords):
         """Send an enhanced summary message to Discord"""
         if not self.webhook_url:
@@ -427,7 +381,7 @@ class DiscordSender:
                 "avatar_url": "https://www.onlinejobs.ph/assets/img/logo.png"
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.webhook_url,
                 data=json.dumps(payload),
                 headers={"Content-Type": "application/json"},
@@ -440,6 +394,44 @@ class DiscordSender:
             print(f"Error sending summary to Discord: {e}")
             return False
 
+    def send_alert(self, title, description, lines=()):
+        """Send a red alert embed (e.g. extraction collapsed); True on success"""
+        if not self.webhook_url:
+            return False
+        
+        try:
+            embed = {
+                "title": title[:256],
+                "description": description[:2000],
+                "color": 0xff4444,
+                "footer": {
+                    "text": f"OnlineJobs.ph Scraper • {datetime.now().strftime('%b %d at %I:%M %p')}",
+                    "icon_url": "https://www.onlinejobs.ph/favicon.ico"
+                },
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            if lines:
+                embed["fields"] = [{"name": "Details", "value": '\n'.join(lines)[:1024], "inline": False}]
+            
+            payload = {
+                "embeds": [embed],
+                "username": "OnlineJobs.ph Bot",
+                "avatar_url": "https://www.onlinejobs.ph/assets/img/logo.png"
+            }
+            
+            response = self.session.post(
+                self.webhook_url,
+                data=json.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=10
+            )
+            
+            return response.status_code == 204
+            
+        except Exception as e:
+            print(f"Error sending alert to Discord: {e}")
+            return False
+
     # 🚫 DISABLE LEGACY METHODS TO PREVENT DOUBLE SUMMARIES
     def send_job_batch(self, jobs, batch_num, total_batches):
         """Legacy method - DISABLED to prevent double summaries"""
@@ -492,7 +484,7 @@ class DiscordSender:
                 "avatar_url": "https://www.onlinejobs.ph/assets/img/logo.png"
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.webhook_url,
                 data=json.dumps(payload),
                 headers={"Content-Type": "application/json"},
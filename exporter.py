@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+exporter.py - Streaming export of jobs.db to JSONL, CSV or Parquet
+
+Rows are read through JobDatabase.iter_jobs() in fixed-size chunks and
+written straight to the output file, so memory use stays constant no
+matter how large the jobs table grows. With an archive (archive.py) the
+archived jobs matching the same filters are written first, a month at a
+time.
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import json
+import sys
+
+from database import JobDatabase, JOB_COLUMNS
+
+EXPORT_FORMATS = ['jsonl', 'csv', 'parquet']
+
+# Same default as the gzip CLI; level 9 is several times slower for ~2% less
+GZIP_LEVEL = 6
+
+
+def infer_format(path):
+    """Guess the export format from the output file name"""
+    name = path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    for fmt in EXPORT_FORMATS:
+        if name.endswith(f'.{fmt}'):
+            return fmt
+    return 'jsonl'
+
+
+class JobExporter:
+    def __init__(self, db=None, chunk_size=1000, archive=None):
+        self.db = db or JobDatabase()
+        self.chunk_size = chunk_size
+        self.archive = archive  # archive.JobArchive to include, if any
+
+    def export(self, path, fmt=None, since=None, until=None, keyword=None, min_salary=None, compress=None):
+        """Export matching jobs to path ('-' for stdout), return rows written"""
+        fmt = fmt or infer_format(path)
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}' (choose from {', '.join(EXPORT_FORMATS)})")
+        if compress is None:
+            compress = path.endswith('.gz')
+
+        rows = self.db.iter_jobs(since=since, until=until, keyword=keyword,
+                                 min_salary=min_salary, chunk_size=self.chunk_size)
+        if self.archive is not None:
+            # Archived jobs are older than anything left in the database
+            archived = self.archive.iter_jobs(since=since, until=until, keyword=keyword, min_salary=min_salary)
+            rows = itertools.chain(archived, rows)
+
+        if fmt == 'parquet':
+            if path == '-':
+                raise ValueError("Parquet export needs a file path, not stdout")
+            return self._write_parquet(path, rows)
+
+        stream = self._open_text(path, compress)
+        try:
+            if fmt == 'csv':
+                return self._write_csv(stream, rows)
+            return self._write_jsonl(stream, rows)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+    def _open_text(self, path, compress):
+        """Open a text stream for path, gzip-compressed if requested"""
+        if path == '-':
+            if compress:
+                return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb', compresslevel=GZIP_LEVEL),
+                                        encoding='utf-8', newline='')
+            return sys.stdout
+        if compress:
+            return gzip.open(path, 'wt', compresslevel=GZIP_LEVEL, encoding='utf-8', newline='')
+        return open(path, 'w', encoding='utf-8', newline='')
+
+    @staticmethod
+    def _normalise(row):
+        """Make a DB row JSON/CSV friendly"""
+        row['sent_to_discord'] = bool(row['sent_to_discord'])
+        return row
+
+    def _write_jsonl(self, stream, rows):
+        count = 0
+        for row in rows:
+            stream.write(json.dumps(self._normalise(row), ensure_ascii=False))
+            stream.write('\n')
+            count += 1
+        return count
+
+    def _write_csv(self, stream, rows):
+        writer = csv.DictWriter(stream, fieldnames=JOB_COLUMNS)
+        writer.writeheader()
+        count = 0
+        for row in rows:
+            writer.writerow(self._normalise(row))
+            count += 1
+        return count
+
+    def _write_parquet(self, path, rows):
+        """Write row groups of chunk_size rows; needs the optional pyarrow package"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        types = {'sent_to_discord': pa.bool_()}
+        types.update({column: pa.float64() for column in ('salary_min', 'salary_max', 'salary_usd_month')})
+        schema = pa.schema([(column, types.get(column, pa.string())) for column in JOB_COLUMNS])
+        count = 0
+        with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+            chunk = []
+            for row in rows:
+                chunk.append(self._normalise(row))
+                if len(chunk) >= self.chunk_size:
+                    writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                    count += len(chunk)
+                    chunk = []
+            if chunk:
+                writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                count += len(chunk)
+        return count
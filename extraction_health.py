@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+extraction_health.py - Per-field extraction hit rates for job pages
+
+get_job_details() falls back through several patterns per field and returns
+empty strings when all of them miss. On its own that is indistinguishable
+from a job that simply has no salary listed, so a markup change on
+OnlineJobs.ph would go unnoticed while every run keeps saving blank rows.
+
+Each fetched job page is recorded here with the pattern that produced each
+field (or 'miss'). The hit rate of every field is compared against a rolling
+baseline from earlier healthy runs, kept in the crawl state. When a field
+that used to be found on most pages drops well below its baseline, the
+field has collapsed: the scraper reports it loudly and, by default, stops
+fetching job pages for the rest of the run (EXTRACTION_HEALTH_ACTION).
+"""
+
+from collections import Counter
+
+# JobRecord fields get_job_details() extracts from a job page
+FIELDS = ('title', 'job_type', 'salary', 'contact_person', 'posted_date', 'description')
+
+MISS = 'miss'
+
+
+class ExtractionHealth:
+    def __init__(self, baseline=None, min_pages=10, min_ratio=0.5,
+                 min_baseline_rate=0.2, min_baseline_pages=20):
+        # field -> {'pages': x, 'hits': y}, decayed per run (CrawlState.extraction_baseline)
+        self.baseline = baseline or {}
+        self.min_pages = min_pages                    # Pages this run before judging
+        self.min_ratio = min_ratio                    # Collapse: rate < baseline * min_ratio
+        self.min_baseline_rate = min_baseline_rate    # Rarely-present fields aren't judged
+        self.min_baseline_pages = min_baseline_pages  # Nor fields without enough history
+        self.pages = 0
+        self.sources = {field: Counter() for field in FIELDS}
+        self.collapsed = {}  # field -> (rate this run, baseline rate)
+
+    def record_page(self, sources):
+        """Count one fetched job page; sources maps field -> pattern name, None if missed"""
+        self.pages += 1
+        for field in FIELDS:
+            self.sources[field][sources.get(field) or MISS] += 1
+
+    def hit_rate(self, field):
+        if not self.pages:
+            return None
+        return 1 - self.sources[field][MISS] / self.pages
+
+    def baseline_rate(self, field):
+        """Hit rate over earlier healthy runs, or None without enough history"""
+        totals = self.baseline.get(field)
+        if not totals or totals['pages'] < self.min_baseline_pages:
+            return None
+        return totals['hits'] / totals['pages']
+
+    @property
+    def healthy(self):
+        return not self.collapsed
+
+    def check(self):
+        """Fields that collapsed since the last check: {field: (rate, baseline rate)}"""
+        if self.pages < self.min_pages:
+            return {}
+        newly = {}
+        for field in FIELDS:
+            if field in self.collapsed:
+                continue
+            baseline = self.baseline_rate(field)
+            if baseline is None or baseline < self.min_baseline_rate:
+                continue
+            rate = self.hit_rate(field)
+            if rate < baseline * self.min_ratio:
+                newly[field] = (rate, baseline)
+        self.collapsed.update(newly)
+        return newly
+
+    def updated_baseline(self, decay=0.8):
+        """Baseline with this run's pages added; older runs are scaled down by decay"""
+        baseline = {}
+        for field in FIELDS:
+            totals = self.baseline.get(field, {'pages': 0.0, 'hits': 0.0})
+            baseline[field] = {
+                'pages': round(totals['pages'] * decay + self.pages, 3),
+                'hits': round(totals['hits'] * decay + self.pages - self.sources[field][MISS], 3),
+            }
+        return baseline
+
+    def rows(self):
+        """(field, source, pages) for every pattern counted this run"""
+        return [(field, source, count)
+                for field in FIELDS for source, count in sorted(self.sources[field].items())]
+
+    def field_summary(self, field):
+        """'salary 12% (baseline 71%): SALARY label 10, hourly 2, miss 88'"""
+        rate = self.hit_rate(field)
+        baseline = self.baseline_rate(field)
+        counts = ', '.join(f"{source} {count}" for source, count in self.sources[field].most_common())
+        return (f"{field} {rate:.0%}" + (f" (baseline {baseline:.0%})" if baseline is not None else "")
+                + f": {counts}")
+
+    def summary(self):
+        """One-line description for logs"""
+        if not self.pages:
+            return "no job pages fetched"
+        rates = ', '.join(f"{field} {self.hit_rate(field):.0%}" for field in FIELDS)
+        return f"{self.pages} job pages: {rates}"
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+frontier.py - Checkpointed crawl frontier for OnlineJobs.ph scraper
+
+run_scrape() records its progress in a small SQLite file as it goes:
+each search page it finishes (with the listings found on it), and each
+discovered job with the stage it has reached:
+
+    listed -> detailed -> saved -> notified
+                      \\-> filtered
+
+If a run dies partway (CI timeout, preempted runner, network loss, crash),
+the next run with the same settings resumes it: finished search pages are
+replayed from the checkpoint instead of being requested again, fetched job
+pages are not fetched again, and saved jobs that were never notified are
+still sent. A finished run's rows are deleted.
+"""
+
+import json
+import os
+import sqlite3
+
+from clock import REAL_CLOCK
+from job_record import JobRecord
+
+# Stages a discovered job moves through, in order
+STAGES = ('listed', 'detailed', 'filtered', 'saved', 'notified')
+
+
+class CrawlFrontier:
+    def __init__(self, db_path, params, max_age_hours=12, clock=None):
+        self.db_path = db_path
+        self.clock = clock or REAL_CLOCK
+        # Only a run with identical settings (days, keywords, mode, ...) is resumed
+        self.params_key = json.dumps(params, sort_keys=True, default=str)
+        self.resumed = False
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        # One small commit per step: WAL with synchronous=NORMAL keeps them
+        # cheap and still survives the process being killed
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self._init_tables()
+        self.run_id = self._open_run(max_age_hours * 3600)
+
+    def _init_tables(self):
+        """Create the run, page and job checkpoint tables"""
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontier_runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                params TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontier_pages (
+                run_id INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                job_ids TEXT NOT NULL,
+                last_page INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (run_id, source, page)
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontier_jobs (
+                run_id INTEGER NOT NULL,
+                job_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                changed INTEGER NOT NULL DEFAULT 0,
+                record TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, job_id)
+            )
+        ''')
+
+    def _open_run(self, max_age_seconds):
+        """Resume the latest unfinished run with these settings, or start one"""
+        now = self.clock.time()
+        row = self.conn.execute('''
+            SELECT run_id FROM frontier_runs
+            WHERE params = ? AND updated_at >= ?
+            ORDER BY run_id DESC LIMIT 1
+        ''', (self.params_key, now - max_age_seconds)).fetchone()
+        if row is not None:
+            self.resumed = True
+            return row[0]
+
+        # Any other unfinished run is stale or was run with other settings
+        self._delete_runs('1')
+        cursor = self.conn.execute(
+            'INSERT INTO frontier_runs (params, started_at, updated_at) VALUES (?, ?, ?)',
+            (self.params_key, now, now)
+        )
+        return cursor.lastrowid
+
+    def _delete_runs(self, condition, params=()):
+        with self.conn:
+            run_ids = [row[0] for row in self.conn.execute(
+                f'SELECT run_id FROM frontier_runs WHERE {condition}', params
+            )]
+            for table in ('frontier_pages', 'frontier_jobs', 'frontier_runs'):
+                self.conn.executemany(f'DELETE FROM {table} WHERE run_id = ?', [(run_id,) for run_id in run_ids])
+
+    def _touch(self):
+        self.conn.execute('UPDATE frontier_runs SET updated_at = ? WHERE run_id = ?',
+                          (self.clock.time(), self.run_id))
+
+    def checkpoint(self):
+        """Fold the WAL back into the database file
+
+        CI caches only crawl_frontier.db, so checkpoints still sitting in
+        the -wal file would be lost with the runner.
+        """
+        self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def close(self):
+        self.checkpoint()
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Search pages
+    # ------------------------------------------------------------------
+
+    def page(self, source, page):
+        """(jobs, last_page) recorded for a finished page, or None"""
+        row = self.conn.execute(
+            'SELECT job_ids, last_page FROM frontier_pages WHERE run_id = ? AND source = ? AND page = ?',
+            (self.run_id, source, page)
+        ).fetchone()
+        if row is None:
+            return None
+        job_ids = json.loads(row[0])
+        jobs = self.jobs(job_ids)
+        return [jobs[job_id] for job_id in job_ids if job_id in jobs], bool(row[1])
+
+    def record_page(self, source, page, jobs, last_page=False, changed=False):
+        """Checkpoint a finished page and list its jobs, in one transaction"""
+        now = self.clock.time()
+        with self.conn:
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO frontier_jobs (run_id, job_id, stage, changed, record, updated_at)
+                VALUES (?, ?, 'listed', ?, ?, ?)
+            ''', [(self.run_id, job.job_id, int(changed), self._encode(job), now) for job in jobs])
+            self.conn.execute('''
+                INSERT OR REPLACE INTO frontier_pages (run_id, source, page, job_ids, last_page)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (self.run_id, source, page, json.dumps([job.job_id for job in jobs]), int(last_page)))
+            self._touch()
+        self.checkpoint()
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _encode(job):
+        return json.dumps(job.to_dict(), default=str)
+
+    def jobs(self, job_ids=None, stage=None, changed=None):
+        """{job_id: JobRecord} as last checkpointed, optionally filtered"""
+        query = 'SELECT job_id, record FROM frontier_jobs WHERE run_id = ?'
+        params = [self.run_id]
+        if job_ids is not None:
+            job_ids = list(job_ids)
+            query += f" AND job_id IN ({', '.join('?' * len(job_ids))})"
+            params.extend(job_ids)
+        if stage is not None:
+            query += ' AND stage = ?'
+            params.append(stage)
+        if changed is not None:
+            query += ' AND changed = ?'
+            params.append(int(changed))
+        return {
+            job_id: JobRecord.from_dict(json.loads(record))
+            for job_id, record in self.conn.execute(query, params)
+        }
+
+    def stages(self):
+        """{job_id: stage} for every job in this run"""
+        return dict(self.conn.execute(
+            'SELECT job_id, stage FROM frontier_jobs WHERE run_id = ?', (self.run_id,)
+        ).fetchall())
+
+    def set_stage(self, job, stage):
+        """Checkpoint a job's stage together with its current fields"""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown frontier stage: {stage}")
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO frontier_jobs (run_id, job_id, stage, record, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(run_id, job_id) DO UPDATE SET
+                    stage = excluded.stage, record = excluded.record, updated_at = excluded.updated_at
+            ''', (self.run_id, job.job_id, stage, self._encode(job), self.clock.time()))
+            self._touch()
+
+    def mark_notified(self, job_ids):
+        with self.conn:
+            self.conn.executemany('''
+                UPDATE frontier_jobs SET stage = 'notified', updated_at = ?
+                WHERE run_id = ? AND job_id = ?
+            ''', [(self.clock.time(), self.run_id, job_id) for job_id in job_ids])
+            self._touch()
+        self.checkpoint()
+
+    # ------------------------------------------------------------------
+
+    def finish(self):
+        """The run completed: drop its checkpoints"""
+        self._delete_runs('run_id = ?', (self.run_id,))
+
+    def summary(self):
+        """One-line description for logs"""
+        pages = self.conn.execute(
+            'SELECT COUNT(*) FROM frontier_pages WHERE run_id = ?', (self.run_id,)
+        ).fetchone()[0]
+        counts = dict(self.conn.execute(
+            'SELECT stage, COUNT(*) FROM frontier_jobs WHERE run_id = ? GROUP BY stage', (self.run_id,)
+        ).fetchall())
+        stages = ', '.join(f"{counts[stage]} {stage}" for stage in STAGES if counts.get(stage))
+        return f"{pages} pages done" + (f", jobs: {stages}" if stages else "")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+job_record.py - The job record passed through the whole scraping pipeline
+
+One schema from listing extraction through detail scraping, the database and
+Discord embeds, replacing the ad hoc dicts whose keys drifted between stages
+(title/clean_title, job_type/job_type_clean, salary/salary_clean).
+__slots__ keeps each record small in large runs.
+"""
+
+from datetime import datetime
+
+# Fields stored in the jobs table
+STORED_FIELDS = (
+    'job_id', 'title', 'company', 'url', 'description', 'salary',
+    'salary_min', 'salary_max', 'salary_currency', 'salary_period', 'salary_usd_month',
+    'job_type', 'contact_person', 'posted_date', 'date_updated', 'keyword_matched',
+    'scraped_at', 'last_changed_at', 'sent_to_discord',
+    'discord_message_id',  # Webhook message to edit (DISCORD_NOTIFY_FIRST previews)
+)
+
+# Fields that only live for the duration of a run
+TRANSIENT_FIELDS = (
+    'listing_text',       # Raw link text from the search results card
+    'listing_contact',    # Contact person guessed from the listing card
+    'posted_date_text',   # DATE UPDATED as shown on the job page
+    'relevance',          # TF-IDF score against the keywords (relevance.py)
+)
+
+DATETIME_FIELDS = ('posted_date', 'date_updated', 'scraped_at', 'last_changed_at')
+
+
+class JobRecord:
+    __slots__ = STORED_FIELDS + TRANSIENT_FIELDS
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"JobRecord({self.job_id!r}, {self.title!r})"
+
+    @classmethod
+    def coerce(cls, job):
+        """Accept a JobRecord or a legacy job dict"""
+        if isinstance(job, cls):
+            return job
+        return cls.from_dict(job)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a dict, parsing ISO datetime strings
+
+        Legacy keys from older callers (clean_title, job_type_clean,
+        salary_clean, posted_date_clean, contact_person_initial) are mapped
+        onto the canonical fields.
+        """
+        data = dict(data)
+        aliases = {
+            'clean_title': 'title',
+            'job_type_clean': 'job_type',
+            'salary_clean': 'salary',
+            'posted_date_clean': 'posted_date_text',
+            'contact_person_initial': 'listing_contact',
+        }
+        for legacy, field in aliases.items():
+            value = data.pop(legacy, None)
+            if value:
+                data[field] = value
+
+        record = cls(**{name: value for name, value in data.items() if name in cls.__slots__})
+        for name in DATETIME_FIELDS:
+            value = getattr(record, name)
+            if isinstance(value, str) and value:
+                try:
+                    setattr(record, name, datetime.fromisoformat(value))
+                except ValueError:
+                    pass
+        return record
+
+    @classmethod
+    def from_row(cls, columns, row):
+        """Build a record from a jobs table row"""
+        return cls.from_dict(zip(columns, row))
+
+    def to_dict(self):
+        """All fields as a plain dict (JSON-serialisable with default=str)"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_row(self):
+        """Stored fields as a dict of jobs table columns"""
+        return {name: getattr(self, name) for name in STORED_FIELDS}
+
+    def apply_details(self, details):
+        """Merge get_job_details() output, ignoring fields the page didn't have"""
+        for name, value in details.items():
+            if value not in (None, ''):
+                setattr(self, name, value)
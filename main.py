@@ -4,15 +4,73 @@ main.py - Main entry point for the OnlineJobs.ph scraper
 """
 
 import sys
+import time
 import argparse
-from datetime import datetime
-from config import Config
-from scraper import OnlineJobsScraper
-from database import JobDatabase
-from discord_sender import DiscordSender
 
-def run_scraper(days_back=None, test_discord=False):
+# Subcommand dependencies are imported inside the functions that use them, so
+# that database-only commands (--stats, --cleanup, --export, --serve, --merge) never load requests, bs4 or
+# the Discord integration. See benchmarks/import_time.py.
+
+def open_cassette(record_dir=None, replay_dir=None, replay_latency='recorded', days_back=None):
+    """Point the run at a cassette; (cassette, clock, sessions, days_back), or None on error"""
+    import os
+    import shutil
+    from config import Config
+    from cassette import Cassette, SESSION_NAMES, REPLAY_WEBHOOK_URL
+    from clock import VirtualClock
+    
+    cassette = Cassette(record_dir or replay_dir)
+    # Checkpoints of an earlier run would make the run depend on it
+    Config.FRONTIER_PATH = ''
+    
+    if record_dir:
+        if cassette.exists():
+            print(f"❌ {record_dir} already holds a cassette")
+            return None
+        days_back = Config.DEFAULT_DAYS_BACK if days_back is None else days_back
+        cassette.save_snapshot(Config.DATABASE_PATH, Config.STATE_PATH)
+        cassette.write_meta({'started_at': time.time(), 'days_back': days_back, 'keywords': Config.KEYWORDS})
+        # Fetch robots.txt into the cassette instead of reading the cache
+        Config.ROBOTS_CACHE_PATH = os.path.join(record_dir, 'robots_cache.json')
+        sessions = {name: cassette.recording_session(name) for name in SESSION_NAMES}
+        print(f"⏺️ Recording HTTP traffic to {record_dir}")
+        return cassette, None, sessions, days_back
+    
+    if not cassette.exists():
+        print(f"❌ No cassette in {replay_dir}")
+        return None
+    meta = cassette.read_meta()
+    work_dir = os.path.join(replay_dir, 'replay')
+    shutil.rmtree(work_dir, ignore_errors=True)
+    Config.DATABASE_PATH = os.path.join(work_dir, 'jobs.db')
+    Config.STATE_PATH = os.path.join(work_dir, os.path.basename(Config.STATE_PATH))
+    Config.ROBOTS_CACHE_PATH = os.path.join(work_dir, 'robots_cache.json')
+    Config.KEYWORDS = meta['keywords']
+    Config.DISCORD_WEBHOOK_URL = Config.DISCORD_WEBHOOK_URL or REPLAY_WEBHOOK_URL
+    cassette.restore_snapshot(Config.DATABASE_PATH, Config.STATE_PATH)
+    
+    clock = VirtualClock(start=meta['started_at'])
+    sessions = {name: cassette.replay_session(name, clock, replay_latency) for name in SESSION_NAMES}
+    print(f"⏯️ Replaying {replay_dir} ({replay_latency} latency), writing to {work_dir}")
+    return cassette, clock, sessions, meta['days_back'] if days_back is None else days_back
+
+def run_scraper(days_back=None, test_discord=False, workers=1, join_run=None,
+                max_requests=None, deadline_minutes=None,
+                record_dir=None, replay_dir=None, replay_latency='recorded'):
     """Main function to run the scraper"""
+    from config import Config
+    from database import JobDatabase
+    from discord_sender import DiscordSender
+    
+    cassette, clock, sessions = None, None, {}
+    if record_dir or replay_dir:
+        if workers > 1 or join_run:
+            print("❌ --record and --replay run a single worker")
+            return False
+        opened = open_cassette(record_dir, replay_dir, replay_latency, days_back)
+        if opened is None:
+            return False
+        cassette, clock, sessions, days_back = opened
     
     # Print configuration
     Config.print_config()
@@ -45,11 +103,35 @@ def run_scraper(days_back=None, test_discord=False):
     print(f"📅 Looking for jobs from the last {days_back} days")
     print(f"🔍 Keywords: {', '.join(Config.KEYWORDS)}")
     
-    # Initialize and run scraper
-    scraper = OnlineJobsScraper()
-    
     try:
-        new_jobs_count = scraper.run_scrape(days_back=days_back)
+        if join_run:
+            # Join a run seeded elsewhere; its coordinator sends the notifications
+            from scraper import run_worker_process
+            run_worker_process(join_run, days_back=days_back)
+            return True
+        
+        if workers > 1:
+            from scraper import run_sharded_scrape
+            new_jobs_count = run_sharded_scrape(workers, days_back=days_back)
+        else:
+            # Initialize and run scraper
+            from scraper import OnlineJobsScraper
+            scraper = OnlineJobsScraper(clock=clock, session=sessions.get('onlinejobs'),
+                                        discord_session=sessions.get('discord'))
+            started = time.perf_counter()
+            new_jobs_count = scraper.run_scrape(
+                days_back=days_back,
+                max_requests=Config.MAX_REQUESTS if max_requests is None else max_requests,
+                deadline_minutes=Config.DEADLINE_MINUTES if deadline_minutes is None else deadline_minutes,
+            )
+            if cassette is not None:
+                print(f"\n📼 {'Replayed' if replay_dir else 'Recorded'} in {time.perf_counter() - started:.1f}s"
+                      + (f" ({clock.elapsed / 60:.1f} min on the virtual clock)" if clock else "") + ":")
+                print(cassette.summary())
+            if not scraper.extraction.healthy:
+                # Jobs found before the collapse were still saved and notified
+                print(f"\n❌ Job page extraction collapsed: {', '.join(scraper.extraction.collapsed)}")
+                return False
         
         print(f"\n✅ Scraping completed successfully!")
         print(f"🆕 Found {new_jobs_count} new jobs")
@@ -65,7 +147,7 @@ def run_scraper(days_back=None, test_discord=False):
         # Send summary to Discord if there were new jobs
         if new_jobs_count > 0:
             try:
-                discord = DiscordSender()
+                discord = DiscordSender(session=sessions.get('discord'))
                 discord.send_summary(
                     total_jobs=stats['total_jobs'],
                     new_jobs=new_jobs_count,
@@ -81,6 +163,154 @@ def run_scraper(days_back=None, test_discord=False):
         import traceback
         traceback.print_exc()
         return False
+    finally:
+        if cassette is not None:
+            cassette.close()
+
+def show_stats():
+    """Print database statistics (SQLite only, no scraper imports)"""
+    from database import JobDatabase
+    
+    try:
+        db = JobDatabase()
+        stats = db.get_stats()
+        print("📊 Database Statistics:")
+        print(f"  Total jobs: {stats['total_jobs']}")
+        print(f"  Sent to Discord: {stats['sent_jobs']}")
+        print(f"  Unsent jobs: {stats['unsent_jobs']}")
+        print(f"  Recent jobs (7 days): {stats['recent_jobs']}")
+        if stats['last_scrape']:
+            print(f"  Last scrape: {stats['last_scrape'][0]} ({stats['last_scrape'][1]} new jobs)")
+        else:
+            print("  Last scrape: Never")
+        
+        keyword_stats = db.get_keyword_stats()
+        if keyword_stats:
+            print("🔍 By keyword:")
+            for row in keyword_stats:
+                print(f"  {row['keyword'] or '(none)'}: {row['total_jobs']} total, "
+                      f"{row['sent_jobs']} sent, {row['unsent_jobs']} unsent")
+        
+        extraction = db.get_extraction_stats()
+        if extraction:
+            run_at, fields = extraction
+            print(f"🩺 Job page extraction (last run, {run_at}):")
+            for field, sources in fields.items():
+                pages = sum(sources.values())
+                hit_rate = 1 - sources.get('miss', 0) / pages
+                counts = ', '.join(f"{source} {count}" for source, count in sources.items())
+                print(f"  {field}: {hit_rate:.0%} of {pages} pages ({counts})")
+    except Exception as e:
+        print(f"❌ Error getting stats: {e}")
+        sys.exit(1)
+
+def show_trends(days=None, keyword=None):
+    """Print per-day job counts from the rollup table (SQLite only, no scraper imports)"""
+    from database import JobDatabase, SALARY_BANDS
+    
+    days = days or 30
+    try:
+        db = JobDatabase()
+        trends = db.get_trends(days, keyword)
+        print(f"📈 Jobs posted in the last {days} days" + (f" for '{keyword}'" if keyword else "") + ":")
+        if not trends['day']:
+            print("  No jobs in this period")
+            return
+        
+        busiest = max(total for _, total, _ in trends['day'])
+        for day, total, sent in trends['day']:
+            bar = '█' * max(1, round(total / busiest * 30))
+            print(f"  {day}  {total:>5}  {bar}")
+        
+        band_order = [label for _, label in SALARY_BANDS] + ['unknown']
+        trends['salary_band'].sort(key=lambda row: band_order.index(row[0]) if row[0] in band_order else len(band_order))
+        for column, label in (('keyword', '🔍 By keyword'), ('job_type', '🕒 By job type'),
+                              ('salary_band', '💰 By salary (USD/month)')):
+            print(f"{label}:")
+            for value, total, sent in trends[column]:
+                print(f"  {value or '(none)'}: {total} jobs, {sent} sent")
+    except Exception as e:
+        print(f"❌ Error getting trends: {e}")
+        sys.exit(1)
+
+def cleanup_jobs(days):
+    """Archive (or remove) old jobs (SQLite only, no scraper imports)"""
+    from config import Config
+    from database import JobDatabase
+    from archive import JobArchive
+    
+    try:
+        db = JobDatabase()
+        if Config.ARCHIVE_DIR:
+            archive = JobArchive(Config.ARCHIVE_DIR)
+            moved = db.cleanup_old_jobs(days, archive=archive)
+            print(f"🗄️ Archived {moved} jobs older than {days} days ({archive.summary()})")
+        else:
+            deleted = db.cleanup_old_jobs(days)
+            print(f"🗑️ Cleaned up {deleted} jobs older than {days} days")
+    except Exception as e:
+        print(f"❌ Error during cleanup: {e}")
+        sys.exit(1)
+
+def merge_databases(sources, output):
+    """Merge jobs.db files into one (SQLite only, no scraper imports)"""
+    from config import Config
+    from database import JobDatabase
+    
+    output = output or Config.DATABASE_PATH
+    try:
+        db = JobDatabase(output)
+        results = db.merge(sources)
+        for path, total, written, conflicts in results:
+            print(f"  {path}: {total} jobs, {written} new or newer")
+            if conflicts:
+                print(f"  ⚠️ {conflicts} skipped: url already stored under a different job_id")
+        stats = db.get_stats()
+        print(f"🔀 Merged {len(results)} databases into {output} "
+              f"({stats['total_jobs']} jobs, {stats['sent_jobs']} sent)")
+    except Exception as e:
+        print(f"❌ Error during merge: {e}")
+        sys.exit(1)
+
+def export_jobs(args):
+    """Stream jobs to a file (SQLite only, no scraper imports)"""
+    from config import Config
+    from exporter import JobExporter
+    from archive import JobArchive
+    
+    try:
+        archive = JobArchive(Config.ARCHIVE_DIR) if args.archive and Config.ARCHIVE_DIR else None
+        exporter = JobExporter(archive=archive)
+        count = exporter.export(
+            args.export,
+            fmt=args.format,
+            since=args.since,
+            until=args.until,
+            keyword=args.keyword,
+            min_salary=args.min_salary,
+            compress=True if args.gzip else None
+        )
+        # Keep stdout clean when it is the export target
+        print(f"📦 Exported {count} jobs to {args.export}", file=sys.stderr)
+    except Exception as e:
+        print(f"❌ Error during export: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def serve_api(args):
+    """Serve the read-only JSON API (SQLite and http.server only)"""
+    from config import Config
+    from database import JobDatabase
+    from api_server import serve
+    
+    try:
+        # One read-write open to apply migrations and the journal mode (WAL);
+        # every request after that uses its own read-only connection
+        JobDatabase(Config.DATABASE_PATH)
+        serve(Config.DATABASE_PATH, args.host or Config.SERVE_HOST, args.port or Config.SERVE_PORT,
+              archive_dir=Config.ARCHIVE_DIR if args.archive else None)
+    except Exception as e:
+        print(f"❌ Error running API server: {e}")
+        sys.exit(1)
 
 def main():
     """Command line interface"""
@@ -91,9 +321,18 @@ def main():
 Examples:
   python main.py                    # Run with default settings (5 days back)
   python main.py --days 10          # Scrape jobs from last 10 days
+  python main.py --workers 3        # Share the crawl between 3 worker processes
+  python main.py --deadline 40 --max-requests 500  # Best-value work first, stop when spent
   python main.py --test-discord     # Test Discord webhook only
   python main.py --stats            # Show database statistics
-  python main.py --cleanup 30       # Remove jobs older than 30 days
+  python main.py --trends --days 90 --keyword admin  # Jobs per day, by type and salary
+  python main.py --cleanup 30       # Archive jobs older than 30 days
+  python main.py --export all.jsonl.gz --archive  # Export including archived jobs
+  python main.py --export jobs.jsonl.gz --since 2025-10-01 --keyword admin
+  python main.py --serve --port 8080  # Read-only JSON API for dashboards
+  python main.py --merge shard1.db shard2.db -o jobs.db  # Combine CI shards
+  python main.py --record runs/oct19   # Scrape and capture all HTTP traffic
+  python main.py --replay runs/oct19 --replay-latency zero  # Rerun offline
         """
     )
     
@@ -102,6 +341,45 @@ Examples:
         type=int, 
         help='Number of days back to scrape (default: 5)'
     )
+    parser.add_argument(
+        '--workers', 
+        type=int, 
+        default=1,
+        help='Number of local worker processes sharing the crawl (default: 1)'
+    )
+    parser.add_argument(
+        '--worker', 
+        metavar='RUN_ID',
+        help='Join an existing multi-worker run as one more worker'
+    )
+    parser.add_argument(
+        '--deadline', 
+        type=float,
+        metavar='MINUTES',
+        help='Stop starting requests after MINUTES and report deferred work (default: DEADLINE_MINUTES)'
+    )
+    parser.add_argument(
+        '--max-requests', 
+        type=int,
+        metavar='N',
+        help='Send at most N requests, highest-yield work first (default: MAX_REQUESTS)'
+    )
+    parser.add_argument(
+        '--record', 
+        metavar='DIR',
+        help='Scrape as usual and record every HTTP exchange to a cassette in DIR'
+    )
+    parser.add_argument(
+        '--replay', 
+        metavar='DIR',
+        help='Rerun the cassette in DIR offline; results go to DIR/replay/'
+    )
+    parser.add_argument(
+        '--replay-latency', 
+        choices=['recorded', 'zero'],
+        default='recorded',
+        help='Response times while replaying, on a virtual clock (default: recorded)'
+    )
     parser.add_argument(
         '--test-discord', 
         action='store_true', 
@@ -112,11 +390,81 @@ Examples:
         action='store_true', 
         help='Show database statistics and exit'
     )
+    parser.add_argument(
+        '--trends', 
+        action='store_true', 
+        help='Show jobs per posting day (last --days, default 30; --keyword filters) and exit'
+    )
     parser.add_argument(
         '--cleanup', 
         type=int, 
         metavar='DAYS',
-        help='Clean up jobs older than N days and exit'
+        help='Move jobs older than N days to the archive (ARCHIVE_DIR) and exit'
+    )
+    parser.add_argument(
+        '--export', 
+        metavar='PATH',
+        help='Stream jobs to PATH ("-" for stdout) and exit'
+    )
+    parser.add_argument(
+        '--format', 
+        choices=['jsonl', 'csv', 'parquet'],
+        help='Export format (default: inferred from PATH, else jsonl)'
+    )
+    parser.add_argument(
+        '--since', 
+        metavar='YYYY-MM-DD',
+        help='Export only jobs posted on or after this date'
+    )
+    parser.add_argument(
+        '--until', 
+        metavar='YYYY-MM-DD',
+        help='Export only jobs posted on or before this date'
+    )
+    parser.add_argument(
+        '--keyword', 
+        help='Export (or --trends) only jobs matched by this keyword'
+    )
+    parser.add_argument(
+        '--min-salary', 
+        type=float,
+        metavar='USD',
+        help='Export only jobs paying at least this much (USD per month)'
+    )
+    parser.add_argument(
+        '--gzip', 
+        action='store_true', 
+        help='Gzip the export (implied by a .gz PATH)'
+    )
+    parser.add_argument(
+        '--archive', 
+        action='store_true', 
+        help='Include archived jobs in --export and --serve results'
+    )
+    parser.add_argument(
+        '--serve', 
+        action='store_true', 
+        help='Serve a read-only JSON API over the database'
+    )
+    parser.add_argument(
+        '--host', 
+        help='API server host (default: SERVE_HOST or 127.0.0.1)'
+    )
+    parser.add_argument(
+        '--port', 
+        type=int,
+        help='API server port (default: SERVE_PORT or 8080)'
+    )
+    parser.add_argument(
+        '--merge', 
+        nargs='+',
+        metavar='DB',
+        help='Merge these jobs.db files into --output and exit'
+    )
+    parser.add_argument(
+        '-o', '--output', 
+        metavar='PATH',
+        help='Database --merge writes to (default: DATABASE_PATH)'
     )
     parser.add_argument(
         '--version', 
@@ -128,32 +476,32 @@ Examples:
     
     # Show stats
     if args.stats:
-        try:
-            db = JobDatabase()
-            stats = db.get_stats()
-            print("📊 Database Statistics:")
-            print(f"  Total jobs: {stats['total_jobs']}")
-            print(f"  Sent to Discord: {stats['sent_jobs']}")
-            print(f"  Unsent jobs: {stats['unsent_jobs']}")
-            print(f"  Recent jobs (7 days): {stats['recent_jobs']}")
-            if stats['last_scrape']:
-                print(f"  Last scrape: {stats['last_scrape'][0]} ({stats['last_scrape'][1]} new jobs)")
-            else:
-                print("  Last scrape: Never")
-        except Exception as e:
-            print(f"❌ Error getting stats: {e}")
-            sys.exit(1)
+        show_stats()
+        return
+    
+    # Trend report
+    if args.trends:
+        show_trends(args.days, args.keyword)
         return
     
     # Cleanup old jobs
     if args.cleanup:
-        try:
-            db = JobDatabase()
-            deleted = db.cleanup_old_jobs(args.cleanup)
-            print(f"🗑️ Cleaned up {deleted} jobs older than {args.cleanup} days")
-        except Exception as e:
-            print(f"❌ Error during cleanup: {e}")
-            sys.exit(1)
+        cleanup_jobs(args.cleanup)
+        return
+    
+    # Merge sharded databases
+    if args.merge:
+        merge_databases(args.merge, args.output)
+        return
+    
+    # Export jobs
+    if args.export:
+        export_jobs(args)
+        return
+    
+    # Read-only JSON API
+    if args.serve:
+        serve_api(args)
         return
     
     # Test Discord webhook
@@ -165,7 +513,10 @@ Examples:
     print("🚀 OnlineJobs.ph Scraper v1.0.0")
     print("=" * 50)
     
-    success = run_scraper(days_back=args.days)
+    success = run_scraper(days_back=args.days, workers=args.workers, join_run=args.worker,
+                          max_requests=args.max_requests, deadline_minutes=args.deadline,
+                          record_dir=args.record, replay_dir=args.replay,
+                          replay_latency=args.replay_latency)
     
     if success:
         print("\n🎉 Scraper completed successfully!")
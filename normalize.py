@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+normalize.py - Text normalisation for OnlineJobs.ph scraper
+
+Every cleanup the scraper and DiscordSender used to do on their own
+(whitespace runs, leftover HTML entities, listing-card artifacts in titles,
+page boilerplate in descriptions) lives here. Each set of artifact patterns
+is compiled once into a single alternation, so one pass of the regex engine
+replaces a loop of re.sub calls. normalize_job() runs once per job at
+extraction time and the cleaned fields are what gets stored, so embeds,
+queued jobs and resends never redo the work.
+"""
+
+import html
+import re
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_HAS_LETTER_RE = re.compile(r'[a-zA-Z]')
+
+# Listing-card text glued onto the title ("Admin Assistant Full Time $5/hr • Posted on ...").
+# Two patterns are stricter than the old per-pattern re.sub loop: job types
+# only match as whole words ("Any" no longer eats "Company"), and the ALLCAPS
+# run is case-sensitive (under IGNORECASE it cut any title at its first
+# 6+ letter word). The v7 migration re-cleans stored titles with these rules.
+_TITLE_ARTIFACTS_RE = re.compile('|'.join([
+    r'TYPE OF WORK.*?(?=\w{3,}|$)',
+    r'SALARY.*?(?=\w{3,}|$)',
+    r'HOURS PER WEEK.*?(?=\w{3,}|$)',
+    r'\b(?:Part Time|Full Time|Any)\b',   # Job types
+    r'\$[\d,]+(?:\.\d{2})?(?:/\w+)?',       # Salary amounts
+    r'PHP[\s\d,]+(?:/\w+)?',
+    r'TBD|TBDDATE|UPDATE.*?\d{4}',          # TBD, dates
+    r'•.*$',                                # Everything after the bullet
+    r'(?-i:[A-Z]{2,}\s*[A-Z]{2,}\s*[A-Z]{2,}).*$',  # ALLCAPS runs (case-sensitive)
+    r'\s*-\s*\d+$',                         # Trailing numbers
+]), re.IGNORECASE)
+_TITLE_WORDS_RE = re.compile(r'\b[A-Za-z]{3,}(?:\s+[A-Za-z]{2,}){0,4}\b')
+_TITLE_LEADING_RE = re.compile(r'^[^a-zA-Z]+')
+_TITLE_TRAILING_RE = re.compile(r'[^a-zA-Z\s&()-]+$')
+
+_COMPANY_ARTIFACTS_RE = re.compile(r'Displaying \d+ out of \d+\+ jobs|•.*$')
+
+# Job page boilerplate. Salary amounts are kept: they are part of the job.
+# The leading lookahead lets the engine skip positions that can't start any
+# branch without trying each alternative there (about twice as fast).
+_DESCRIPTION_ARTIFACTS_RE = re.compile('(?=[rdth])(?:' + '|'.join([
+    r'READ UNTIL THE END!\s*',
+    r'DO NOT APPLY THROUGH ONLINE JOB!\s*',
+    r'TYPE OF WORK.*?(?=\w{3,}|$)',
+    r'HOURS PER WEEK.*?(?=\w{3,}|$)',
+    r'DATE UPDATED?.*?\d{4}',
+]) + ')', re.IGNORECASE)
+
+MAX_TITLE_LENGTH = 200
+MAX_COMPANY_LENGTH = 50
+
+
+def clean_text(text):
+    """Unescape leftover HTML entities (&amp;) and collapse whitespace"""
+    if not text:
+        return ''
+    return _WHITESPACE_RE.sub(' ', html.unescape(str(text))).strip()
+
+
+def clean_title(title):
+    """Job title from messy listing-card text; '' if nothing usable is left"""
+    original = clean_text(title)
+    title = _WHITESPACE_RE.sub(' ', _TITLE_ARTIFACTS_RE.sub('', original)).strip()
+
+    # Stripped to almost nothing: take the first run of real words instead
+    if len(title) < 3:
+        words = _TITLE_WORDS_RE.findall(original)
+        title = words[0] if words else ''
+
+    title = _TITLE_TRAILING_RE.sub('', _TITLE_LEADING_RE.sub('', title))
+    return title[:60].strip()
+
+
+def clean_company(company):
+    """Company name without listing artifacts; '' if it doesn't look like one"""
+    company = clean_text(company)
+    if company in ('None', 'N/A'):
+        return ''
+    company = clean_text(_COMPANY_ARTIFACTS_RE.sub('', company))
+    if len(company) > MAX_COMPANY_LENGTH or not _HAS_LETTER_RE.search(company):
+        return ''
+    return company
+
+
+def clean_description(description):
+    """Description without page boilerplate, on one line"""
+    desc = _DESCRIPTION_ARTIFACTS_RE.sub('', clean_text(description))
+    # Removals can leave a double space behind; only then collapse again
+    if '  ' in desc:
+        desc = _WHITESPACE_RE.sub(' ', desc)
+    return desc.strip()
+
+
+def summarize(text, limit=400, target=350):
+    """Cut text longer than limit at the last sentence end before target
+
+    Plain string slicing, cheap enough to run on every embed.
+    """
+    if len(text) <= limit:
+        return text
+    truncated = text[:target]
+    last_sentence = max(truncated.rfind('.'), truncated.rfind('!'), truncated.rfind('?'))
+    if last_sentence > target * 4 // 7:
+        return text[:last_sentence + 1]
+    return truncated.rstrip() + "..."
+
+
+def normalize_job(job):
+    """Clean a JobRecord's text fields in place, once, before it is stored"""
+    if job.title and job.title == job.listing_text:
+        # No heading on the job page: the title is still raw listing text
+        job.title = clean_title(job.title) or clean_text(job.title)
+    else:
+        job.title = clean_text(job.title)
+    job.title = job.title[:MAX_TITLE_LENGTH] or 'Job Position'
+    if job.company is not None:
+        job.company = clean_company(job.company) or 'Company not listed'
+    if job.contact_person:
+        job.contact_person = clean_text(job.contact_person)
+    if job.description:
+        job.description = clean_description(job.description)
+    return job
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+query_planner.py - Overlap-aware keyword planning for OnlineJobs.ph scraper
+
+Keywords such as "admin" and "operations" return largely the same jobs, so
+searching each one to full depth wastes requests. Every run records which
+job IDs each keyword returned on each search page (kept in the crawl
+state). From recent full-depth runs the planner estimates pairwise overlap
+and each keyword's unique yield, orders keywords by how many new jobs they
+add, and lowers the page depth of keywords that are mostly covered by the
+others - as long as the unique jobs found would stay within the configured
+tolerance of a full crawl. Every keyword still gets its first page, and a
+full-depth run is made every few runs so the estimates stay fresh.
+"""
+
+
+class KeywordPlan:
+    def __init__(self, order, depths, full_depth, full_requests, planned_requests, coverage, reason):
+        self.order = order                        # Keywords, highest unique yield first
+        self.depths = depths                      # keyword -> pages to search
+        self.full_depth = full_depth              # MAX_PAGES_PER_KEYWORD
+        self.full_requests = full_requests        # Avg search requests of a full-depth run
+        self.planned_requests = planned_requests  # Avg search requests with this plan
+        self.coverage = coverage                  # Expected share of a full run's unique jobs
+        self.reason = reason                      # Why the plan is (or isn't) reduced
+
+    @property
+    def capped(self):
+        """True if any keyword is searched below full depth"""
+        return any(depth < self.full_depth for depth in self.depths.values())
+
+    @property
+    def expected_requests_saved(self):
+        return self.full_requests - self.planned_requests
+
+    def summary(self):
+        """Multi-line description for logs"""
+        lines = [f"🧭 Keyword plan: {self.reason}"]
+        for keyword in self.order:
+            lines.append(f"   • {keyword}: {self.depths[keyword]} page(s)")
+        if self.capped:
+            lines.append(f"   Expected search requests: {self.planned_requests:.1f} instead of "
+                         f"{self.full_requests:.1f} ({self.expected_requests_saved:.1f} saved), "
+                         f"coverage {self.coverage:.1%}")
+        return '\n'.join(lines)
+
+
+class KeywordPlanner:
+    def __init__(self, history, max_pages, tolerance=0.05, min_runs=3, explore_every=5):
+        self.history = history            # CrawlState.keyword_runs, oldest first
+        self.max_pages = max_pages
+        self.tolerance = tolerance        # Share of unique jobs a plan may lose
+        self.min_runs = min_runs          # Needed before any keyword is capped
+        self.explore_every = explore_every
+
+    def _observations(self, keywords):
+        """Per-keyword page ID sets from the recorded full-depth runs"""
+        return [
+            {keyword: [set(page) for page in run[keyword]] for keyword in keywords if keyword in run}
+            for run in self.history
+        ]
+
+    @staticmethod
+    def _found(run, depths):
+        """Unique job IDs one run would have found with the given page depths"""
+        found = set()
+        for keyword, pages in run.items():
+            for page in pages[:depths.get(keyword, len(pages))]:
+                found |= page
+        return found
+
+    def _requests(self, runs, depths):
+        """Average search requests per run with the given page depths"""
+        total = 0
+        for run in runs:
+            total += sum(min(len(pages), depths[keyword]) for keyword, pages in run.items())
+        return total / len(runs)
+
+    def overlap(self, keywords):
+        """{(a, b): share of a's jobs also returned by b}, averaged over runs"""
+        runs = self._observations(keywords)
+        result = {}
+        for a in keywords:
+            for b in keywords:
+                if a == b:
+                    continue
+                shares = []
+                for run in runs:
+                    if a in run and b in run:
+                        jobs_a = set().union(*run[a])
+                        if jobs_a:
+                            shares.append(len(jobs_a & set().union(*run[b])) / len(jobs_a))
+                if shares:
+                    result[(a, b)] = sum(shares) / len(shares)
+        return result
+
+    def unique_yield(self, keywords):
+        """{keyword: average jobs per run that no other keyword returned}"""
+        runs = self._observations(keywords)
+        result = {keyword: 0.0 for keyword in keywords}
+        for run in runs:
+            for keyword, pages in run.items():
+                others = set().union(*(set().union(*p) for k, p in run.items() if k != keyword))
+                result[keyword] += len(set().union(*pages) - others) / len(runs)
+        return result
+
+    def plan(self, keywords, run_number):
+        """Order keywords and choose a page depth for each"""
+        depths = {keyword: self.max_pages for keyword in keywords}
+        runs = self._observations(keywords)
+
+        if len(runs) < self.min_runs:
+            return KeywordPlan(list(keywords), depths, self.max_pages, 0.0, 0.0, 1.0,
+                               f"full depth, {len(runs)}/{self.min_runs} runs of history")
+        if self.explore_every and run_number % self.explore_every == 0:
+            return KeywordPlan(list(keywords), depths, self.max_pages, 0.0, 0.0, 1.0,
+                               "full depth (periodic re-measurement)")
+
+        # Keywords without history first (nothing to plan on), then greedy
+        # set cover: the keyword adding the most new jobs goes next
+        order = [keyword for keyword in keywords if not all(keyword in run for run in runs)]
+        seen = [set() for _ in runs]
+        remaining = [keyword for keyword in keywords if keyword not in order]
+        while remaining:
+            gains = {
+                keyword: sum(len(set().union(*run[keyword]) - seen[i]) for i, run in enumerate(runs))
+                for keyword in remaining
+            }
+            best = max(remaining, key=lambda keyword: gains[keyword])
+            for i, run in enumerate(runs):
+                seen[i] |= set().union(*run[best])
+            order.append(best)
+            remaining.remove(best)
+
+        full_found = sum(len(self._found(run, depths)) for run in runs)
+        full_requests = self._requests(runs, depths)
+        floor = (1 - self.tolerance) * full_found
+
+        # Trim the least useful keywords first, one page at a time, never below page 1
+        for keyword in reversed(order):
+            if not all(keyword in run for run in runs):
+                continue
+            while depths[keyword] > 1:
+                trial = dict(depths, **{keyword: depths[keyword] - 1})
+                if sum(len(self._found(run, trial)) for run in runs) < floor:
+                    break
+                depths = trial
+
+        found = sum(len(self._found(run, depths)) for run in runs)
+        return KeywordPlan(
+            order, depths, self.max_pages, full_requests, self._requests(runs, depths),
+            found / full_found if full_found else 1.0,
+            f"{len(runs)} runs of history, tolerance {self.tolerance:.0%}"
+        )
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+rate_control.py - AIMD request pacing for OnlineJobs.ph scraper
+
+The request rate grows additively while responses are fast and healthy and
+is cut multiplicatively on 429/5xx responses, Retry-After headers, network
+errors or latency well above the observed baseline - the same
+additive-increase/multiplicative-decrease rule TCP uses. The delay never
+drops below the configured respectful minimum.
+"""
+
+import random
+from email.utils import parsedate_to_datetime
+
+from clock import REAL_CLOCK
+
+# Status codes that mean "slow down" rather than "this page is broken"
+BACKOFF_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value, now=None):
+    """Convert a Retry-After header (seconds or HTTP date) to seconds
+    
+    now is the current epoch time (default: the real clock).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if now is None:
+        now = REAL_CLOCK.time()
+    return max(0.0, retry_at.timestamp() - now)
+
+
+class AdaptiveRateController:
+    def __init__(self, min_delay, max_delay, backoff_ceiling=60.0,
+                 increase_step=0.05, backoff_factor=2.0, latency_factor=2.5, jitter=0.2, clock=None):
+        self.clock = clock or REAL_CLOCK                # RealClock, or VirtualClock offline
+        self.min_delay = min_delay                  # Never go faster than this
+        self.backoff_ceiling = max(backoff_ceiling, max_delay)
+        self.increase_step = increase_step          # Requests/second added per healthy response
+        self.backoff_factor = backoff_factor        # Rate divided by this on trouble
+        self.latency_factor = latency_factor        # "Slow" = this many times the baseline latency
+        self.jitter = jitter                        # +/- fraction of random jitter per delay
+
+        # Start at the conservative end of the configured range
+        self.max_rate = 1.0 / min_delay if min_delay > 0 else float('inf')
+        self.rate = 1.0 / max_delay if max_delay > 0 else self.max_rate
+        self.hold_until = 0.0
+        self.last_request_at = None
+
+        self.latency_avg = None
+        self.latency_baseline = None
+
+        self.requests = 0
+        self.backoffs = 0
+        self.retries = 0
+
+    def set_min_delay(self, min_delay):
+        """Raise (or lower) the floor, e.g. to honour a robots.txt Crawl-delay"""
+        self.min_delay = min_delay
+        self.max_rate = 1.0 / min_delay if min_delay > 0 else float('inf')
+        self.rate = min(self.rate, self.max_rate)
+        self.backoff_ceiling = max(self.backoff_ceiling, min_delay)
+
+    @property
+    def delay(self):
+        """Current spacing between requests in seconds"""
+        return max(self.min_delay, min(self.backoff_ceiling, 1.0 / self.rate))
+
+    def next_delay(self):
+        """Delay for the next request, with jitter, never below min_delay"""
+        delay = self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(self.min_delay, delay)
+
+    def wait(self):
+        """Sleep until the next request may be sent"""
+        now = self.clock.monotonic()
+        ready_at = now
+        if self.last_request_at is not None:
+            ready_at = self.last_request_at + self.next_delay()
+        ready_at = max(ready_at, self.hold_until)
+        if ready_at > now:
+            self.clock.sleep(ready_at - now)
+        self.last_request_at = self.clock.monotonic()
+
+    def hold(self, seconds):
+        """Send nothing for the given number of seconds (Retry-After)"""
+        self.hold_until = max(self.hold_until, self.clock.monotonic() + seconds)
+
+    def record(self, status_code, latency, retry_after=None):
+        """Feed back one response; return True if it should be retried"""
+        self.requests += 1
+        slow = self._observe_latency(latency)
+
+        if status_code in BACKOFF_STATUSES or retry_after is not None:
+            self._back_off()
+            if retry_after is not None:
+                # The server's own wait, in full: never retry early
+                self.hold(retry_after)
+            return status_code in BACKOFF_STATUSES
+
+        if slow:
+            self._back_off()
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+        return False
+
+    def record_error(self):
+        """Feed back a network error or timeout"""
+        self.requests += 1
+        self._back_off()
+
+    def _back_off(self):
+        self.backoffs += 1
+        self.rate = max(1.0 / self.backoff_ceiling, self.rate / self.backoff_factor)
+
+    def _observe_latency(self, latency):
+        """Track an EWMA of latency; True when it is well above baseline"""
+        if latency is None:
+            return False
+        if self.latency_avg is None:
+            self.latency_avg = latency
+        else:
+            self.latency_avg = 0.7 * self.latency_avg + 0.3 * latency
+        if self.latency_baseline is None:
+            self.latency_baseline = self.latency_avg
+        else:
+            # Follow improvements at once, and a lasting slowdown slowly
+            self.latency_baseline = min(self.latency_avg, self.latency_baseline * 1.02)
+        return self.latency_avg > self.latency_baseline * self.latency_factor
+
+    def summary(self):
+        """One-line description for logs"""
+        return (f"{self.requests} requests, current delay {self.delay:.2f}s, "
+                f"{self.backoffs} backoffs, {self.retries} retries")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+relevance.py - TF-IDF relevance scoring for OnlineJobs.ph scraper
+
+Vocabulary and IDF weights come from the stored jobs corpus; each keyword
+becomes a query vector (its own words and bigram at full weight, related
+terms at 0.3). A run's candidates are scored together: their
+weights for the query terms form one candidates x terms matrix that is
+multiplied by the terms x keywords query matrix, and each row is divided by
+the candidate's full TF-IDF norm, which gives the cosine similarity to
+every keyword at once. NumPy does the multiplication when installed; the
+pure-Python fallback gives the same scores.
+
+Listings can be scored from their title alone, before any job page is
+fetched, and rescored once the description is known.
+"""
+
+import math
+import re
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    # Optional: the pure-Python path below gives identical scores
+    np = None
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase word tokens plus adjacent-word bigrams ('entry level')"""
+    words = _TOKEN_RE.findall((text or '').lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class RelevanceScorer:
+    def __init__(self, keywords, related_terms=None, related_weight=0.3):
+        self.keywords = list(keywords)
+        self.related_terms = related_terms or {}
+        self.related_weight = related_weight
+        self.documents = 0
+        self.document_frequency = Counter()
+
+    @classmethod
+    def from_texts(cls, texts, keywords, related_terms=None):
+        """Build IDF weights from an iterable of document texts"""
+        scorer = cls(keywords, related_terms)
+        for text in texts:
+            scorer.documents += 1
+            scorer.document_frequency.update(set(tokenize(text)))
+        return scorer
+
+    def idf(self, term):
+        """Smoothed IDF; with an empty corpus every term weighs 1.0"""
+        return math.log((self.documents + 1) / (self.document_frequency.get(term, 0) + 1)) + 1
+
+    def _query_vectors(self):
+        """{keyword: {term: weight}}, each normalised to unit length"""
+        queries = {}
+        for keyword in self.keywords:
+            weights = {}
+            for term in tokenize(keyword):
+                weights[term] = self.idf(term)
+            for phrase in self.related_terms.get(keyword, []):
+                for term in tokenize(phrase):
+                    weights.setdefault(term, self.related_weight * self.idf(term))
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            queries[keyword] = {term: weight / norm for term, weight in weights.items()}
+        return queries
+
+    def _candidate_weights(self, text):
+        """Sublinear TF-IDF weights of one text and their vector norm"""
+        counts = Counter(tokenize(text))
+        weights = {term: (1 + math.log(count)) * self.idf(term) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return weights, norm
+
+    def score_texts(self, texts):
+        """Score texts against every keyword; return [(best score, best keyword)]"""
+        if not texts or not self.keywords:
+            return [(0.0, None) for _ in texts]
+
+        queries = self._query_vectors()
+        terms = sorted({term for query in queries.values() for term in query})
+        column = {term: index for index, term in enumerate(terms)}
+        candidates = [self._candidate_weights(text) for text in texts]
+
+        if np is not None:
+            query_matrix = np.zeros((len(terms), len(self.keywords)))
+            for k, keyword in enumerate(self.keywords):
+                for term, weight in queries[keyword].items():
+                    query_matrix[column[term], k] = weight
+            candidate_matrix = np.zeros((len(texts), len(terms)))
+            norms = np.ones(len(texts))
+            for row, (weights, norm) in enumerate(candidates):
+                for term, weight in weights.items():
+                    if term in column:
+                        candidate_matrix[row, column[term]] = weight
+                if norm:
+                    norms[row] = norm
+            scores = (candidate_matrix @ query_matrix) / norms[:, None]
+            best = scores.argmax(axis=1)
+            return [(float(scores[row, k]), self.keywords[k]) for row, k in enumerate(best)]
+
+        results = []
+        for weights, norm in candidates:
+            best_score, best_keyword = 0.0, self.keywords[0]
+            for keyword in self.keywords:
+                dot = sum(weight * weights.get(term, 0.0) for term, weight in queries[keyword].items())
+                score = dot / norm if norm else 0.0
+                if score > best_score:
+                    best_score, best_keyword = score, keyword
+            results.append((best_score, best_keyword))
+        return results
+
+    def rank(self, jobs, threshold=0.0, top_n=0):
+        """Score JobRecords, drop those below threshold, keep the best top_n (0 = all)
+
+        Sets job.relevance and returns the jobs best first.
+        """
+        texts = [f"{job.title or ''} {job.description or ''}" for job in jobs]
+        for job, (score, _) in zip(jobs, self.score_texts(texts)):
+            job.relevance = score
+        ranked = sorted((job for job in jobs if job.relevance >= threshold),
+                        key=lambda job: job.relevance, reverse=True)
+        return ranked[:top_n] if top_n else ranked
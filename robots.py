@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+robots.py - Cached robots.txt policy for OnlineJobs.ph scraper
+
+robots.txt is parsed with urllib.robotparser and cached on disk with a TTL,
+so most runs don't fetch it at all. The scraper checks every URL against it
+before fetching, feeds its Crawl-delay into the rate controller and exposes
+any Sitemap: entries for sitemap discovery.
+"""
+
+import json
+import os
+import time
+from urllib.robotparser import RobotFileParser
+
+
+class DisallowedByRobots(Exception):
+    """Raised instead of fetching a URL that robots.txt disallows"""
+
+
+class RobotsPolicy:
+    def __init__(self, robots_url, user_agent, body=None, status=None, fetched_at=None):
+        self.robots_url = robots_url
+        self.user_agent = user_agent
+        self.status = status            # HTTP status of the fetch, None if it failed
+        self.fetched_at = fetched_at    # time.time() of the fetch
+        self.from_cache = False
+
+        self.parser = RobotFileParser(robots_url)
+        if status is not None and status < 400:
+            self.parser.parse((body or '').splitlines())
+        elif status in (401, 403):
+            # Same rule as RobotFileParser.read(): access denied means stay out
+            self.parser.disallow_all = True
+        else:
+            # 404 and friends: no robots.txt, nothing is disallowed.
+            # A failed fetch is treated the same way (and not cached).
+            self.parser.allow_all = True
+        self.body = body if status is not None and status < 400 else ''
+
+    @classmethod
+    def load(cls, session, robots_url, user_agent, cache_path, ttl_seconds, timeout=10):
+        """Policy from the disk cache if fresh, else fetched with session"""
+        cached = cls._read_cache(cache_path, robots_url)
+        if cached and time.time() - cached['fetched_at'] < ttl_seconds:
+            policy = cls(robots_url, user_agent, cached['body'], cached['status'], cached['fetched_at'])
+            policy.from_cache = True
+            return policy
+
+        try:
+            response = session.get(robots_url, timeout=timeout)
+        except Exception as e:
+            if cached:
+                print(f"⚠️ Could not fetch robots.txt ({e}); using cached copy")
+                policy = cls(robots_url, user_agent, cached['body'], cached['status'], cached['fetched_at'])
+                policy.from_cache = True
+                return policy
+            print(f"⚠️ Could not fetch robots.txt: {e}")
+            return cls(robots_url, user_agent)
+
+        if response.status_code >= 500 and cached:
+            print(f"⚠️ robots.txt returned HTTP {response.status_code}; using cached copy")
+            policy = cls(robots_url, user_agent, cached['body'], cached['status'], cached['fetched_at'])
+            policy.from_cache = True
+            return policy
+
+        policy = cls(robots_url, user_agent, response.text, response.status_code, time.time())
+        if response.status_code < 500:
+            policy._write_cache(cache_path)
+        return policy
+
+    @staticmethod
+    def _read_cache(cache_path, robots_url):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get('url') != robots_url:
+            return None
+        return cached
+
+    def _write_cache(self, cache_path):
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'url': self.robots_url,
+                'status': self.status,
+                'fetched_at': self.fetched_at,
+                'body': self.body,
+            }, f)
+        os.replace(tmp_path, cache_path)
+
+    def can_fetch(self, url):
+        return self.parser.can_fetch(self.user_agent, url)
+
+    @property
+    def crawl_delay(self):
+        """Crawl-delay for our user agent in seconds, or None"""
+        delay = self.parser.crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+    @property
+    def sitemaps(self):
+        """Sitemap: URLs listed in robots.txt"""
+        return self.parser.site_maps() or []
+
+    def summary(self):
+        """One-line description for logs"""
+        if self.status is None:
+            source = "unavailable, nothing disallowed"
+        elif self.status >= 400:
+            source = f"HTTP {self.status}, " + ("everything disallowed" if self.parser.disallow_all
+                                                 else "nothing disallowed")
+        else:
+            age_hours = (time.time() - self.fetched_at) / 3600
+            source = f"cached {age_hours:.1f}h ago" if self.from_cache else "fetched"
+        parts = [f"robots.txt {source}"]
+        if self.crawl_delay is not None:
+            parts.append(f"Crawl-delay {self.crawl_delay:g}s")
+        if self.sitemaps:
+            parts.append(f"{len(self.sitemaps)} sitemap(s)")
+        return ', '.join(parts)
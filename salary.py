@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+salary.py - Salary normaliser for OnlineJobs.ph scraper
+
+Turns free-text salaries ("$5/hr", "PHP 25,000 - 30,000 / month", "30k-50k")
+into min/max amounts, a currency (USD/PHP) and a period (hour/week/month/
+year), plus one comparable figure: the upper amount in USD per month. The
+database stores these as indexed numeric columns so salary-floor filters
+are plain range queries.
+"""
+
+import re
+from collections import namedtuple
+
+from config import Config
+
+SalaryInfo = namedtuple('SalaryInfo', ['min_amount', 'max_amount', 'currency', 'period'])
+
+# Working hours per period, for converting to a monthly figure
+_MONTHLY_MULTIPLIER = {
+    'hour': 160,        # 40 h/week x 4 weeks
+    'week': 4.33,
+    'month': 1,
+    'year': 1 / 12,
+}
+
+_CURRENCY = r'(?:US\$|\$|USD|PHP|Php|₱|(?-i:P)(?=\d))'
+_NUMBER = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?'
+_SALARY_RE = re.compile(
+    rf'(?P<cur1>{_CURRENCY})?\s*(?P<low>{_NUMBER})\s*(?P<low_k>k\b)?'
+    rf'(?:\s*(?:-|–|to)\s*(?P<cur_high>{_CURRENCY})?\s*(?P<high>{_NUMBER})\s*(?P<high_k>k\b)?)?'
+    r'\s*(?P<cur2>USD|PHP|pesos?|dollars?)?',
+    re.IGNORECASE
+)
+_PERIOD_RE = re.compile(
+    r'(?:/|\bper\s+|\ban?\s+)\s*(hour|hr|h|month|mo|week|wk|year|yr|annum)\b'
+    r'|\b(hourly|monthly|weekly|yearly|annually)\b',
+    re.IGNORECASE
+)
+_PERIOD_NAMES = {
+    'hour': 'hour', 'hr': 'hour', 'h': 'hour', 'hourly': 'hour',
+    'week': 'week', 'wk': 'week', 'weekly': 'week',
+    'month': 'month', 'mo': 'month', 'monthly': 'month',
+    'year': 'year', 'yr': 'year', 'annum': 'year', 'yearly': 'year', 'annually': 'year',
+}
+
+
+def _to_number(digits, thousands):
+    value = float(digits.replace(',', ''))
+    return value * 1000 if thousands else value
+
+
+def _currency_code(symbol):
+    if not symbol:
+        return None
+    symbol = symbol.lower()
+    if symbol in ('$', 'us$', 'usd', 'dollar', 'dollars'):
+        return 'USD'
+    return 'PHP'
+
+
+def parse_salary(text, salary_field=True):
+    """Parse a salary; None if nothing usable is found
+
+    salary_field=True means text came from the page's SALARY field, so a bare
+    number is accepted. For titles and descriptions (salary_field=False) a
+    currency marker is required, to avoid reading "40 hours" as a salary.
+    """
+    if not text:
+        return None
+
+    for match in _SALARY_RE.finditer(text):
+        low_k, high_k = match.group('low_k'), match.group('high_k')
+        currency = _currency_code(match.group('cur1') or match.group('cur_high') or match.group('cur2'))
+        if currency is None and not (salary_field or low_k or high_k):
+            continue
+
+        # "30-50k" means 30k-50k
+        low = _to_number(match.group('low'), low_k or high_k)
+        high = _to_number(match.group('high'), high_k) if match.group('high') else low
+        if low <= 0:
+            continue
+        if high < low:
+            low, high = high, low
+
+        # Bare numbers: OnlineJobs.ph posts pay in pesos unless marked as dollars
+        if currency is None:
+            currency = 'PHP' if high >= 1000 else 'USD'
+
+        period_match = _PERIOD_RE.search(text, match.end())
+        if period_match:
+            period = _PERIOD_NAMES[(period_match.group(1) or period_match.group(2)).lower()]
+        elif currency == 'USD':
+            period = 'hour' if high < 50 else 'month'
+        else:
+            period = 'hour' if high < 500 else 'month'
+
+        return SalaryInfo(low, high, currency, period)
+
+    return None
+
+
+def monthly_usd(info):
+    """Upper salary amount converted to USD per month (for floors and sorting)"""
+    if info is None:
+        return None
+    amount = info.max_amount * _MONTHLY_MULTIPLIER[info.period]
+    if info.currency == 'PHP':
+        amount /= Config.PHP_PER_USD
+    return round(amount, 2)
+
+
+def format_salary(info):
+    """Human-readable form of a SalaryInfo, e.g. '$800-1,000/month'"""
+    if info is None:
+        return None
+    symbol = '$' if info.currency == 'USD' else '₱'
+    cents = info.max_amount < 100 and (info.min_amount % 1 or info.max_amount % 1)
+    fmt = '{:,.2f}' if cents else '{:,.0f}'
+    amount = fmt.format(info.min_amount)
+    if info.max_amount != info.min_amount:
+        amount += '-' + fmt.format(info.max_amount)
+    return f"{symbol}{amount}/{info.period}"
+
+
+def salary_fields(text, salary_field=True):
+    """Column values for a salary text (all None when it can't be parsed)"""
+    info = parse_salary(text, salary_field)
+    if info is None:
+        return {
+            'salary_min': None, 'salary_max': None, 'salary_currency': None,
+            'salary_period': None, 'salary_usd_month': None,
+        }
+    return {
+        'salary_min': info.min_amount,
+        'salary_max': info.max_amount,
+        'salary_currency': info.currency,
+        'salary_period': info.period,
+        'salary_usd_month': monthly_usd(info),
+    }
+
+
+def meets_salary_floor(usd_month, floor=None):
+    """Pre-notification filter; jobs without a parsed salary always pass"""
+    floor = Config.SALARY_FLOOR_USD_MONTH if floor is None else floor
+    if not floor or usd_month is None:
+        return True
+    return usd_month >= floor
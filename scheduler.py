@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+scheduler.py - Request budget and priority scheduling for run_scrape
+
+Search pages and job-page fetches go through one priority queue, ordered
+by expected new jobs per request. A run can be given a budget: a deadline
+(--deadline), a request cap (--max-requests), or both. The work most likely
+to pay off runs first, so whatever is left when the budget runs out is the
+least valuable. The leftover work is reported, not lost: unfetched listings
+are still new to the next run.
+
+Values are in new jobs per request:
+- a job page yields at most one job. Its value is 0.5 + its listing's
+  relevance score (relevance.py), so strong matches come first;
+- a search page expected to turn up n new listings costs n + 1 requests
+  before those jobs are saved (the page plus a job page each), a value
+  of n / (n + 1). n comes from the keyword's past yield (new listings per
+  search request, kept in the crawl state), updated with what the previous
+  page of this run actually found.
+Productive search pages therefore run before weak matches but after
+strong ones. Without a budget everything runs, and only the order changes.
+"""
+
+import heapq
+import itertools
+
+from clock import REAL_CLOCK
+
+# Known jobs whose page changed (sitemaps): refreshed, never notified
+REFRESH_VALUE = 0.25
+
+
+class BudgetExhausted(Exception):
+    """Raised instead of sending a request the budget has no room for"""
+
+
+class RequestBudget:
+    def __init__(self, max_requests=0, deadline_seconds=0, reserve_seconds=60, clock=None):
+        self.clock = clock or REAL_CLOCK
+        self.max_requests = max_requests          # 0 = no cap
+        self.deadline_seconds = deadline_seconds  # 0 = no deadline
+        self.reserve_seconds = reserve_seconds    # Kept free for notifying Discord
+        self.started = self.clock.monotonic()
+        self.requests = 0
+
+    @property
+    def elapsed(self):
+        return self.clock.monotonic() - self.started
+
+    def seconds_per_request(self):
+        """Average time one request has taken so far, pacing included"""
+        return self.elapsed / self.requests if self.requests else 0.0
+
+    def allows(self, wait=0.0):
+        """True if one more request fits in the budget, after waiting wait seconds first"""
+        if self.max_requests and self.requests >= self.max_requests:
+            return False
+        if self.deadline_seconds:
+            time_left = self.deadline_seconds - self.reserve_seconds - self.elapsed
+            if time_left < max(0.0, wait) + self.seconds_per_request():
+                return False
+        return True
+
+    def spend(self, wait=0.0):
+        """Count one request about to be sent; raise BudgetExhausted if it doesn't fit"""
+        if not self.allows(wait):
+            raise BudgetExhausted(self.summary())
+        self.requests += 1
+
+    def summary(self):
+        """One-line description for logs"""
+        parts = [f"{self.requests}" + (f"/{self.max_requests}" if self.max_requests else "") + " requests"]
+        if self.deadline_seconds:
+            parts.append(f"{self.elapsed / 60:.1f}/{self.deadline_seconds / 60:g} min")
+        return ', '.join(parts)
+
+
+def search_value(expected_new):
+    """Value of a search page expected to find expected_new new listings
+
+    None (a keyword with no history yet) gets the highest search value, so
+    new keywords are tried early.
+    """
+    if expected_new is None:
+        return 1.0
+    expected_new = max(0.0, expected_new)
+    return expected_new / (1 + expected_new)
+
+
+def detail_value(relevance):
+    """Value of fetching the job page of a listing with this relevance score"""
+    return 0.5 + (relevance or 0.0)
+
+
+class Task:
+    def __init__(self, kind, value, keyword=None, page=None, job=None):
+        self.kind = kind        # 'search', 'detail' or 'refresh'
+        self.value = value      # Expected new jobs per request
+        self.keyword = keyword  # search: keyword and page number
+        self.page = page
+        self.job = job          # detail/refresh: the JobRecord
+
+    def __repr__(self):
+        target = f"{self.keyword!r} page {self.page}" if self.kind == 'search' else repr(self.job)
+        return f"Task({self.kind}, {target}, {self.value:.2f})"
+
+
+class CrawlScheduler:
+    def __init__(self):
+        self._heap = []
+        self._order = itertools.count()  # Ties keep insertion (plan) order
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, task):
+        heapq.heappush(self._heap, (-task.value, next(self._order), task))
+
+    def add_search(self, keyword, page, expected_new):
+        self.push(Task('search', search_value(expected_new), keyword=keyword, page=page))
+
+    def add_detail(self, job, relevance):
+        self.push(Task('detail', detail_value(relevance), job=job))
+
+    def add_refresh(self, job):
+        self.push(Task('refresh', REFRESH_VALUE, job=job))
+
+    def pop(self):
+        """Highest-value task, or None when the queue is empty"""
+        return heapq.heappop(self._heap)[2] if self._heap else None
+
+    def deferred_summary(self):
+        """Multi-line description of the tasks still queued"""
+        tasks = [entry[2] for entry in sorted(self._heap)]
+        pages = {}
+        for task in tasks:
+            if task.kind == 'search':
+                pages.setdefault(task.keyword, []).append(task.page)
+        details = [task for task in tasks if task.kind == 'detail']
+        refreshes = sum(1 for task in tasks if task.kind == 'refresh')
+
+        lines = [f"⏳ Deferred to the next run: {len(pages)} keyword(s) with more search pages, "
+                 f"{len(details)} job pages, {refreshes} refreshes"]
+        for keyword, numbers in pages.items():
+            lines.append(f"   • '{keyword}' from page {min(numbers)}")
+        for task in details[:5]:
+            lines.append(f"   • {task.job.title[:50]} (relevance {task.job.relevance or 0:.2f})")
+        if len(details) > 5:
+            lines.append(f"   • ... and {len(details) - 5} more job pages")
+        return '\n'.join(lines)
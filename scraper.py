@@ -6,21 +6,115 @@ scraper.py - Main OnlineJobs.ph scraper
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-import time
-import random
 import re
+import time
 from urllib.parse import urljoin
 from database import JobDatabase
+from job_record import JobRecord
+from normalize import clean_text, normalize_job
+from crawl_state import CrawlState
+from sitemap_discovery import SitemapDiscovery
+from frontier import CrawlFrontier
+from scheduler import BudgetExhausted, CrawlScheduler, RequestBudget
+from extraction_health import ExtractionHealth
+from relevance import RelevanceScorer
+from query_planner import KeywordPlan, KeywordPlanner
+from robots import DisallowedByRobots, RobotsPolicy
+from rate_control import AdaptiveRateController, parse_retry_after
+from salary import salary_fields, meets_salary_floor
 from discord_sender import DiscordSender
+from clock import REAL_CLOCK
 from config import Config
 
+# Listing and detail pages show dates as "Oct 21, 2025" (sometimes with a
+# time), ISO timestamps, or relative phrases like "3 hours ago"
+_MONTH_DATE_RE = re.compile(
+    r'\b([A-Z][a-z]{2,8})\.?\s+(\d{1,2}),?\s+(\d{4})(?:\s+(\d{1,2}):(\d{2})(?::(\d{2}))?)?'
+)
+_ISO_DATE_RE = re.compile(r'\b(\d{4}-\d{2}-\d{2})(?:[ T](\d{2}:\d{2}(?::\d{2})?))?')
+_RELATIVE_DATE_RE = re.compile(r'\b(\d+)\s*(minute|min|hour|hr|day|week|month)s?\s+ago', re.IGNORECASE)
+_RELATIVE_UNITS = {
+    'minute': timedelta(minutes=1), 'min': timedelta(minutes=1),
+    'hour': timedelta(hours=1), 'hr': timedelta(hours=1),
+    'day': timedelta(days=1), 'week': timedelta(weeks=1), 'month': timedelta(days=30),
+}
+
+def parse_posted_date(text, now=None):
+    """Parse a posting/update date from listing or detail text; None if absent"""
+    if not text:
+        return None
+    now = now or datetime.now()
+    
+    # Prefer whatever follows "Posted" / "Posted on" when present
+    posted = re.search(r'Posted(?:\s+on)?\s*:?\s*(.+)', text, re.IGNORECASE)
+    if posted:
+        text = posted.group(1)
+    
+    match = _MONTH_DATE_RE.search(text)
+    if match:
+        month, day, year, hour, minute, second = match.groups()
+        try:
+            parsed = datetime.strptime(f"{month[:3]} {day} {year}", "%b %d %Y")
+            if hour is not None:
+                parsed = parsed.replace(hour=int(hour), minute=int(minute), second=int(second or 0))
+            return parsed
+        except ValueError:
+            pass
+    
+    match = _ISO_DATE_RE.search(text)
+    if match:
+        try:
+            return datetime.fromisoformat(' '.join(part for part in match.groups() if part))
+        except ValueError:
+            pass
+    
+    match = _RELATIVE_DATE_RE.search(text)
+    if match:
+        return now - int(match.group(1)) * _RELATIVE_UNITS[match.group(2).lower()]
+    
+    lowered = text.lower()
+    if 'just now' in lowered or 'today' in lowered:
+        return now
+    if 'yesterday' in lowered:
+        return now - timedelta(days=1)
+    return None
+
+# Related terms accepted by matches_keywords() for each default keyword
+BROADER_TERMS = {
+    'admin': ['administration', 'administrative', 'office', 'assistant', 'support', 
+            'coordinator', 'clerk', 'secretary', 'receptionist', 'data entry'],
+    'automation': ['automated', 'script', 'workflow', 'process', 'bot', 'rpa', 
+                'zapier', 'integration', 'api', 'system'],
+    'entry level': ['junior', 'trainee', 'intern', 'beginner', 'new grad', 
+                    'graduate', 'starter', 'entry-level', 'no experience'],
+    'associate': ['junior', 'coordinator', 'specialist', 'assistant', 'analyst', 
+                'representative', 'officer', 'team member'],
+    'operations': ['ops', 'operational', 'management', 'coordinator', 'supervisor', 
+                'logistics', 'workflow', 'process', 'production', 'business']
+}
+
+class JobPageUnavailable(Exception):
+    """A job page could not be fetched (after retries, or robots.txt forbids it)"""
+
 class OnlineJobsScraper:
-    def __init__(self):
+    def __init__(self, work_queue=None, clock=None, session=None, discord_session=None):
+        # Every delay goes through the clock; pass a VirtualClock (and a fake
+        # session) to run the pipeline offline without real sleeping.
+        # --record/--replay pass cassette sessions for both (cassette.py)
+        self.clock = clock or REAL_CLOCK
         self.base_url = "https://www.onlinejobs.ph"
         self.search_url = f"{self.base_url}/jobseekers/jobsearch"
-        self.session = requests.Session()
-        self.db = JobDatabase()
-        self.discord = DiscordSender()
+        
+        # Newest-first ordering lets pagination stop at the --days window
+        self.sort_params = dict(
+            part.split('=', 1) for part in Config.SEARCH_SORT_PARAM.split('&') if '=' in part
+        )
+        self.session = session or requests.Session()
+        self.db = JobDatabase(Config.DATABASE_PATH)
+        self.discord = DiscordSender(clock=self.clock, session=discord_session)
+        
+        # Known/sent IDs carried between CI runs, where jobs.db starts empty
+        self.state = CrawlState.load(Config.STATE_PATH)
         
         # Setup headers to avoid bot detection
         self.session.headers.update({
@@ -32,127 +126,251 @@ class OnlineJobsScraper:
 
         self.keywords = Config.KEYWORDS
         
-        # Check robots.txt compliance
+        # keyword -> [[job IDs on page 1], [page 2], ...] from this run's searches
+        self.search_pages = {}
+        
+        # Shared WorkQueue when running as one of several workers (run_worker)
+        self.work_queue = work_queue
+        
+        # Checkpoints of the current run_scrape, so a killed run can resume
+        self.frontier = None
+        
+        # RequestBudget of the current run_scrape (--max-requests/--deadline)
+        self.budget = None
+        
+        # Notify-first previews posted this run (DISCORD_NOTIFY_FIRST)
+        self.previews_posted = 0
+        
+        # Which pattern found each job-page field, against past runs' hit rates
+        self.extraction = ExtractionHealth(
+            self.state.extraction_baseline,
+            min_pages=Config.EXTRACTION_MIN_PAGES,
+            min_ratio=Config.EXTRACTION_MIN_RATIO
+        )
+        
+        # Adaptive pacing: speeds up to RESPECTFUL_DELAY_MIN, backs off on 429/5xx
+        self.rate = AdaptiveRateController(
+            Config.RESPECTFUL_DELAY_MIN,
+            Config.RESPECTFUL_DELAY_MAX,
+            backoff_ceiling=Config.MAX_BACKOFF_DELAY,
+            clock=self.clock
+        )
+        
+        # robots.txt (cached on disk): enforced per URL in _get, Crawl-delay
+        # raises the pacing floor, Sitemap: entries are kept in robots.sitemaps
         self.check_robots_txt()
 
     def check_robots_txt(self):
-        """Check robots.txt for scraping guidelines"""
-        try:
-            robots_url = f"{self.base_url}/robots.txt"
-            print("🤖 Checking robots.txt compliance...")
-            
-            response = self.session.get(robots_url, timeout=10)
-            if response.status_code == 200:
-                robots_content = response.text.lower()
-                
-                # Check if scraping is explicitly disallowed
-                if 'disallow: /' in robots_content and 'user-agent: *' in robots_content:
-                    print("⚠️ robots.txt contains general disallow directive")
-                else:
-                    print("✅ robots.txt check passed")
-            else:
-                print("⚠️ No robots.txt found - proceeding with respectful scraping")
-                
-        except Exception as e:
-            print(f"⚠️ Could not check robots.txt: {e}")
+        """Load the (cached) robots.txt policy and apply its Crawl-delay"""
+        print("🤖 Checking robots.txt compliance...")
+        self.robots = RobotsPolicy.load(
+            self.session,
+            f"{self.base_url}/robots.txt",
+            Config.USER_AGENT,
+            Config.ROBOTS_CACHE_PATH,
+            Config.ROBOTS_CACHE_TTL_HOURS * 3600
+        )
+        print(f"✅ {self.robots.summary()}")
+        if not self.robots.can_fetch(self.search_url):
+            print("⚠️ robots.txt disallows the job search pages - they will be skipped")
+        
+        crawl_delay = self.robots.crawl_delay
+        if crawl_delay is not None and crawl_delay > self.rate.min_delay:
+            self.rate.set_min_delay(crawl_delay)
             
         print("📋 Using respectful scraping practices:")
-        print(f"   • Delays: {Config.RESPECTFUL_DELAY_MIN}-{Config.RESPECTFUL_DELAY_MAX}s between requests")
+        print(f"   • Delays: adaptive, never below {self.rate.min_delay}s (starts at {Config.RESPECTFUL_DELAY_MAX}s, backs off on 429/5xx)")
         print(f"   • Limit: {Config.MAX_PAGES_PER_KEYWORD} pages per keyword")
         print("   • User-Agent: Standard browser headers")
+        for sitemap in self.robots.sitemaps:
+            print(f"   • Sitemap: {sitemap}")
+        
+    def now(self):
+        """Current local time on the scraper's clock (date windows, scraped_at)"""
+        return datetime.fromtimestamp(self.clock.time())
+
+    def _pace(self):
+        """Wait until the next request may be sent"""
+        if self.work_queue is None:
+            self.rate.wait()
+            return
         
-    def search_jobs_by_keyword(self, keyword, days_back=5):
+        # Workers reserve slots from the budget shared by the whole run
+        slot = self.work_queue.reserve_request_slot(self.rate.next_delay())
+        if not self.work_queue.heartbeat():
+            print("  ⚠️ Lease was taken over by another worker")
+        # Honour any Retry-After hold this worker has been given
+        wait = max(slot - self.clock.time(), self.rate.hold_until - self.clock.monotonic())
+        self.clock.sleep(wait)
+
+    def _get(self, url, **kwargs):
+        """Paced GET that feeds the rate controller and retries 429/5xx/network errors"""
+        full_url = requests.Request('GET', url, params=kwargs.get('params')).prepare().url
+        if not self.robots.can_fetch(full_url):
+            raise DisallowedByRobots(f"robots.txt disallows {full_url}")
+        
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.budget is not None:
+                # A Retry-After hold longer than the time left ends the run
+                self.budget.spend(wait=self.rate.hold_until - self.clock.monotonic())
+            self._pace()
+            started = self.clock.monotonic()
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.RequestException as e:
+                self.rate.record_error()
+                if attempt > Config.MAX_RETRIES:
+                    raise
+                self.rate.retries += 1
+                print(f"    ↻ {type(e).__name__}, retrying ({attempt}/{Config.MAX_RETRIES}) after {self.rate.delay:.1f}s")
+                continue
+            
+            retry_after = parse_retry_after(response.headers.get('Retry-After'), now=self.clock.time())
+            should_retry = self.rate.record(response.status_code, self.clock.monotonic() - started, retry_after)
+            if retry_after is not None and self.work_queue is not None:
+                # The whole run waits, not just this worker
+                self.work_queue.hold_requests(self.clock.time() + retry_after)
+            if should_retry and retry_after is not None and self.budget is not None \
+                    and not self.budget.allows(wait=retry_after):
+                print(f"    ⏭️  HTTP {response.status_code} with Retry-After {retry_after:.0f}s: "
+                      f"longer than the budget left, giving up on this page for this run")
+                should_retry = False
+            if should_retry and attempt <= Config.MAX_RETRIES:
+                self.rate.retries += 1
+                print(f"    ↻ HTTP {response.status_code}, retrying ({attempt}/{Config.MAX_RETRIES}) after {max(self.rate.delay, retry_after or 0):.1f}s")
+                continue
+            
+            response.raise_for_status()
+            return response
+
+    def search_jobs_by_keyword(self, keyword, days_back=5, max_pages=None):
         """Search for jobs containing specific keyword"""
         jobs = []
         page = 1
+        max_pages = max_pages or Config.MAX_PAGES_PER_KEYWORD
+        pages = self.search_pages[keyword] = []
         
-        while page <= Config.MAX_PAGES_PER_KEYWORD:
-            search_params = {
-                'q': keyword,
-                'page': page
-            }
-            
+        while page <= max_pages:
             try:
-                print(f"  Searching page {page} for '{keyword}'...")
-                response = self.session.get(self.search_url, params=search_params, timeout=30)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Use the correct selector
-                job_links = soup.find_all('a', href=re.compile(r'/jobseekers/job/'))
-                
-                # 🔧 IMPROVED FILTERING
-                unique_jobs_on_page = {}
-                
-                for link in job_links:
-                    href = link.get('href')
-                    text = link.get_text(strip=True)
-                    
-                    # More precise filtering - avoid removing legitimate jobs
-                    if (text == 'See More' or 
-                        not text or 
-                        len(text) < 5 or  # Reduced from 10 to 5 - allows shorter job titles
-                        text.lower() in ['see more', 'view more', 'load more'] or  # Common pagination text
-                        href in ['#', 'javascript:', 'javascript:void(0)']):  # Invalid links
-                        continue
-                    
-                    # Skip obvious non-job links
-                    if any(skip_text in text.lower() for skip_text in [
-                        'displaying', 'out of', 'jobs found', 'next page', 'previous page'
-                    ]):
-                        continue
-                        
-                    # Extract job ID to avoid duplicates
-                    job_id_match = re.search(r'/job/.*?-(\d+)', href)
-                    if not job_id_match:
-                        job_id_match = re.search(r'/job/(\d+)', href)
-                    
-                    if job_id_match:
-                        job_id = job_id_match.group(1)
-                        if job_id not in unique_jobs_on_page:
-                            unique_jobs_on_page[job_id] = link
-
-                
-                if not unique_jobs_on_page:
-                    print(f"    No unique job links found on page {page}")
-                    break
-                
-                print(f"    Found {len(unique_jobs_on_page)} unique job links on page {page}")
-                
-                page_jobs = []
-                for job_id, link in unique_jobs_on_page.items():
-                    try:
-                        job_data = self.extract_job_data_from_link(link, keyword, job_id)
-                        if job_data and self.is_within_date_range(job_data['posted_date'], days_back):
-                            page_jobs.append(job_data)
-                    except Exception as e:
-                        print(f"    Error extracting job: {e}")
-                        continue
-                
-                jobs.extend(page_jobs)
-                print(f"    Added {len(page_jobs)} valid jobs from page {page}")
-                
-                if not page_jobs:
-                    break
-                    
-                page += 1
-                time.sleep(random.uniform(Config.RESPECTFUL_DELAY_MIN, Config.RESPECTFUL_DELAY_MAX))
-                
+                page_jobs, last_page = self.search_page(keyword, page, days_back)
             except Exception as e:
                 print(f"  Error searching page {page} for '{keyword}': {e}")
                 break
+            
+            jobs.extend(page_jobs)
+            pages.append([job.job_id for job in page_jobs])
+            if last_page:
+                break
+            page += 1
         
         return jobs
     
+    def search_page(self, keyword, page, days_back=5):
+        """One search page as (jobs, whether to stop paginating), checkpointed
+        
+        Pages finished before an interrupted run died come from the frontier.
+        """
+        checkpoint = self.frontier.page(keyword, page) if self.frontier else None
+        if checkpoint is not None:
+            print(f"  ⏩ Page {page} for '{keyword}' done in the interrupted run ({len(checkpoint[0])} jobs)")
+            return checkpoint
+        page_jobs, last_page = self.fetch_search_page(keyword, page, days_back)
+        if self.frontier:
+            self.frontier.record_page(keyword, page, page_jobs, last_page)
+        return page_jobs, last_page
+    
+    def fetch_search_page(self, keyword, page, days_back=5):
+        """Fetch one search results page; return (jobs, whether to stop paginating)"""
+        search_params = {
+            'q': keyword,
+            'page': page,
+            **self.sort_params
+        }
+        
+        print(f"  Searching page {page} for '{keyword}'...")
+        response = self._get(self.search_url, params=search_params, timeout=30)
+        
+        soup = BeautifulSoup(response.content, 'html.parser')
+        
+        # Use the correct selector
+        job_links = soup.find_all('a', href=re.compile(r'/jobseekers/job/'))
+        
+        # 🔧 IMPROVED FILTERING
+        unique_jobs_on_page = {}
+        
+        for link in job_links:
+            href = link.get('href')
+            text = link.get_text(strip=True)
+            
+            # More precise filtering - avoid removing legitimate jobs
+            if (text == 'See More' or 
+                not text or 
+                len(text) < 5 or  # Reduced from 10 to 5 - allows shorter job titles
+                text.lower() in ['see more', 'view more', 'load more'] or  # Common pagination text
+                href in ['#', 'javascript:', 'javascript:void(0)']):  # Invalid links
+                continue
+            
+            # Skip obvious non-job links
+            if any(skip_text in text.lower() for skip_text in [
+                'displaying', 'out of', 'jobs found', 'next page', 'previous page'
+            ]):
+                continue
+                
+            # Extract job ID to avoid duplicates
+            job_id_match = re.search(r'/job/.*?-(\d+)', href)
+            if not job_id_match:
+                job_id_match = re.search(r'/job/(\d+)', href)
+            
+            if job_id_match:
+                job_id = job_id_match.group(1)
+                if job_id not in unique_jobs_on_page:
+                    unique_jobs_on_page[job_id] = link
+
+        
+        if not unique_jobs_on_page:
+            print(f"    No unique job links found on page {page}")
+            return [], True
+        
+        print(f"    Found {len(unique_jobs_on_page)} unique job links on page {page}")
+        
+        page_jobs = []
+        dated = too_old = 0
+        for job_id, link in unique_jobs_on_page.items():
+            try:
+                job = self.extract_job_data_from_link(link, keyword, job_id)
+                if not job:
+                    continue
+                if job.posted_date is not None:
+                    dated += 1
+                if self.is_within_date_range(job.posted_date, days_back):
+                    page_jobs.append(job)
+                else:
+                    too_old += 1
+            except Exception as e:
+                print(f"    Error extracting job: {e}")
+                continue
+        
+        print(f"    Added {len(page_jobs)} valid jobs from page {page}")
+        
+        # Newest first, so later pages are older still. Only a page with no
+        # dated listing in the window counts: a pinned or bumped older
+        # listing on an otherwise fresh page must not end the crawl.
+        reached_cutoff = bool(self.sort_params) and dated > 0 and too_old == dated
+        
+        if reached_cutoff:
+            print(f"    ⏹️  Reached listings older than {days_back} days - stopping pagination")
+        
+        return page_jobs, reached_cutoff or not page_jobs
+    
     def extract_job_data_from_link(self, job_link, keyword, job_id):
         """Extract job data from job link element"""
         try:
             job_url = urljoin(self.base_url, job_link['href'])
             
             # Extract job title from link text
-            job_title = job_link.get_text(strip=True)
-            job_title = re.sub(r'\s+', ' ', job_title).strip()[:255]
+            job_title = clean_text(job_link.get_text(strip=True))[:255]
             
             # CONTACT PERSON EXTRACTION
             contact_person = ""
@@ -229,73 +447,91 @@ class OnlineJobsScraper:
                             company_name = potential_company
                             break
             
-            job_data = {
-                'job_id': job_id,
-                'title': job_title,
-                'company': company_name,
-                'contact_person_initial': contact_person,  # Store the extracted contact
-                'url': job_url,
-                'posted_date': datetime.now(),
-                'job_type': 'Not specified',
-                'keyword_matched': keyword,
-                'scraped_at': datetime.now()
-            }
+            # Posting date from the listing card ("• Posted on Oct 21, 2025");
+            # None if the card doesn't show one - filled in from details later
+            card_text = job_link.get_text(' ', strip=True)
+            posted_date = parse_posted_date(card_text, now=self.now())
+            if posted_date is None and parent:
+                posted_date = parse_posted_date(parent.get_text(' ', strip=True), now=self.now())
             
-            return job_data
+            return JobRecord(
+                job_id=job_id,
+                title=job_title,
+                listing_text=job_title,
+                company=company_name,
+                listing_contact=contact_person,  # Fallback if the job page has none
+                url=job_url,
+                posted_date=posted_date,
+                job_type='Not specified',
+                keyword_matched=keyword,
+                scraped_at=self.now()
+            )
             
         except Exception as e:
             print(f"    Error in extract_job_data_from_link: {e}")
             return None
     
     def get_job_details(self, job_url):
-        """Scrape detailed job information using precise HTML selectors"""
+        """Scrape detailed job information using precise HTML selectors
+        
+        Returns a dict keyed by JobRecord field names; empty values mean the
+        page didn't have that field (see JobRecord.apply_details). Which
+        pattern found each field is recorded in self.extraction. Raises
+        JobPageUnavailable if the page can't be fetched at all.
+        """
+        try:
+            response = self._get(job_url, timeout=15)
+        except (requests.RequestException, DisallowedByRobots) as e:
+            raise JobPageUnavailable(f"{job_url}: {e}") from e
+        
         try:
-            time.sleep(random.uniform(Config.RESPECTFUL_DELAY_MIN, Config.RESPECTFUL_DELAY_MAX))
-            response = self.session.get(job_url, timeout=15)
-            response.raise_for_status()
-            
             soup = BeautifulSoup(response.content, 'html.parser')
+            sources = {}  # field -> name of the pattern that found it
             
             # 1. Extract Job Title
             job_title = ""
             title_elem = soup.select_one('h1.job__title')
             if title_elem:
                 job_title = title_elem.get_text(strip=True)
-                job_title = re.sub(r'&amp;', '&', job_title)
+                sources['title'] = 'h1.job__title'
             
             # 2. Extract Job Type
             job_type = "Not specified"
             job_type_patterns = [
-                r'TYPE OF WORK.*?<p class="fs-18">\s*([^<]+)',
-                r'Job Type.*?<p class="fs-18">\s*([^<]+)',
+                ('TYPE OF WORK label', r'TYPE OF WORK.*?<p class="fs-18">\s*([^<]+)'),
+                ('Job Type label', r'Job Type.*?<p class="fs-18">\s*([^<]+)'),
             ]
             
             page_html = str(soup)
-            for pattern in job_type_patterns:
+            for name, pattern in job_type_patterns:
                 match = re.search(pattern, page_html, re.IGNORECASE | re.DOTALL)
                 if match:
                     job_type = match.group(1).strip()
+                    sources['job_type'] = name
                     break
             
             if job_type == "Not specified":
                 if 'Full Time' in page_html:
                     job_type = 'Full Time'
+                    sources['job_type'] = 'page text'
                 elif 'Part Time' in page_html:
                     job_type = 'Part Time'
+                    sources['job_type'] = 'page text'
             
             # 3. Extract Salary
             salary = ""
             salary_patterns = [
-                r'SALARY.*?<p class="fs-18">\s*([^<]+)',
-                r'Salary.*?<p class="fs-18">\s*([^<]+)',
-                r'<p class="fs-18">\s*(\$[\d,]+(?:\.\d{2})?(?:/hr|/hour|/month)?)\s*</p>',
-                r'<p class="fs-18">\s*(\d+/hr|\$\d+)\s*</p>',
+                ('SALARY label', r'SALARY.*?<p class="fs-18">\s*([^<]+)'),
+                ('Salary label', r'Salary.*?<p class="fs-18">\s*([^<]+)'),
+                ('$ amount', r'<p class="fs-18">\s*(\$[\d,]+(?:\.\d{2})?(?:/hr|/hour|/month)?)\s*</p>'),
+                ('hourly', r'<p class="fs-18">\s*(\d+/hr|\$\d+)\s*</p>'),
             ]
             
-            for pattern in salary_patterns:
+            for name, pattern in salary_patterns:
                 match = re.search(pattern, page_html, re.IGNORECASE | re.DOTALL)
                 if match:
                     salary = match.group(1).strip()
+                    sources['salary'] = name
                     break
             
             # 4. Extract Contact Person
@@ -303,15 +539,16 @@ class OnlineJobsScraper:
             
             # Look for contact person patterns in HTML
             contact_patterns = [
-                r'Contact Person:\s*<strong>([^<]+)</strong>',
-                r'Contact Person:\s*([^\n\r<]+)',
-                r'Employer:\s*<strong>([^<]+)</strong>',
+                ('Contact Person <strong>', r'Contact Person:\s*<strong>([^<]+)</strong>'),
+                ('Contact Person text', r'Contact Person:\s*([^\n\r<]+)'),
+                ('Employer <strong>', r'Employer:\s*<strong>([^<]+)</strong>'),
             ]
             
-            for pattern in contact_patterns:
+            for name, pattern in contact_patterns:
                 match = re.search(pattern, page_html, re.IGNORECASE)
                 if match:
                     contact_person = match.group(1).strip()
+                    sources['contact_person'] = name
                     break
             
             # Backup: Card structure
@@ -323,20 +560,22 @@ class OnlineJobsScraper:
                         strong_elem = card.select_one('strong')
                         if strong_elem:
                             contact_person = strong_elem.get_text(strip=True)
+                            sources['contact_person'] = '.card-body strong'
                             break
             
             # 5. Extract Posted Date
             posted_date = ""
             date_patterns = [
-                r'DATE UPDATED.*?<p class="fs-18">\s*([^<]+)',
-                r'Posted.*?<p class="fs-18">\s*([^<]+)',
-                r'<p class="fs-18">\s*([A-Za-z]{3}\s+\d{1,2},\s+\d{4})\s*</p>',
+                ('DATE UPDATED label', r'DATE UPDATED.*?<p class="fs-18">\s*([^<]+)'),
+                ('Posted label', r'Posted.*?<p class="fs-18">\s*([^<]+)'),
+                ('bare date', r'<p class="fs-18">\s*([A-Za-z]{3}\s+\d{1,2},\s+\d{4})\s*</p>'),
             ]
             
-            for pattern in date_patterns:
+            for name, pattern in date_patterns:
                 match = re.search(pattern, page_html, re.IGNORECASE | re.DOTALL)
                 if match:
                     posted_date = match.group(1).strip()
+                    sources['posted_date'] = name
                     break
             
             # 6. Extract Description
@@ -355,6 +594,7 @@ class OnlineJobsScraper:
                     desc_text = desc_elem.get_text(separator=' ', strip=True)
                     if 'TYPE OF WORK' not in desc_text and len(desc_text) > 100:
                         description = desc_text
+                        sources['description'] = selector
                         break
             
             if not description:
@@ -369,64 +609,62 @@ class OnlineJobsScraper:
                             if len(' '.join(desc_parts)) > 300:
                                 break
                     description = ' '.join(desc_parts)
+                    if description:
+                        sources['description'] = 'paragraphs'
             
+            self.extraction.record_page(sources)
             return {
-                'clean_title': job_title[:200] if job_title else "",
-                'job_type_clean': job_type,
-                'salary_clean': salary,
+                'title': job_title[:200] if job_title else "",
+                'job_type': job_type,
+                'salary': salary,
+                **salary_fields(salary),
                 'contact_person': contact_person[:100] if contact_person else "",
-                'posted_date_clean': posted_date,
+                'posted_date_text': posted_date,
+                'date_updated': parse_posted_date(posted_date, now=self.now()),
                 'description': description[:600] if description else "",
             }
             
+        except BudgetExhausted:
+            raise
         except Exception as e:
             print(f"    Error getting job details from {job_url}: {e}")
-            return {
-                'clean_title': "",
-                'job_type_clean': "",
-                'salary_clean': "",
-                'contact_person': "",
-                'posted_date_clean': "",
-                'description': "",
-            }
+            return {}
 
     def is_within_date_range(self, posted_date, days_back):
-        """Check if job is within date range"""
-        cutoff_date = datetime.now() - timedelta(days=days_back)
+        """Check if job is within date range (unknown dates pass)"""
+        if posted_date is None:
+            return True
+        # Listings often carry only a date, so the window starts at midnight
+        cutoff_date = (self.now() - timedelta(days=days_back)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
         return posted_date >= cutoff_date
 
-    def matches_keywords(self, job_data):
+    def matched_keyword(self, text):
+        """First configured keyword appearing in text (exact phrase), or None"""
+        text = (text or '').lower()
+        for keyword in self.keywords:
+            if keyword.lower() in text:
+                return keyword
+        return None
+
+    def matches_keywords(self, job):
         """Check if job matches keywords with broader term matching AND exclusion filter"""
-        text_to_search = f"{job_data['title']} {job_data.get('description', '')}".lower()
+        text_to_search = f"{job.title} {job.description or ''}".lower()
         
         # 🚫 FIRST: Check for excluded keywords - immediate rejection
         for excluded_keyword in Config.EXCLUDED_KEYWORDS:
             if excluded_keyword in text_to_search:
-                print(f"    ⏭️  Excluded due to keyword: '{excluded_keyword}' in '{job_data['title'][:50]}...'")
+                print(f"    ⏭️  Excluded due to keyword: '{excluded_keyword}' in '{job.title[:50]}...'")
                 return False
         
         # ✅ THEN: Check for wanted keywords (existing logic)
-        broader_terms = {
-            'admin': ['administration', 'administrative', 'office', 'assistant', 'support', 
-                    'coordinator', 'clerk', 'secretary', 'receptionist', 'data entry'],
-            'automation': ['automated', 'script', 'workflow', 'process', 'bot', 'rpa', 
-                        'zapier', 'integration', 'api', 'system'],
-            'entry level': ['junior', 'trainee', 'intern', 'beginner', 'new grad', 
-                            'graduate', 'starter', 'entry-level', 'no experience'],
-            'associate': ['junior', 'coordinator', 'specialist', 'assistant', 'analyst', 
-                        'representative', 'officer', 'team member'],
-            'operations': ['ops', 'operational', 'management', 'coordinator', 'supervisor', 
-                        'logistics', 'workflow', 'process', 'production', 'business']
-        }
-        
         # Check original keyword or related terms
+        if self.matched_keyword(text_to_search):
+            return True
         for keyword in self.keywords:
-            # Direct keyword match
-            if keyword.lower() in text_to_search:
-                return True
-            
             # Check related terms for this keyword
-            related_terms = broader_terms.get(keyword, [])
+            related_terms = BROADER_TERMS.get(keyword, [])
             for term in related_terms:
                 if term in text_to_search:
                     return True
@@ -434,78 +672,546 @@ class OnlineJobsScraper:
         # Also accept jobs if they were found by our keyword search
         return True
 
-    def run_scrape(self, days_back=5):
-        """Main scraping function"""
-        print(f"🕷️ Starting OnlineJobs.ph scrape - looking {days_back} days back")
+    def is_new_job(self, job_id):
+        """True if the job is neither in the crawl state nor in the database"""
+        if self.state.is_known(job_id):
+            return False
+        if self.db.job_exists(job_id):
+            self.state.add_known(job_id)
+            return False
+        return True
+
+    def process_job(self, job, fetch_details=True):
+        """Fetch details for a new listing, filter it and save it; True if saved
         
-        all_jobs = []
-        new_jobs = []
+        fetch_details=False for a job whose details were checkpointed by an
+        interrupted run. If the job page can't be fetched, JobPageUnavailable
+        propagates and nothing is saved: the job stays unknown (and 'listed'
+        in the frontier), so the next run finds it again and retries.
+        """
+        print(f"  Processing new job: {job.title[:50]}...")
         
-        # Search for each keyword
-        for keyword in self.keywords:
-            print(f"🔍 Searching for keyword: '{keyword}'")
+        # Get detailed info
+        if fetch_details:
             try:
-                jobs = self.search_jobs_by_keyword(keyword, days_back)
-                all_jobs.extend(jobs)
-                print(f"  Found {len(jobs)} jobs for '{keyword}'")
-            except Exception as e:
-                print(f"  Error searching for '{keyword}': {e}")
-            
-            time.sleep(random.uniform(2, 4))
+                details = self.get_job_details(job.url)
+            except JobPageUnavailable:
+                if job.discord_message_id:
+                    self.withdraw_preview(job)
+                raise
+            job.apply_details(details)
+            self.checkpoint(job, 'detailed')
+
+        # Use initial contact person as fallback
+        if not job.contact_person and job.listing_contact:
+            job.contact_person = job.listing_contact
+            print(f"    📝 Using extracted contact person: '{job.contact_person}'")
         
-        # Remove duplicates
-        unique_jobs = {}
-        for job in all_jobs:
-            unique_jobs[job['job_id']] = job
+        # Listing had no date: fall back to DATE UPDATED, then to now
+        if job.posted_date is None:
+            job.posted_date = job.date_updated or self.now()
         
-        print(f"📊 Found {len(unique_jobs)} unique jobs after deduplication")
+        # Clean the text fields once; the stored values are final
+        normalize_job(job)
+
+        # Final keyword check
+        if self.matches_keywords(job):
+            status = self.db.upsert_job(job)
+            if status is not None:
+                self.state.add_known(job.job_id)
+                self.checkpoint(job, 'saved')
+                print(f"    ✅ Saved: {job.title}")
+                if status == 'updated':
+                    self.update_changed_message(job)
+                if job.discord_message_id:
+                    self.complete_preview(job)
+                return True
+            print(f"    ❌ Failed to save: {job.title}")
+        else:
+            self.checkpoint(job, 'filtered')
+            print(f"    ⏭️  Doesn't match keywords")
+        if job.discord_message_id:
+            self.withdraw_preview(job)
+        return False
+    
+    def notify_early(self, job):
+        """Post a preview of a new listing before its job page is fetched (DISCORD_NOTIFY_FIRST)"""
+        if job.discord_message_id:
+            return  # Posted by the interrupted run
+        if Config.RELEVANCE_TOP_N and self.previews_posted >= Config.RELEVANCE_TOP_N:
+            return  # No more previews than job pages that will be fetched
+        title = (job.title or '').lower()
+        if any(excluded in title for excluded in Config.EXCLUDED_KEYWORDS):
+            return  # The final keyword check would drop it
+        job.discord_message_id = self.discord.post_job_preview(job)
+        if job.discord_message_id:
+            self.previews_posted += 1
+            self.checkpoint(job, 'listed')
+    
+    def complete_preview(self, job):
+        """Edit a saved job's preview into the full embed, or withdraw it below the salary floor"""
+        if not meets_salary_floor(job.salary_usd_month):
+            self.withdraw_preview(job)
+            return
+        if self.discord.update_job_message(job.discord_message_id, job):
+            self.db.mark_as_sent(job.job_id, job.discord_message_id)
+            self.state.mark_sent(job.job_id)
+            self.checkpoint(job, 'notified')
+            print(f"    🔔 Discord preview filled in")
+        # Otherwise it stays unsent and goes out with the end-of-run batch
+    
+    def withdraw_preview(self, job):
+        """Delete the preview of a job that won't be notified after all"""
+        self.discord.delete_job_message(job.discord_message_id)
+        job.discord_message_id = None
+        print(f"    🔕 Discord preview withdrawn")
+    
+    def update_changed_message(self, job):
+        """Edit the Discord message of a job whose posting changed, if it has its own"""
+        if job.discord_message_id:
+            return  # Still a preview: complete_preview() edits it
+        message_id = self.db.get_discord_message_id(job.job_id)
+        if message_id and self.discord.update_job_message(message_id, job, changed=True):
+            print(f"    ✏️  Discord message updated")
+    
+    def checkpoint(self, job, stage):
+        """Record a job's stage in the crawl frontier (run_scrape only)"""
+        if self.frontier is not None:
+            self.frontier.set_stage(job, stage)
+
+    def run_worker(self, days_back=5, idle_poll=2.0):
+        """Process leased tasks from self.work_queue until the run is drained"""
+        queue = self.work_queue
+        print(f"👷 Worker {queue.owner} joined run {queue.run_id}")
         
-        # Process new jobs
-        for job_id, job_data in unique_jobs.items():
+        while True:
+            lease = queue.claim()
+            if lease is None:
+                if queue.is_drained():
+                    break
+                # Other workers still hold leases that may expire and come back
+                self.clock.sleep(idle_poll)
+                continue
+            
             try:
-                if not self.db.job_exists(job_id):
-                    print(f"  Processing new job: {job_data['title'][:50]}...")
-                    
-                    # Get detailed info
-                    details = self.get_job_details(job_data['url'])
+                if lease.kind == 'search':
+                    keyword = lease.payload['keyword']
+                    print(f"🔍 Searching for keyword: '{keyword}'")
+                    jobs = self.search_jobs_by_keyword(keyword, days_back)
+                    queued = 0
+                    for job in jobs:
+                        if self.is_new_job(job.job_id):
+                            queued += queue.enqueue('detail', job.job_id, job.to_dict())
+                    print(f"  Found {len(jobs)} jobs for '{keyword}', queued {queued} for details")
+                    queue.complete(lease)
+                elif lease.kind == 'detail':
+                    saved = self.process_job(JobRecord.from_dict(lease.payload))
+                    queue.complete(lease, 'saved' if saved else 'skipped')
+                else:
+                    queue.fail(lease, f"unknown task kind {lease.kind}")
+            except Exception as e:
+                print(f"  Error in task {lease.task_id}: {e}")
+                queue.fail(lease, e)
+        
+        print(f"👷 Worker {queue.owner} finished ({self.rate.summary()})")
 
-                    # Use initial contact person as fallback
-                    if not details.get('contact_person') and job_data.get('contact_person_initial'):
-                        details['contact_person'] = job_data['contact_person_initial']
-                        print(f"    📝 Using extracted contact person: '{details['contact_person']}'")
+    def plan_keywords(self):
+        """Keyword order and page depths from the overlap of recent runs"""
+        max_pages = Config.MAX_PAGES_PER_KEYWORD
+        if not Config.QUERY_PLANNER:
+            return KeywordPlan(list(self.keywords), {keyword: max_pages for keyword in self.keywords},
+                               max_pages, 0.0, 0.0, 1.0, "disabled")
+        
+        planner = KeywordPlanner(
+            self.state.keyword_runs,
+            max_pages,
+            tolerance=Config.PLANNER_TOLERANCE,
+            explore_every=Config.PLANNER_EXPLORE_EVERY,
+        )
+        plan = planner.plan(self.keywords, self.state.runs + 1)
+        print(plan.summary())
+        overlaps = sorted(planner.overlap(self.keywords).items(), key=lambda item: -item[1])
+        for (a, b), share in overlaps[:3]:
+            if share >= 0.5:
+                print(f"   ↔ {share:.0%} of '{a}' results also come from '{b}'")
+        return plan
 
-                    job_data.update(details)
+    def discover_from_sitemaps(self, days_back=5):
+        """New and changed jobs from sitemaps/feeds; (None, []) if there are none"""
+        checkpoint = self.frontier.page('sitemap', 1) if self.frontier else None
+        if checkpoint is not None:
+            new_jobs = checkpoint[0]
+            changed_jobs = list(self.frontier.jobs(stage='listed', changed=True).values())
+            print(f"⏩ Sitemaps read in the interrupted run: {len(new_jobs)} new, "
+                  f"{len(changed_jobs)} changed jobs still to check")
+            return {job.job_id: job for job in new_jobs}, changed_jobs
+        
+        sitemap_urls = list(dict.fromkeys(self.robots.sitemaps + Config.SITEMAP_URLS))
+        if not sitemap_urls:
+            print("🗺️  No sitemaps in robots.txt or SITEMAP_URLS - falling back to search pages")
+            return None, []
+        
+        print(f"🗺️  Discovering jobs from {len(sitemap_urls)} sitemap(s)")
+        discovery = SitemapDiscovery(self, max_sitemaps=Config.MAX_SITEMAPS)
+        new_jobs, changed_jobs = discovery.discover(sitemap_urls, days_back)
+        print(f"  {discovery.summary()}")
+        if discovery.requests == 0:
+            print("  No sitemap could be read - falling back to search pages")
+            return None, []
+        print(f"📊 Found {len(new_jobs)} new and {len(changed_jobs)} changed jobs in sitemaps")
+        if self.frontier:
+            self.frontier.record_page('sitemap:changed', 1, changed_jobs, last_page=True, changed=True)
+            self.frontier.record_page('sitemap', 1, new_jobs, last_page=True)
+        return {job.job_id: job for job in new_jobs}, changed_jobs
 
-                    # Final keyword check
-                    if self.matches_keywords(job_data):
-                        if self.db.save_job(job_data):
-                            new_jobs.append(job_data)
-                            print(f"    ✅ Saved: {job_data['title']}")
-                        else:
-                            print(f"    ❌ Failed to save: {job_data['title']}")
-                    else:
-                        print(f"    ⏭️  Doesn't match keywords")
+    def build_scorer(self):
+        """TF-IDF scorer with IDF weights from the stored jobs"""
+        started = time.perf_counter()
+        scorer = RelevanceScorer.from_texts(
+            self.db.iter_corpus_texts(Config.RELEVANCE_CORPUS_SIZE), self.keywords, BROADER_TERMS
+        )
+        print(f"🎯 Relevance corpus: {scorer.documents} stored jobs, "
+              f"{len(scorer.document_frequency)} terms ({(time.perf_counter() - started) * 1000:.0f} ms)")
+        return scorer
+
+    def rank_candidates(self, scorer, candidates):
+        """Score new listings by relevance, best first; drop those below the threshold"""
+        if not candidates:
+            return candidates
+        started = time.perf_counter()
+        ranked = scorer.rank(candidates, Config.RELEVANCE_THRESHOLD)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        skipped = len(candidates) - len(ranked)
+        print(f"  🎯 Scored {len(candidates)} new listings in {elapsed_ms:.1f} ms"
+              + (f", skipping {skipped} below the relevance threshold" if skipped else ""))
+        return ranked
+
+    def queue_candidates(self, scheduler, scorer, jobs, stages, detailed):
+        """Queue job-page fetches for the new listings among jobs; return how many were new
+        
+        stages/detailed hold what an interrupted run already did (frontier).
+        """
+        candidates = []
+        for job in jobs:
+            stage = stages.get(job.job_id, 'listed')
+            if stage == 'detailed':
+                candidates.append(detailed[job.job_id])
+            elif stage != 'listed':
+                # Filtered, saved or notified before the interruption
+                if stage != 'filtered':
+                    self.state.add_known(job.job_id)
+            elif self.is_new_job(job.job_id):
+                candidates.append(job)
+            else:
+                print(f"  Job already exists: {job.title[:50]}")
+        for job in self.rank_candidates(scorer, candidates):
+            scheduler.add_detail(job, job.relevance)
+            if Config.DISCORD_NOTIFY_FIRST and job.job_id not in detailed:
+                self.notify_early(job)
+        return len(candidates)
+
+    def crawl(self, scheduler, scorer, depths, days_back, stages, detailed):
+        """Run queued search pages and job pages, highest value first, within the budget
+        
+        Returns the new jobs saved. Whatever is still queued when the budget
+        runs out stays in the scheduler.
+        """
+        new_jobs = []
+        seen = set()
+        details_fetched = 0
+        top_n_skipped = 0
+        unavailable = 0
+        yields = {}  # keyword -> [search pages, new listings] this run
+        
+        while scheduler:
+            if self.budget is not None and not self.budget.allows():
+                print(f"⏱️  Budget spent ({self.budget.summary()})")
+                break
+            task = scheduler.pop()
+            try:
+                if task.kind == 'search':
+                    keyword, page = task.keyword, task.page
+                    if page == 1:
+                        print(f"🔍 Searching for keyword: '{keyword}'")
+                    try:
+                        page_jobs, last_page = self.search_page(keyword, page, days_back)
+                    except BudgetExhausted:
+                        raise
+                    except Exception as e:
+                        print(f"  Error searching page {page} for '{keyword}': {e}")
+                        continue
+                    self.search_pages.setdefault(keyword, []).append([job.job_id for job in page_jobs])
+                    fresh = [job for job in page_jobs if job.job_id not in seen]
+                    seen.update(job.job_id for job in fresh)
+                    new = self.queue_candidates(scheduler, scorer, fresh, stages, detailed)
+                    stats = yields.setdefault(keyword, [0, 0])
+                    stats[0] += 1
+                    stats[1] += new
+                    if not last_page and page < depths[keyword]:
+                        # What this page found is the best guess for the next one
+                        past = self.state.yield_per_request(keyword)
+                        scheduler.add_search(keyword, page + 1, new if past is None else (past + new) / 2)
+                elif task.kind == 'detail':
+                    if Config.RELEVANCE_TOP_N and details_fetched >= Config.RELEVANCE_TOP_N:
+                        top_n_skipped += 1
+                        if task.job.discord_message_id:
+                            self.withdraw_preview(task.job)
+                        continue
+                    details_fetched += 1
+                    if self.process_job(task.job, fetch_details=task.job.job_id not in detailed):
+                        new_jobs.append(task.job)
+                    if self.check_extraction_health():
+                        print("🛑 Stopping job-page fetches: extraction is broken (EXTRACTION_HEALTH_ACTION=stop)")
+                        break
                 else:
-                    print(f"  Job already exists: {job_data['title'][:50]}")
+                    # Postings edited since we stored them: refresh, but don't notify again
+                    print(f"  ♻️  Re-checking changed job: {task.job.title[:50]}")
+                    self.process_job(task.job)
+            except BudgetExhausted:
+                scheduler.push(task)
+                print(f"⏱️  Budget spent ({self.budget.summary()})")
+                break
+            except JobPageUnavailable as e:
+                unavailable += 1
+                print(f"    ↪️  Job page unavailable, left for the next run: {e}")
             except Exception as e:
-                print(f"  Error processing job {job_id}: {e}")
+                target = task.keyword if task.kind == 'search' else task.job.job_id
+                print(f"  Error processing {task.kind} task {target}: {e}")
+        
+        if unavailable:
+            print(f"↪️  {unavailable} job pages could not be fetched; the next run retries them")
+        if top_n_skipped:
+            print(f"🎯 Skipped {top_n_skipped} job pages beyond RELEVANCE_TOP_N={Config.RELEVANCE_TOP_N}")
+        for keyword, (pages, new) in yields.items():
+            self.state.update_watermark(keyword, [job_id for page in self.search_pages[keyword] for job_id in page])
+            self.state.record_yield(keyword, pages, new)
+            print(f"  '{keyword}': {pages} page(s), {new} new listings")
+        return new_jobs
+
+    def check_extraction_health(self):
+        """Report fields whose hit rate just collapsed; True if the crawl should stop"""
+        if Config.EXTRACTION_HEALTH_ACTION == 'off':
+            return False
+        collapsed = self.extraction.check()
+        if not collapsed:
+            return False
         
-        # Send to Discord
+        lines = [self.extraction.field_summary(field) for field in collapsed]
+        print("🚨" * 20)
+        print(f"🚨 EXTRACTION COLLAPSED after {self.extraction.pages} job pages - "
+              f"the job page markup has probably changed:")
+        for line in lines:
+            print(f"🚨   {line}")
+        print("🚨" * 20)
+        self.discord.send_alert(
+            "🚨 Job page extraction collapsed",
+            f"After {self.extraction.pages} job pages these fields are found far less often than usual. "
+            f"The OnlineJobs.ph markup has probably changed; check the selectors in get_job_details.",
+            lines
+        )
+        return Config.EXTRACTION_HEALTH_ACTION == 'stop'
+
+    def open_frontier(self, days_back):
+        """Resume an interrupted run's checkpoints, or start new ones"""
+        if not Config.FRONTIER_PATH:
+            return None
+        frontier = CrawlFrontier(
+            Config.FRONTIER_PATH,
+            {
+                'days_back': days_back,
+                'keywords': self.keywords,
+                'discovery_mode': Config.DISCOVERY_MODE,
+                'max_pages': Config.MAX_PAGES_PER_KEYWORD,
+                'sort': Config.SEARCH_SORT_PARAM,
+            },
+            max_age_hours=Config.FRONTIER_MAX_AGE_HOURS,
+            clock=self.clock
+        )
+        if frontier.resumed:
+            print(f"⏯️  Resuming interrupted run: {frontier.summary()}")
+        return frontier
+
+    def run_scrape(self, days_back=5, max_requests=0, deadline_minutes=0):
+        """Main scraping function
+        
+        With max_requests and/or deadline_minutes the run stops starting new
+        requests when the budget is spent (see scheduler.py).
+        """
+        print(f"🕷️ Starting OnlineJobs.ph scrape - looking {days_back} days back")
+        
+        if max_requests or deadline_minutes:
+            self.budget = RequestBudget(max_requests, deadline_minutes * 60,
+                                        reserve_seconds=Config.DEADLINE_RESERVE_SECONDS, clock=self.clock)
+            print(f"⏱️  Budget: {max_requests or 'unlimited'} requests, "
+                  + (f"{deadline_minutes:g} min deadline ({Config.DEADLINE_RESERVE_SECONDS:g}s kept for notifying)"
+                     if deadline_minutes else "no deadline"))
+        self.frontier = self.open_frontier(days_back)
+        try:
+            return self._run_scrape(days_back)
+        finally:
+            self.budget = None
+            if self.frontier is not None:
+                self.frontier.close()
+                self.frontier = None
+
+    def _run_scrape(self, days_back):
+        new_jobs = []
+        unique_jobs = None
+        changed_jobs = []
+        plan = None
+        scheduler = CrawlScheduler()
+        scorer = self.build_scorer()
+        
+        # Jobs an interrupted run already got further with
+        stages = self.frontier.stages() if self.frontier else {}
+        detailed = self.frontier.jobs(stage='detailed') if self.frontier else {}
+        if self.frontier and self.frontier.resumed:
+            # Saved but never notified; re-save in case the database is new (CI)
+            for job in self.frontier.jobs(stage='saved', changed=False).values():
+                if not self.db.job_exists(job.job_id):
+                    self.db.save_job(job)
+                self.state.add_known(job.job_id)
+                new_jobs.append(job)
+        
+        if Config.DISCOVERY_MODE == 'sitemap':
+            unique_jobs, changed_jobs = self.discover_from_sitemaps(days_back)
+        if unique_jobs is None:
+            # First page of every keyword; later pages are queued as pages come in
+            plan = self.plan_keywords()
+            for keyword in plan.order:
+                scheduler.add_search(keyword, 1, self.state.yield_per_request(keyword))
+            depths = plan.depths
+        else:
+            self.queue_candidates(scheduler, scorer, unique_jobs.values(), stages, detailed)
+            depths = {}
+        for job in changed_jobs:
+            scheduler.add_refresh(job)
+        
+        # Search pages and job pages, most new jobs per request first
+        new_jobs += self.crawl(scheduler, scorer, depths, days_back, stages, detailed)
+        cut_short = len(scheduler) > 0
+        if cut_short:
+            print(scheduler.deferred_summary())
+        if plan is not None:
+            # A run cut short says nothing about the pages it didn't search
+            self.state.record_keyword_run(self.search_pages, plan.capped or cut_short,
+                                          keep=Config.PLANNER_HISTORY_RUNS)
+        
+        # Rescore with the descriptions so notifications go out best match first
+        new_jobs = scorer.rank(new_jobs)
+        
+        # Salary floor (jobs without a parsed salary always pass)
+        below_floor = [job for job in new_jobs if not meets_salary_floor(job.salary_usd_month)]
+        if below_floor:
+            print(f"💸 Not notifying {len(below_floor)} jobs below the salary floor")
+            new_jobs = [job for job in new_jobs if meets_salary_floor(job.salary_usd_month)]
+        
+        # Send to Discord (notify-first jobs went out as they were found)
         if new_jobs:
-            print(f"📤 Sending {len(new_jobs)} new jobs to Discord")
+            already_sent = self.db.get_sent_job_ids(job.job_id for job in new_jobs)
+            pending = [job for job in new_jobs if job.job_id not in already_sent]
+            if already_sent:
+                print(f"🔔 {len(already_sent)} new jobs were posted to Discord as they were found")
             try:
-                success = self.discord.send_jobs_batch(new_jobs)
-                if success:
-                    print("✅ Successfully sent jobs to Discord")
+                if pending:
+                    print(f"📤 Sending {len(pending)} new jobs to Discord")
+                    success = self.discord.send_jobs_batch(pending)
+                    if success:
+                        print("✅ Successfully sent jobs to Discord")
+                    else:
+                        print("❌ Failed to send jobs to Discord")
                 else:
-                    print("❌ Failed to send jobs to Discord")
+                    self.discord.send_enhanced_summary(len(new_jobs), len(already_sent),
+                                                       [job.keyword_matched for job in new_jobs])
             except Exception as e:
                 print(f"❌ Error sending to Discord: {e}")
+            sent_ids = self.db.get_sent_job_ids(job.job_id for job in new_jobs)
+            for job_id in sent_ids:
+                self.state.mark_sent(job_id)
+            if self.frontier:
+                self.frontier.mark_notified(sent_ids)
         else:
             print("📭 No new jobs found")
         
+        # Only healthy runs move the baseline, so a broken site can't become normal
+        if self.extraction.pages:
+            print(f"🩺 Extraction: {self.extraction.summary()}")
+            self.db.log_extraction(self.extraction.rows())
+            if self.extraction.healthy:
+                self.state.extraction_baseline = self.extraction.updated_baseline()
+        
+        self.state.save()
+        if self.frontier and not cut_short:
+            self.frontier.finish()
+        elif self.frontier:
+            print(f"⏯️  Deferred work stays checkpointed; a run within "
+                  f"{Config.FRONTIER_MAX_AGE_HOURS:g}h resumes it ({self.frontier.summary()})")
+        print(f"🚦 Pacing: {self.rate.summary()}")
         return len(new_jobs)
 
+def run_worker_process(run_id, days_back=5):
+    """Entry point for one crawl worker process (see run_sharded_scrape)"""
+    from work_queue import WorkQueue
+    
+    queue = WorkQueue(Config.WORK_QUEUE_PATH, run_id, lease_seconds=Config.LEASE_SECONDS)
+    try:
+        OnlineJobsScraper(work_queue=queue).run_worker(days_back=days_back)
+    finally:
+        queue.close()
+
+def run_sharded_scrape(workers, days_back=5, run_id=None):
+    """Seed a shared work queue, run local worker processes, then notify Discord
+    
+    Workers on other hosts can join the same run with `main.py --worker RUN_ID`
+    as long as they share WORK_QUEUE_PATH and DATABASE_PATH.
+    """
+    import multiprocessing
+    from work_queue import WorkQueue
+    
+    run_id = run_id or datetime.now().strftime('%Y%m%d-%H%M%S')
+    queue = WorkQueue(Config.WORK_QUEUE_PATH, run_id, lease_seconds=Config.LEASE_SECONDS)
+    queue.seed_keywords(Config.KEYWORDS)
+    print(f"🧵 Run {run_id}: {len(Config.KEYWORDS)} keywords across {workers} workers")
+    
+    processes = [
+        multiprocessing.Process(target=run_worker_process, args=(run_id, days_back))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    
+    print(f"📊 Task status: {queue.progress()}")
+    saved_ids = set(queue.results('detail', 'saved'))
+    queue.close()
+    
+    # Notify once for the whole run, from the coordinator only
+    db = JobDatabase(Config.DATABASE_PATH)
+    state = CrawlState.load(Config.STATE_PATH)
+    for job_id in saved_ids:
+        state.add_known(job_id)
+    new_jobs = [
+        job for job in db.get_unsent_jobs()
+        if job.job_id in saved_ids and meets_salary_floor(job.salary_usd_month)
+    ]
+    if new_jobs:
+        print(f"📤 Sending {len(new_jobs)} new jobs to Discord")
+        try:
+            if DiscordSender().send_jobs_batch(new_jobs):
+                print("✅ Successfully sent jobs to Discord")
+            else:
+                print("❌ Failed to send jobs to Discord")
+        except Exception as e:
+            print(f"❌ Error sending to Discord: {e}")
+        for job_id in db.get_sent_job_ids(saved_ids):
+            state.mark_sent(job_id)
+    else:
+        print("📭 No new jobs found")
+    
+    state.save()
+    return len(saved_ids)
+
 if __name__ == "__main__":
     scraper = OnlineJobsScraper()
     new_jobs_count = scraper.run_scrape()
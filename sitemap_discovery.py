@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+sitemap_discovery.py - Job discovery from XML sitemaps and feeds
+
+An alternative to paging through /jobseekers/jobsearch HTML for every
+keyword (DISCOVERY_MODE=sitemap). Sitemaps listed in robots.txt (plus any
+SITEMAP_URLS) are streamed through an incremental XML parser, so even large
+files are never held in memory. Job URLs and their lastmod dates come out
+in bulk and are matched against the keywords locally, using the title slug
+in the URL. Only new jobs, and known jobs whose lastmod is newer than their
+stored DATE UPDATED, go on to get_job_details. A job's lastmod stands in
+for its DATE UPDATED until the job page is fetched.
+
+Sitemap indexes, <urlset> sitemaps, RSS <item>s and Atom <entry>s are all
+understood; .gz sitemaps are decompressed on the fly.
+"""
+
+import gzip
+import re
+from collections import namedtuple
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import ParseError, iterparse
+
+from job_record import JobRecord
+from scheduler import BudgetExhausted
+
+# kind is 'sitemap' (a nested sitemap to read) or 'url' (a page)
+SitemapEntry = namedtuple('SitemapEntry', ['kind', 'loc', 'lastmod', 'title'])
+
+JOB_URL_RE = re.compile(r'/jobseekers/job/(?:(?P<slug>[^/?#]*?)-)?(?P<job_id>\d+)/?(?:[?#]|$)')
+
+
+def _local(tag):
+    """Tag name without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_lastmod(text):
+    """W3C datetime (sitemaps, Atom) or RFC 822 date (RSS) as a naive local datetime"""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        value = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            value = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def iter_sitemap_entries(stream):
+    """Yield SitemapEntry tuples from a sitemap, sitemap index or feed stream"""
+    for _, elem in iterparse(stream, events=('end',)):
+        tag = _local(elem.tag)
+        if tag not in ('url', 'sitemap', 'item', 'entry'):
+            continue
+
+        fields = {}
+        for child in elem:
+            name = _local(child.tag)
+            if name == 'link' and child.get('href'):
+                fields.setdefault('link', child.get('href'))
+            elif child.text:
+                fields.setdefault(name, child.text.strip())
+
+        loc = fields.get('loc') or fields.get('link')
+        lastmod = fields.get('lastmod') or fields.get('updated') or fields.get('pubDate')
+        if loc:
+            kind = 'sitemap' if tag == 'sitemap' else 'url'
+            yield SitemapEntry(kind, loc, parse_lastmod(lastmod), fields.get('title'))
+
+        # Drop the finished element so memory stays flat on big sitemaps
+        elem.clear()
+
+
+def title_from_slug(slug):
+    """'virtual-assistant-admin' -> 'Virtual Assistant Admin'"""
+    return ' '.join(word.capitalize() for word in (slug or '').split('-') if word)
+
+
+class SitemapDiscovery:
+    def __init__(self, scraper, max_sitemaps=20):
+        self.scraper = scraper            # OnlineJobsScraper: paced, robots-checked _get
+        self.max_sitemaps = max_sitemaps  # Cap on sitemap/feed requests per run
+        self.requests = 0
+        self.entries = 0
+        self.job_urls = 0
+        self.matched = 0
+
+    def _read(self, url):
+        """Stream one sitemap or feed through the incremental parser"""
+        response = self.scraper._get(url, stream=True, timeout=30)
+        self.requests += 1
+        response.raw.decode_content = True
+        stream = response.raw
+        if url.endswith('.gz') and 'gzip' not in response.headers.get('Content-Encoding', ''):
+            stream = gzip.GzipFile(fileobj=response.raw)
+        try:
+            yield from iter_sitemap_entries(stream)
+        finally:
+            response.close()
+
+    def discover(self, sitemap_urls, days_back):
+        """Return (new jobs, changed known jobs) as JobRecords"""
+        cutoff = (self.scraper.now() - timedelta(days=days_back)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        pending = list(sitemap_urls)
+        visited = set()
+        candidates = {}
+        now = self.scraper.now()
+
+        while pending and len(visited) < self.max_sitemaps:
+            url = pending.pop(0)
+            if url in visited:
+                continue
+            visited.add(url)
+            print(f"  🗺️  Reading {url}")
+            try:
+                for entry in self._read(url):
+                    self.entries += 1
+                    # Entries not modified inside the window can't hold new jobs
+                    if entry.lastmod is not None and entry.lastmod < cutoff:
+                        continue
+                    if entry.kind == 'sitemap':
+                        pending.append(entry.loc)
+                        continue
+                    match = JOB_URL_RE.search(entry.loc)
+                    if not match:
+                        continue
+                    self.job_urls += 1
+                    title = entry.title or title_from_slug(match.group('slug'))
+                    keyword = self.scraper.matched_keyword(title)
+                    if keyword is None:
+                        continue
+                    self.matched += 1
+                    candidates[match.group('job_id')] = JobRecord(
+                        job_id=match.group('job_id'),
+                        title=title,
+                        listing_text=title,
+                        url=entry.loc,
+                        date_updated=entry.lastmod,
+                        job_type='Not specified',
+                        keyword_matched=keyword,
+                        scraped_at=now,
+                    )
+            except BudgetExhausted:
+                print("    ⏱️  Request budget spent - no more sitemaps this run")
+                break
+            except (ParseError, OSError) as e:
+                print(f"    ⚠️ Could not parse {url}: {e}")
+            except Exception as e:
+                print(f"    ⚠️ Could not read {url}: {e}")
+
+        new_jobs = []
+        known = []
+        for job_id, job in candidates.items():
+            if self.scraper.is_new_job(job_id):
+                new_jobs.append(job)
+            else:
+                known.append(job)
+
+        # Known jobs whose page changed after the DATE UPDATED we stored
+        date_updated = self.scraper.db.get_date_updated(job.job_id for job in known)
+        changed = [
+            job for job in known
+            if job.date_updated is not None and job.job_id in date_updated
+            and (date_updated[job.job_id] is None or job.date_updated.date() > date_updated[job.job_id].date())
+        ]
+        return new_jobs, changed
+
+    def summary(self):
+        """One-line description for logs"""
+        return (f"{self.requests} sitemap requests, {self.entries} entries, "
+                f"{self.job_urls} job URLs in window, {self.matched} matching keywords")
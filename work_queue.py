@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+work_queue.py - SQLite lease table for sharing a crawl between worker processes
+
+A coordinator seeds one 'search' task per keyword for a run. Workers (local
+processes, or processes on other hosts sharing the same volume) claim tasks
+as time-limited leases, renew them with heartbeats while they work, and mark
+them done. Search tasks fan out into 'detail' tasks for the job pages they
+find. Leases whose worker died simply expire and are claimed again.
+
+The same database holds the shared politeness budget: every worker reserves
+its next request slot from a single row, so N workers together never go
+faster than one respectful scraper would.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import uuid
+
+from clock import REAL_CLOCK
+
+# Claim order: finish detail pages before opening more search pages
+KIND_PRIORITY = {'detail': 0, 'search': 1}
+
+
+class Lease:
+    """A claimed task; payload is the decoded JSON given to enqueue()"""
+
+    def __init__(self, task_id, kind, payload, attempts):
+        self.task_id = task_id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Lease({self.task_id!r}, attempt {self.attempts})"
+
+
+class WorkQueue:
+    def __init__(self, db_path, run_id, owner=None, lease_seconds=120, max_attempts=3, clock=None):
+        self.db_path = db_path
+        self.clock = clock or REAL_CLOCK  # Lease and slot times (epoch seconds)
+        self.run_id = run_id
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.current = None
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self._init_tables()
+
+    def _init_tables(self):
+        """Create the lease and politeness tables"""
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS work_leases (
+                run_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                updated_at REAL,
+                PRIMARY KEY (run_id, task_id)
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_leases_claim ON work_leases(run_id, status, lease_expires)')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS politeness (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                next_request_at REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('INSERT OR IGNORE INTO politeness (id, next_request_at) VALUES (1, 0)')
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Coordinator side
+    # ------------------------------------------------------------------
+
+    def enqueue(self, kind, key, payload=None):
+        """Add a task unless it already exists in this run; return True if added"""
+        cursor = self.conn.execute('''
+            INSERT OR IGNORE INTO work_leases (run_id, task_id, kind, payload, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (self.run_id, f"{kind}:{key}", kind, json.dumps(payload, default=str), self.clock.time()))
+        return cursor.rowcount > 0
+
+    def seed_keywords(self, keywords):
+        """Create one search task per keyword"""
+        for keyword in keywords:
+            self.enqueue('search', keyword, {'keyword': keyword})
+
+    def progress(self):
+        """Return {status: count} for this run"""
+        rows = self.conn.execute(
+            'SELECT status, COUNT(*) FROM work_leases WHERE run_id = ? GROUP BY status',
+            (self.run_id,)
+        ).fetchall()
+        return dict(rows)
+
+    def results(self, kind, result):
+        """Return the keys of finished tasks of kind that reported result"""
+        rows = self.conn.execute('''
+            SELECT task_id FROM work_leases
+            WHERE run_id = ? AND kind = ? AND status = 'done' AND result = ?
+        ''', (self.run_id, kind, result)).fetchall()
+        return [task_id.split(':', 1)[1] for (task_id,) in rows]
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def claim(self):
+        """Lease the next pending (or expired) task, or return None"""
+        now = self.clock.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = self.conn.execute('''
+                SELECT task_id, kind, payload, attempts FROM work_leases
+                WHERE run_id = ?
+                  AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))
+                ORDER BY CASE kind WHEN 'detail' THEN ? ELSE ? END, updated_at
+                LIMIT 1
+            ''', (self.run_id, now, KIND_PRIORITY['detail'], KIND_PRIORITY['search'])).fetchone()
+            if row is None:
+                self.conn.execute('COMMIT')
+                return None
+
+            task_id, kind, payload, attempts = row
+            self.conn.execute('''
+                UPDATE work_leases
+                SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ?
+                WHERE run_id = ? AND task_id = ?
+            ''', (self.owner, now + self.lease_seconds, now, self.run_id, task_id))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+        self.current = Lease(task_id, kind, json.loads(payload) if payload else None, attempts + 1)
+        return self.current
+
+    def heartbeat(self):
+        """Extend the current lease; return False if another worker took it over"""
+        if self.current is None:
+            return True
+        cursor = self.conn.execute('''
+            UPDATE work_leases SET lease_expires = ?, updated_at = ?
+            WHERE run_id = ? AND task_id = ? AND owner = ? AND status = 'leased'
+        ''', (self.clock.time() + self.lease_seconds, self.clock.time(), self.run_id, self.current.task_id, self.owner))
+        return cursor.rowcount > 0
+
+    def complete(self, lease, result=None):
+        """Mark a leased task as done"""
+        self.conn.execute('''
+            UPDATE work_leases SET status = 'done', result = ?, lease_expires = NULL, updated_at = ?
+            WHERE run_id = ? AND task_id = ? AND owner = ?
+        ''', (result, self.clock.time(), self.run_id, lease.task_id, self.owner))
+        self.current = None
+
+    def fail(self, lease, error):
+        """Hand a task back for retry, or give up after max_attempts"""
+        status = 'failed' if lease.attempts >= self.max_attempts else 'pending'
+        self.conn.execute('''
+            UPDATE work_leases SET status = ?, result = ?, owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE run_id = ? AND task_id = ? AND owner = ?
+        ''', (status, str(error)[:500], self.clock.time(), self.run_id, lease.task_id, self.owner))
+        self.current = None
+
+    def is_drained(self):
+        """True when no task of this run is pending or leased"""
+        row = self.conn.execute('''
+            SELECT 1 FROM work_leases
+            WHERE run_id = ? AND status IN ('pending', 'leased')
+            LIMIT 1
+        ''', (self.run_id,)).fetchone()
+        return row is None
+
+    # ------------------------------------------------------------------
+    # Shared politeness budget
+    # ------------------------------------------------------------------
+
+    def reserve_request_slot(self, delay):
+        """Reserve the next request slot shared by all workers
+
+        Returns the wall-clock time at which the caller may send its request;
+        the slot after it is pushed back by delay seconds.
+        """
+        now = self.clock.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            next_at = self.conn.execute('SELECT next_request_at FROM politeness WHERE id = 1').fetchone()[0]
+            slot = max(now, next_at)
+            self.conn.execute('UPDATE politeness SET next_request_at = ? WHERE id = 1', (slot + delay,))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return slot
+
+    def hold_requests(self, until):
+        """Keep every worker from sending before wall-clock time until (Retry-After)"""
+        with self.conn:
+            self.conn.execute('UPDATE politeness SET next_request_at = MAX(next_request_at, ?) WHERE id = 1', (until,))